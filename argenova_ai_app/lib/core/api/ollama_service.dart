@@ -13,7 +13,7 @@ class OllamaService {
     try {
       final response = await http
           .get(
-            Uri.parse('$apiUrl/employees'),
+            Uri.parse('$apiUrl/employees?limit=1&fields=isim'),
             headers: {'Content-Type': 'application/json'},
           )
           .timeout(const Duration(seconds: 5));
@@ -37,6 +37,9 @@ class OllamaService {
       final data = jsonDecode(response.body);
       // Flask API response formatı: {"answer": "...", "success": true}
       return data['answer']?.toString() ?? '';
+    } else if (response.statusCode == 429 || response.statusCode == 503) {
+      final retryAfter = response.headers['retry-after'] ?? 'birkaç';
+      return 'AI servisi şu anda yoğun. Lütfen $retryAfter saniye sonra tekrar deneyin.';
     } else {
       throw Exception('Yanıt alınamadı: ${response.body}');
     }
@@ -90,25 +93,45 @@ class OllamaService {
         chatHistory,
       );
 
-      // API'ye istek gönder
-      final response = await http.post(
-        Uri.parse('$apiUrl/chat'),
-        headers: {'Content-Type': 'application/json'},
-        body: jsonEncode({'question': enhancedPrompt}),
-      );
-
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        // Flask API response formatı: {"answer": "...", "success": true}
-        final answer = data['answer']?.toString() ?? '';
+      // API'ye stream isteği gönder (SSE: token, done, error olayları)
+      final request = http.Request('POST', Uri.parse('$apiUrl/chat/stream'))
+        ..headers['Content-Type'] = 'application/json'
+        ..headers['Accept'] = 'text/event-stream'
+        ..body = jsonEncode({'question': enhancedPrompt});
+
+      // Stream iptal edilirse client kapanır ve sunucu Ollama isteğini durdurur
+      final client = http.Client();
+      try {
+        final response = await client.send(request);
+        if (response.statusCode == 429 || response.statusCode == 503) {
+          // Sunucu kuyruğu dolu: Retry-After kadar sonra tekrar denenebilir
+          final retryAfter = response.headers['retry-after'] ?? 'birkaç';
+          yield 'AI servisi şu anda yoğun. Lütfen $retryAfter saniye sonra tekrar deneyin.';
+          return;
+        }
+        if (response.statusCode != 200) {
+          yield 'Üzgünüm, yanıt alınamadı. Lütfen daha sonra tekrar deneyin.';
+          return;
+        }
 
-        // Yanıtı karakterler halinde stream et
-        for (int i = 0; i < answer.length; i++) {
-          yield answer[i];
-          await Future.delayed(const Duration(milliseconds: 50));
+        String event = 'message';
+        await for (final line in response.stream
+            .transform(utf8.decoder)
+            .transform(const LineSplitter())) {
+          if (line.startsWith('event:')) {
+            event = line.substring(6).trim();
+          } else if (line.startsWith('data:')) {
+            final data = jsonDecode(line.substring(5).trim());
+            if (event == 'token') {
+              yield data['token']?.toString() ?? '';
+            } else if (event == 'error') {
+              yield data['answer']?.toString() ??
+                  'Üzgünüm, yanıt alınamadı. Lütfen daha sonra tekrar deneyin.';
+            }
+          }
         }
-      } else {
-        yield 'Üzgünüm, yanıt alınamadı. Lütfen daha sonra tekrar deneyin.';
+      } finally {
+        client.close();
       }
     } catch (e) {
       yield 'Bir hata oluştu: $e';
@@ -10,18 +10,30 @@ class QdrantService {
   // Tüm CRUD işlemleri artık API üzerinden
   Future<List<Map<String, dynamic>>> getAllData() async {
     try {
-      final response = await http.get(
-        Uri.parse('$apiUrl/employees'),
-        headers: {'Content-Type': 'application/json'},
-      );
+      final employees = <Map<String, dynamic>>[];
+      String? cursor;
+      do {
+        // Sayfalı liste; vektörler ekranda kullanılmadığı için taşınmaz
+        final response = await http.get(
+          Uri.parse('$apiUrl/employees').replace(
+            queryParameters: {
+              'limit': '1000',
+              'fields': 'isim,toplam_mesai,tarih_araligi,gunluk_mesai',
+              if (cursor != null) 'cursor': cursor,
+            },
+          ),
+          headers: {'Content-Type': 'application/json'},
+        );
 
-      if (response.statusCode == 200) {
+        if (response.statusCode != 200) {
+          throw Exception('Çalışan verileri alınamadı: ${response.body}');
+        }
         final data = jsonDecode(response.body);
-        // Flask API response formatı: {"data": [...], "success": true, "count": 5}
-        return List<Map<String, dynamic>>.from(data['data'] ?? []);
-      } else {
-        throw Exception('Çalışan verileri alınamadı: ${response.body}');
-      }
+        // Flask API response formatı: {"data": [...], "success": true, "count": 5, "nextCursor": "..."}
+        employees.addAll(List<Map<String, dynamic>>.from(data['data'] ?? []));
+        cursor = data['nextCursor'];
+      } while (cursor != null);
+      return employees;
     } catch (e) {
       throw Exception('API bağlantı hatası: $e');
     }
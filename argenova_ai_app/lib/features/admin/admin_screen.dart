@@ -1,3 +1,5 @@
+import 'dart:convert';
+
 import 'package:file_picker/file_picker.dart';
 import 'package:flutter/material.dart';
 import 'package:flutter_riverpod/flutter_riverpod.dart';
@@ -21,6 +23,7 @@ class _AdminScreenState extends ConsumerState<AdminScreen>
   bool _loading = false;
   String? _selectedFilePath;
   String? _selectedFileName;
+  String? _uploadStatus;
 
   @override
   void initState() {
@@ -151,21 +154,67 @@ class _AdminScreenState extends ConsumerState<AdminScreen>
         );
 
       var response = await request.send();
+      final body = jsonDecode(await response.stream.bytesToString());
 
-      if (response.statusCode == 200) {
-        _showSnackBar('Excel dosyasından çalışanlar başarıyla yüklendi');
-        setState(() {
-          _selectedFilePath = null;
-          _selectedFileName = null;
-        });
-        _loadEmployees(); // Listeyi güncelle
+      if (response.statusCode != 202) {
+        _showSnackBar('Yükleme başarısız: ${body['error'] ?? response.statusCode}');
+        return;
+      }
+      setState(() {
+        _selectedFilePath = null;
+        _selectedFileName = null;
+      });
+      final job = await _pollUploadJob(body['jobId']);
+      final result = job['result'] ?? {};
+      if (job['status'] == 'completed') {
+        _showSnackBar(result['message'] ?? 'Excel dosyasından çalışanlar başarıyla yüklendi');
+      } else if (job['status'] == 'cancelled') {
+        _showSnackBar('Yükleme iptal edildi');
       } else {
-        _showSnackBar('Yükleme başarısız: ${response.statusCode}');
+        _showSnackBar('Yükleme başarısız: ${job['error']}');
       }
+      _loadEmployees(); // Listeyi güncelle
     } catch (e) {
       _showSnackBar('Hata: $e');
     } finally {
-      setState(() => _loading = false);
+      setState(() {
+        _loading = false;
+        _uploadStatus = null;
+      });
+    }
+  }
+
+  /// Yükleme işi bitene kadar /jobs/<id> durumunu sorgula
+  Future<Map<String, dynamic>> _pollUploadJob(String jobId) async {
+    final uri = Uri.parse('${ApiConfig.apiBaseUrl}/jobs/$jobId');
+    while (true) {
+      final response = await http.get(uri);
+      if (response.statusCode != 200) {
+        throw Exception('İş durumu alınamadı: ${response.statusCode}');
+      }
+      final job = jsonDecode(response.body)['data'] as Map<String, dynamic>;
+      if (job['status'] != 'queued' && job['status'] != 'running') {
+        return job;
+      }
+      if (mounted) {
+        setState(() => _uploadStatus = _describeUploadJob(job));
+      }
+      await Future.delayed(const Duration(seconds: 1));
+    }
+  }
+
+  String _describeUploadJob(Map<String, dynamic> job) {
+    switch (job['phase']) {
+      case 'parsing':
+        return 'Dosya okunuyor... (${job['rowsParsed']} satır)';
+      case 'embedding':
+        final eta = job['etaSeconds'];
+        return 'Çalışanlar aktarılıyor: ${job['rowsUpserted']}/${job['rowsToUpsert']}'
+            '${eta != null ? ' (kalan ~${(eta as num).round()} sn)' : ''}';
+      case 'exporting':
+        return 'Veriler hazırlanıyor...';
+      default:
+        return 'Yükleme sırada bekliyor...';
     }
   }
 
@@ -285,7 +334,7 @@ class _AdminScreenState extends ConsumerState<AdminScreen>
                 ),
                 const SizedBox(height: 16),
                 Text(
-                  'Çalışanlar yükleniyor...',
+                  _uploadStatus ?? 'Çalışanlar yükleniyor...',
                   style: TextStyle(
                     color: Theme.of(context).primaryColor,
                     fontSize: 16,
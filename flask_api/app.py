@@ -1,8 +1,22 @@
-from flask import Flask, jsonify
+# İlk import: başlangıç aşamaları bu andan itibaren ölçülür
+from services.startup import startup
+from datetime import datetime, timezone
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from controllers.chat_controller import chat_bp
 from controllers.employee_controller import employee_bp
+from controllers.debug_controller import debug_bp
 from services.qdrant_service import qdrant_service
+from services.ai_service import ai_service
+from services.async_ai import async_ai_service
+from services.answer_cache import answer_cache
+from services.local_index import local_index
+from services.retrieval import retriever
+from services.name_resolver import name_resolver
+from services.query_router import query_router
+from services.context_builder import context_builder
+from services.admission import Overloaded
+from services import metrics, profiling
 from config.settings import Config
 import logging
 
@@ -14,26 +28,62 @@ logging.basicConfig(
 
 def create_app():
     """Flask uygulamasını oluştur"""
+    startup.mark("imports")
+    with startup.phase("create_app"):
+        app = _build_app()
+    # Qdrant, snapshot, indeksler ve Ollama modelleri arka planda ısıtılır;
+    # yarıda kalan yükleme işleri de orada devam ettirilir
+    startup.start_warmup()
+    return app
+
+def _build_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
     # CORS ayarları
-    CORS(app, origins=Config.CORS_ORIGINS, supports_credentials=True)
+    CORS(app, origins=Config.CORS_ORIGINS, supports_credentials=True,
+         expose_headers=["X-Answer-Cache", "Server-Timing", "X-Profile-Id"])
     
     # Blueprint'leri kaydet
     app.register_blueprint(chat_bp, url_prefix='/api')
     app.register_blueprint(employee_bp, url_prefix='/api')
+    app.register_blueprint(debug_bp, url_prefix='/api')
+    
+    # İsteğe bağlı istek profilleme (X-Profile + X-Admin-Token ya da örnekleme)
+    profiling.init_app(app)
+    
+    if Config.METRICS_ENABLED:
+        metrics.init_app(app)
+
+        @app.route('/metrics')
+        def prometheus_metrics():
+            body, content_type = metrics.render()
+            return Response(body, content_type=content_type)
     
-    # Health check endpoint
+    # Health check endpoint (canlılık; arka uçlara gitmez)
     @app.route('/health')
     def health_check():
         return jsonify({
             "status": "OK",
-            "timestamp": "2024-01-01T00:00:00Z",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "version": "1.0.0",
-            "service": "Flask API"
+            "service": "Flask API",
+            "aiService": ai_service.health(),
+            "asyncAI": async_ai_service.stats(),
+            "answerCache": answer_cache.stats(),
+            "localIndex": local_index.stats(),
+            "retrieval": retriever.stats(),
+            "nameResolver": name_resolver.stats(),
+            "queryRouter": query_router.stats(),
+            "contextBuilder": context_builder.stats()
         })
     
+    # Hazır olma: ısınma bitene ve Qdrant erişilebilir olana kadar 503
+    @app.route('/ready')
+    def readiness_check():
+        readiness = startup.readiness()
+        return jsonify(readiness), 200 if readiness["ready"] else 503
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -50,6 +100,17 @@ def create_app():
             "message": "Sunucu hatası oluştu",
             "success": False
         }), 500
+
+    @app.errorhandler(Overloaded)
+    def ai_overloaded(error):
+        # Ollama kuyruğu dolu (429) veya kuyrukta zaman aşımı (503)
+        return jsonify({
+            "answer": "AI servisi şu anda yoğun. Lütfen birkaç saniye sonra tekrar deneyin.",
+            "error": "AI_SERVICE_OVERLOADED",
+            "message": str(error),
+            "retryAfter": error.retry_after,
+            "success": False
+        }), error.status, {"Retry-After": str(error.retry_after)}
     
     return app
 
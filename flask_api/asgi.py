@@ -0,0 +1,131 @@
+"""ASGI giriş noktası (async serving modu).
+
+/api/chat, /api/chat/stream, /api/chat/context ve /api/embedding istekleri
+async Quart view'larına (controllers/async_chat_controller.py) gider; Ollama
+ve Qdrant beklenirken süreç başka isteklere hizmet etmeye devam eder ve tek
+süreç yüzlerce bekleyen chat'i taşıyabilir. Diğer tüm yollar (çalışan CRUD,
+yükleme, /health) değişmeden WSGI Flask uygulamasında, bir thread havuzunda
+çalışır. İki taraf aynı süreçte olduğu için Ollama kabul kuyruğu, cache'ler
+ve snapshot ortaktır.
+
+Çalıştırma (quart paketi gerekir; hypercorn onunla birlikte gelir):
+    hypercorn --bind 0.0.0.0:5000 asgi:app
+    uvicorn --host 0.0.0.0 --port 5000 asgi:app
+
+WSGI modu (app:create_app()) olduğu gibi desteklenmeye devam eder.
+"""
+import itertools
+import logging
+import time
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, g, jsonify, request
+from werkzeug.wsgi import ClosingIterator
+from app import create_app
+from config.settings import Config
+from controllers.async_chat_controller import async_chat_bp
+from services.admission import Overloaded
+from services import metrics, profiling
+from services.ai_service import ai_service
+from services.async_ai import async_ai_service
+from services.qdrant_service import qdrant_service
+
+logger = logging.getLogger(__name__)
+
+def create_async_app() -> Quart:
+    """Async view'ları barındıran Quart uygulaması"""
+    app = Quart(__name__)
+    # SSE akışı Ollama üretimi sürdükçe açık kalır
+    app.config["RESPONSE_TIMEOUT"] = Config.AI_CHAT_READ_TIMEOUT
+    app.register_blueprint(async_chat_bp, url_prefix='/api')
+
+    if Config.METRICS_ENABLED:
+        # metrics.init_app'in Quart karşılığı; /metrics WSGI tarafında sunulur
+        @app.before_request
+        async def start_timer():
+            g.metrics_started = time.perf_counter()
+
+        @app.after_request
+        async def observe_request(response):
+            started = g.pop('metrics_started', None)
+            if started is not None:
+                rule = request.url_rule.rule if request.url_rule is not None else None
+                metrics.observe_request(request.method, rule, response.status_code, time.perf_counter() - started)
+            return response
+
+    # profiling.init_app'in Quart karşılığı. Akış gövdesi ayrı bir görevde
+    # aktığı için profil yanıt başlıkları hazırlanınca kapatılır.
+    @app.before_request
+    async def start_profile():
+        decision = profiling.requested(request.headers.get('X-Profile') or request.args.get('profile'),
+                                       request.headers.get('X-Admin-Token'))
+        g.profile = profiling.start(f"{request.method} {request.path}", *decision) if decision else None
+
+    @app.after_request
+    async def finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profiling.finish(profile, status=response.status_code)
+            response.headers['Server-Timing'] = profiling.server_timing(profile)
+            response.headers['X-Profile-Id'] = profile.id
+        return response
+
+    @app.after_request
+    async def add_cors_headers(response):
+        # Flask tarafındaki flask_cors ayarlarının karşılığı (preflight WSGI'de cevaplanır)
+        origin = request.headers.get("Origin")
+        if origin and (origin in Config.CORS_ORIGINS or "*" in Config.CORS_ORIGINS):
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Access-Control-Expose-Headers"] = "X-Answer-Cache, Server-Timing, X-Profile-Id"
+            response.headers["Vary"] = "Origin"
+        return response
+
+    @app.errorhandler(Overloaded)
+    async def ai_overloaded(error):
+        return jsonify({
+            "answer": "AI servisi şu anda yoğun. Lütfen birkaç saniye sonra tekrar deneyin.",
+            "error": "AI_SERVICE_OVERLOADED",
+            "message": str(error),
+            "retryAfter": error.retry_after,
+            "success": False
+        }), error.status, {"Retry-After": str(error.retry_after)}
+
+    @app.after_serving
+    async def close_clients():
+        await async_ai_service.close()
+        await qdrant_service.close_async()
+
+    return app
+
+def ensure_body_chunk(wsgi_app):
+    """Hypercorn'un WSGI sarmalayıcısı başlığı ilk gövde parçasıyla gönderir;
+    boş gövdeli yanıtlar (ör. CORS preflight) için sona boş bir parça ekler"""
+    def app(environ, start_response):
+        body = wsgi_app(environ, start_response)
+        return ClosingIterator(itertools.chain(body, [b""]), getattr(body, "close", None))
+    return app
+
+class Dispatcher:
+    """Yola göre isteği async uygulamaya ya da WSGI uygulamasına yönlendiren ASGI uygulaması"""
+
+    def __init__(self, async_app: Quart, wsgi_app):
+        self.async_app = async_app
+        self.wsgi_app = wsgi_app
+        self.async_paths = {
+            rule.rule for rule in async_app.url_map.iter_rules() if rule.endpoint.startswith('async_chat.')
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.async_app(scope, receive, send)
+        if scope["type"] == "http" and scope["path"] in self.async_paths and scope["method"] != "OPTIONS":
+            return await self.async_app(scope, receive, send)
+        return await self.wsgi_app(scope, receive, send)
+
+# Bekleyen async istekler thread tutmaz; kuyruk WSGI moduna göre uzun tutulur
+ai_service.admission.max_queue = Config.ASGI_ADMISSION_QUEUE_SIZE
+
+app = Dispatcher(
+    create_async_app(),
+    AsyncioWSGIMiddleware(ensure_body_chunk(create_app()), max_body_size=Config.ASGI_MAX_BODY_SIZE)
+)
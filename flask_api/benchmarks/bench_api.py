@@ -0,0 +1,188 @@
+"""API uçtan uca benchmark'ı (Ollama ve Qdrant sunucusu gerekmez).
+
+Her veri boyutu için (varsayılan 40, 10k, 100k çalışan) sahte Ollama
+(benchmarks/fake_ollama.py) ve süreç içi Qdrant (``QDRANT_URL=:memory:``)
+ile API'yi ayrı bir süreçte başlatır, sentetik mesai tablosunu
+/api/upload-employees ile yükler ve şu senaryoları ölçer:
+
+    upload         - yükleme işinin süresi ve satır/s hızı
+    employees      - GET /api/employees?limit=50
+    employee_stats - GET /api/employee-stats
+    context        - POST /api/chat/context
+    chat           - POST /api/chat, sayısal soru (hızlı yol)
+    chat_llm       - POST /api/chat, force_llm (sahte Ollama üretimi)
+
+Her senaryo için p50/p95/p99 gecikme, throughput ve süreç ağacının tepe
+RSS'i raporlanır; sonuçlar commit'le birlikte JSON'a yazılır ve
+``--compare`` ile önceki bir çalıştırmaya göre farklar gösterilir.
+
+Kullanım (psutil ve httpx gerekir):
+    python benchmarks/bench_api.py --sizes 40,10000 --requests 200 --concurrency 16
+    python benchmarks/bench_api.py --compare benchmarks/results/bench_api-abc1234.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import httpx
+from datagen import employee_names, write_sheet
+from fake_ollama import fake_embedding
+from harness import (ROOT, RssSampler, git_commit, run_requests, server_command, start_fake_ollama,
+                     start_server, stop_server, tree_rss)
+
+SCENARIOS = ('employees', 'employee_stats', 'context', 'chat', 'chat_llm')
+QUERIES = ["fazla mesai yapanlar", "hafta sonu çalışanlar", "{} mesaisi", "{} ile {} karşılaştır"]
+
+def make_scenario(name: str, names: list, dim: int, seed: int = 7):
+    """``run_requests`` için i. isteği üreten fonksiyon"""
+    rng = random.Random(seed)
+    if name == 'employees':
+        return lambda i: ('GET', '/api/employees?limit=50', None)
+    if name == 'employee_stats':
+        return lambda i: ('GET', '/api/employee-stats', None)
+    if name == 'context':
+        def context(i):
+            query = rng.choice(QUERIES).format(rng.choice(names), rng.choice(names))
+            return 'POST', '/api/chat/context', {"query": query, "embedding": fake_embedding(query, dim)}
+        return context
+    if name == 'chat':
+        return lambda i: ('POST', '/api/chat', {"question": f"{rng.choice(names)} toplam kaç saat çalıştı?"})
+    return lambda i: ('POST', '/api/chat', {"question": f"soru {i}: {rng.choice(names)} bu ay nasıl çalıştı?",
+                                            "force_llm": True})
+
+def upload(port: int, path: str, rows: int, timeout: float = 3600) -> dict:
+    """Tabloyu yükle ve iş bitene kadar durumunu sorgula"""
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        response = httpx.post(f"http://127.0.0.1:{port}/api/upload-employees",
+                              files={"file": (os.path.basename(path), f, "text/csv")}, timeout=300)
+    response.raise_for_status()
+    status_url = f"http://127.0.0.1:{port}{response.json()['statusUrl']}"
+    job = response.json()['job']
+    while job['status'] in ('queued', 'running'):
+        if time.perf_counter() - started > timeout:
+            raise RuntimeError(f"Yükleme {timeout}s içinde bitmedi: {job}")
+        time.sleep(0.2)
+        job = httpx.get(status_url, timeout=30).json()['data']
+    elapsed = time.perf_counter() - started
+    if job['status'] != 'completed':
+        raise RuntimeError(f"Yükleme başarısız: {job.get('error')}")
+    return {"rows": rows, "seconds": round(elapsed, 2), "rowsPerSecond": round(rows / elapsed, 1)}
+
+def bench_size(size: int, args, workdir: str) -> dict:
+    rows = size * args.weeks
+    sheet = os.path.join(workdir, f"employees_{size}.csv")
+    write_sheet(sheet, 'csv', rows, size)
+    env = {
+        **os.environ,
+        "AI_SERVICE_URL": f"http://127.0.0.1:{args.ollama_port}",
+        "QDRANT_URL": args.qdrant if args.qdrant == ':memory:' else f"path:{os.path.join(workdir, f'qdrant_{size}')}",
+        "EMPLOYEES_SNAPSHOT_PATH": os.path.join(workdir, f'employees_{size}.snap'),
+        "EMPLOYEES_JSON_PATH": os.path.join(workdir, f'employees_{size}.json'),
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, f'embeddings_{size}.db'),
+        "UPLOAD_JOBS_DIR": os.path.join(workdir, f'jobs_{size}'),
+        "AI_ADMISSION_QUEUE_SIZE": str(args.concurrency * 2),
+        "ASGI_ADMISSION_QUEUE_SIZE": str(args.concurrency * 2),
+    }
+    # Yerel Qdrant tek süreçte tutulur: tek worker
+    command = server_command(args.mode, args.port, 1, args.threads, args.asgi_server)
+    server = start_server(command, env, args.port, os.path.join(workdir, f'server_{size}.log'))
+    results = {}
+    try:
+        idle = tree_rss(server.pid)
+        with RssSampler(server.pid) as sampler:
+            results['upload'] = upload(args.port, sheet, rows)
+        results['upload']['peakRssMb'] = round(sampler.peak / 2**20, 1)
+        print(f"{size:7d} upload        : {results['upload']['seconds']:8.2f}s, "
+              f"{results['upload']['rowsPerSecond']:9.1f} satır/s, RSS {idle / 2**20:.0f}→"
+              f"{results['upload']['peakRssMb']:.0f} MB", flush=True)
+
+        names = employee_names(size)
+        for scenario in args.scenarios:
+            make_request = make_scenario(scenario, names, args.dim)
+            # Isınma: cache'ler, import'lar, bağlantılar
+            asyncio.run(run_requests(args.port, make_request, min(args.concurrency, 8), min(args.concurrency, 8)))
+            with RssSampler(server.pid) as sampler:
+                result = asyncio.run(run_requests(args.port, make_request, args.requests, args.concurrency))
+            result['peakRssMb'] = round(sampler.peak / 2**20, 1)
+            results[scenario] = result
+            print(f"{size:7d} {scenario:14s}: {result['throughput']:8.1f} istek/s, p50 {result['p50Ms']:8.1f} ms, "
+                  f"p95 {result['p95Ms']:8.1f} ms, p99 {result['p99Ms']:8.1f} ms, RSS {result['peakRssMb']:.0f} MB, "
+                  f"durumlar {result['statuses']}", flush=True)
+    finally:
+        stop_server(server)
+    return results
+
+def compare(old: dict, new: dict):
+    """İki çalıştırmanın gecikme, throughput ve bellek farkları"""
+    print(f"\nkarşılaştırma: {old.get('commit')} → {new.get('commit')}")
+    for size, scenarios in new['results'].items():
+        for scenario, result in scenarios.items():
+            before = old['results'].get(size, {}).get(scenario)
+            if not before:
+                continue
+            keys = ('seconds', 'rowsPerSecond', 'peakRssMb') if scenario == 'upload' else \
+                ('p50Ms', 'p95Ms', 'p99Ms', 'throughput', 'peakRssMb')
+            for key in keys:
+                if result.get(key) is not None and before.get(key):
+                    change = (result[key] - before[key]) / before[key] * 100
+                    print(f"{size:>7s} {scenario:14s} {key:10s}: {before[key]:10.1f} → {result[key]:10.1f} "
+                          f"({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='40,10000,100000', help="virgülle ayrılmış çalışan sayıları")
+    parser.add_argument('--weeks', type=int, default=4, help="çalışan başına hafta (satır)")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help="senaryo başına istek")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mode', choices=['sync', 'async'], default='sync')
+    parser.add_argument('--threads', type=int, default=16, help="sync modda gunicorn thread sayısı")
+    parser.add_argument('--asgi-server', choices=['hypercorn', 'uvicorn'], default='hypercorn')
+    parser.add_argument('--qdrant', choices=[':memory:', 'path'], default=':memory:')
+    parser.add_argument('--tokens', type=int, default=20)
+    parser.add_argument('--token-latency', type=float, default=0.01)
+    parser.add_argument('--embed-latency', type=float, default=0.0)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--ollama-port', type=int, default=11996)
+    parser.add_argument('--output', help="varsayılan: benchmarks/results/bench_api-<commit>-<zaman>.json")
+    parser.add_argument('--compare', help="karşılaştırılacak önceki sonuç dosyası")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(',') if s]
+
+    report = {
+        "commit": git_commit(),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "args": vars(args),
+        "results": {}
+    }
+    ollama = start_fake_ollama(args.ollama_port, args.tokens, args.token_latency, args.embed_latency, args.dim)
+    try:
+        with tempfile.TemporaryDirectory(prefix='bench_api_') as workdir:
+            for size in (int(s) for s in args.sizes.split(',')):
+                report["results"][str(size)] = bench_size(size, args, workdir)
+    finally:
+        ollama.terminate()
+        ollama.wait(timeout=10)
+
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"bench_api-{report['commit'] or 'local'}-{int(time.time())}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nsonuçlar: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Qdrant koleksiyon profilleri benchmark'ı: RAM, recall ve gecikme.
+
+Kümelenmiş rastgele vektörleri her profil (latency, memory, bulk-load) için
+ayrı bir koleksiyona yükler ve şunları raporlar:
+
+    load      - yükleme süresi (bulk-load'da ertelenmiş indeksin kurulması dahil)
+    ram       - profil düzenine göre tahmini vektör + graf RAM'i; sunucu
+                modunda Qdrant'ın /metrics'teki memory_resident_bytes artışı
+    search    - p50/p95 gecikme ve NumPy tam aramasına göre recall@k
+
+Yerel mod (``--qdrant-url`` verilmezse ``:memory:``) niceleme ve diskte
+vektör ayarlarını uygulamaz; RAM ve recall farkları için bir Qdrant
+sunucusuna karşı çalıştırın.
+
+Kullanım:
+    python benchmarks/bench_collection_profiles.py --size 5000
+    python benchmarks/bench_collection_profiles.py --size 200000 --dim 1024 --qdrant-url http://localhost:6333
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+import requests
+from bench_local_index import make_vectors, percentile_ms
+from services import collection_profiles
+
+def resident_bytes(url: str):
+    """Qdrant sürecinin RSS'i (/metrics; eski sürümlerde yoksa None)"""
+    try:
+        text = requests.get(f"{url.rstrip('/')}/metrics", timeout=5).text
+    except requests.RequestException:
+        return None
+    match = re.search(r'^memory_resident_bytes\s+(\S+)', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+def wait_green(client, collection: str, timeout: float):
+    from qdrant_client.models import CollectionStatus
+    started = time.perf_counter()
+    while client.get_collection(collection).status != CollectionStatus.GREEN:
+        if time.perf_counter() - started > timeout:
+            break
+        time.sleep(0.5)
+
+def run_profile(client, name: str, vectors: np.ndarray, queries: np.ndarray, truth, args):
+    profile = collection_profiles.get(name)
+    collection = f"bench_profile_{name.replace('-', '_')}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    rss_before = resident_bytes(args.qdrant_url) if args.qdrant_url else None
+    client.create_collection(collection, **collection_profiles.create_kwargs(profile, vectors.shape[1]))
+    started = time.perf_counter()
+    for start in range(0, len(vectors), args.batch_size):
+        client.upload_collection(collection, vectors=vectors[start:start + args.batch_size],
+                                 ids=list(range(start, min(start + args.batch_size, len(vectors)))), wait=True)
+    load_seconds = time.perf_counter() - started
+    if profile["defer_indexing"]:
+        client.update_collection(collection, **collection_profiles.finalize_kwargs(profile))
+    wait_green(client, collection, args.index_timeout)
+    ready_seconds = time.perf_counter() - started
+    rss_after = resident_bytes(args.qdrant_url) if args.qdrant_url else None
+
+    search_params = collection_profiles.search_params(profile)
+    latencies, recall = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = client.query_points(collection, query=query.tolist(), limit=args.k, search_params=search_params).points
+        latencies.append(time.perf_counter() - started)
+        recall.append(len({p.id for p in found} & expected) / len(expected))
+    estimate = collection_profiles.estimate_ram_bytes(profile, len(vectors), vectors.shape[1])
+    measured = (f"{(rss_after - rss_before) / 2**20:8.1f} MB" if rss_before is not None and rss_after is not None
+                else "     n/a")
+    print(f"{name:10s}: yükleme {load_seconds:6.2f}s, hazır {ready_seconds:6.2f}s, "
+          f"RAM tahmini {estimate / 2**20:8.1f} MB, ölçülen {measured}, "
+          f"p50 {percentile_ms(latencies, 50):6.2f} ms, p95 {percentile_ms(latencies, 95):6.2f} ms, "
+          f"recall@{args.k} {np.mean(recall):.3f}")
+    if not args.keep:
+        client.delete_collection(collection)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=20_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--profiles', nargs='*', default=list(collection_profiles.PROFILES))
+    parser.add_argument('--qdrant-url', default=None, help="Boşsa QdrantClient(':memory:')")
+    parser.add_argument('--index-timeout', type=float, default=600, help="İndeksin kurulmasını en fazla bekleme (s)")
+    parser.add_argument('--keep', action='store_true', help="Koleksiyonları silme")
+    args = parser.parse_args()
+
+    from qdrant_client import QdrantClient
+    vectors = make_vectors(args.size, args.dim, args.clusters)
+    queries = make_vectors(args.queries, args.dim, args.clusters, seed=11)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    truth = [set(np.argsort(-(normalized @ q))[:args.k].tolist()) for q in queries]
+    client = QdrantClient(url=args.qdrant_url) if args.qdrant_url else QdrantClient(":memory:")
+    if not args.qdrant_url:
+        print("Yerel mod: niceleme ve diskte vektör ayarları uygulanmaz, yalnızca gecikme karşılaştırılabilir.")
+    print(f"{args.size} x {args.dim} vektör, {args.queries} sorgu")
+    for name in args.profiles:
+        run_profile(client, name, vectors, queries, truth, args)
+
+if __name__ == '__main__':
+    main()
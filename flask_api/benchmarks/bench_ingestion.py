@@ -0,0 +1,90 @@
+"""Excel/CSV ayrıştırma benchmark'ı.
+
+Rastgele üretilmiş bir mesai tablosunu (varsayılan 100k satır) eski
+``df.iterrows()`` yolu ve yeni akışlı/vektörel ``services.ingestion`` yolu
+ile okuyup süreleri ve tepe bellek kullanımını karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_ingestion.py --rows 100000 --format xlsx
+"""
+import argparse
+import ast
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd
+from benchmarks.datagen import write_sheet
+from services.ingestion import load_employees
+
+def legacy_parse(path: str, fmt: str):
+    """Eski upload_employees_from_excel ayrıştırma döngüsü (karşılaştırma için)"""
+    df = pd.read_csv(path) if fmt == 'csv' else pd.read_excel(path)
+    grouped = {}
+    for idx, row in df.iterrows():
+        isim = str(row['isim']).strip().lower()
+        tarih_raw = str(row['tarih_araligi']).strip()
+        tarih_parts = tarih_raw.replace('.', '-').split('/')
+        if len(tarih_parts) == 2:
+            def std_date(s):
+                s = s.strip()
+                if '-' in s and len(s) == 10:
+                    return s
+                for date_format in ('%d-%m-%Y', '%d.%m.%Y', '%Y-%m-%d'):
+                    try:
+                        return datetime.strptime(s, date_format).strftime('%Y-%m-%d')
+                    except Exception:
+                        continue
+                return s
+            tarih_araligi = f"{std_date(tarih_parts[0])}/{std_date(tarih_parts[1])}"
+        else:
+            tarih_araligi = tarih_raw
+        gunluk_mesai = row['gunluk_mesai']
+        if isinstance(gunluk_mesai, str):
+            gunluk_mesai = ast.literal_eval(gunluk_mesai)
+        entry = grouped.setdefault(isim, {'isim': isim, 'toplam_mesai': [], 'tarih_araligi': [], 'gunluk_mesai': []})
+        entry['toplam_mesai'].append(int(row['toplam_mesai']))
+        entry['tarih_araligi'].append(tarih_araligi)
+        entry['gunluk_mesai'].append(gunluk_mesai)
+    return list(grouped.values())
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--employees', type=int, default=5_000)
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx')
+    parser.add_argument('--skip-legacy', action='store_true', help="Eski yolu çalıştırma")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"sheet.{args.format}")
+        started = time.perf_counter()
+        write_sheet(path, args.format, args.rows, args.employees)
+        print(f"{args.rows} satırlık {args.format} üretildi: {time.perf_counter() - started:.2f}s, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+
+        rss_before = peak_rss_mb()
+        started = time.perf_counter()
+        result = load_employees(path, args.format)
+        new_time = time.perf_counter() - started
+        print(f"yeni   : {new_time:.2f}s, {len(result['employees'])} çalışan, {len(result['errors'])} hatalı satır, "
+              f"tepe RSS +{peak_rss_mb() - rss_before:.0f} MB")
+
+        if not args.skip_legacy:
+            rss_before = peak_rss_mb()
+            started = time.perf_counter()
+            legacy = legacy_parse(path, args.format)
+            legacy_time = time.perf_counter() - started
+            print(f"eski   : {legacy_time:.2f}s, {len(legacy)} çalışan, tepe RSS +{peak_rss_mb() - rss_before:.0f} MB")
+            print(f"hızlanma: {legacy_time / new_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
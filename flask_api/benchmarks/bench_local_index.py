@@ -0,0 +1,114 @@
+"""Yerel vektör indeksi benchmark'ı.
+
+Kümelenmiş rastgele vektörlerden bir snapshot üretir ve aynı sorgular için
+şunları karşılaştırır:
+
+    exact  - LocalVectorIndex tam arama (tek matmul)
+    hnsw   - hnswlib kuruluysa HNSW grafiği
+    qdrant - Qdrant query_points (--qdrant-url verilmezse :memory: yerel mod)
+
+Recall@k tam aramanın sonucuna göre hesaplanır.
+
+Kullanım:
+    python benchmarks/bench_local_index.py --size 100000 --dim 1024
+    python benchmarks/bench_local_index.py --size 20000 --qdrant-url http://localhost:6333
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from services.employee_store import EmployeeSnapshot
+from services.local_index import LocalVectorIndex
+from services.snapshot_format import ColumnarSnapshot, write_snapshot
+
+def make_vectors(size: int, dim: int, clusters: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=size)
+    return centers[labels] + 0.35 * rng.normal(size=(size, dim)).astype(np.float32)
+
+def percentile_ms(samples, p) -> float:
+    return float(np.percentile(samples, p) * 1000)
+
+def run(name: str, search, queries, truth, k: int):
+    latencies = []
+    recall = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = search(query)
+        latencies.append(time.perf_counter() - started)
+        recall.append(len(set(found) & expected) / len(expected))
+    print(f"{name:12s}: p50 {percentile_ms(latencies, 50):7.2f} ms, p95 {percentile_ms(latencies, 95):7.2f} ms, "
+          f"recall@{k} {np.mean(recall):.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=50_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--ef', type=int, nargs='*', default=[64, 256], help="Denenecek HNSW ef değerleri")
+    parser.add_argument('--qdrant-url', default=None, help="Boşsa QdrantClient(':memory:')")
+    parser.add_argument('--qdrant-max', type=int, default=20_000,
+                        help="Qdrant'a yüklenecek en fazla vektör (:memory: modu yavaştır)")
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.size, args.dim, args.clusters)
+    queries = make_vectors(args.queries, args.dim, args.clusters, seed=11)
+    employees = [{"id": i + 1, "isim": f"Çalışan {i}", "vector": v} for i, v in enumerate(vectors.tolist())]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'employees.snap')
+        started = time.perf_counter()
+        write_snapshot(path, employees)
+        snapshot = EmployeeSnapshot(version="bench", columns=ColumnarSnapshot(path))
+        index = LocalVectorIndex(snapshot, hnsw_min_size=0)
+        print(f"{args.size} x {args.dim} snapshot + indeks: {time.perf_counter() - started:.2f}s")
+
+        truth = [{i for i, _ in index.search(q, args.k, exact=True)} for q in queries]
+        run('exact', lambda q: [i for i, _ in index.search(q, args.k, exact=True)], queries, truth, args.k)
+
+        try:
+            started = time.perf_counter()
+            index.build_hnsw()
+            if index.hnsw_ready:
+                print(f"hnsw kurulumu: {time.perf_counter() - started:.2f}s")
+                for ef in args.ef:
+                    index._hnsw.set_ef(max(ef, args.k))
+                    run(f'hnsw ef={ef}', lambda q: [i for i, _ in index.search(q, args.k)], queries, truth, args.k)
+        except Exception as e:
+            print(f"hnsw atlandı: {e}")
+
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import Distance, PointStruct, VectorParams
+        client = QdrantClient(url=args.qdrant_url) if args.qdrant_url else QdrantClient(":memory:")
+        collection = 'bench_local_index'
+        n_qdrant = min(args.size, args.qdrant_max)
+        if n_qdrant < args.size:
+            # Ground truth yalnızca Qdrant'a yüklenen alt küme üzerinden yeniden hesaplanır
+            sub = LocalVectorIndex(EmployeeSnapshot([{"vector": v} for v in vectors[:n_qdrant].tolist()], version="sub"),
+                                   hnsw_min_size=0)
+            qdrant_truth = [{i for i, _ in sub.search(q, args.k, exact=True)} for q in queries]
+            run(f'exact@{n_qdrant}', lambda q: [i for i, _ in sub.search(q, args.k, exact=True)], queries, qdrant_truth, args.k)
+        else:
+            qdrant_truth = truth
+        if client.collection_exists(collection):
+            client.delete_collection(collection)
+        client.create_collection(collection, vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE))
+        started = time.perf_counter()
+        for start in range(0, n_qdrant, 1000):
+            client.upsert(collection, points=[
+                PointStruct(id=i, vector=vectors[i].tolist()) for i in range(start, min(start + 1000, n_qdrant))
+            ], wait=True)
+        print(f"qdrant yükleme ({n_qdrant}): {time.perf_counter() - started:.2f}s")
+        run('qdrant', lambda q: [p.id for p in client.query_points(collection, query=q.tolist(), limit=args.k).points],
+            queries, qdrant_truth, args.k)
+        client.delete_collection(collection)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""İsim çözümleyici benchmark'ı.
+
+Rastgele Türkçe ad-soyad kombinasyonlarından (varsayılan 100k) indeks kurar
+ve tipik soru kalıpları için ``resolve`` gecikmesini ölçer: tam isim,
+aksansız/büyük harf yazım, önek ("ahm yılmaz") ve yazım hatası ("mehme").
+
+Kullanım:
+    python benchmarks/bench_name_resolver.py --size 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from services.name_resolver import NameResolver, fold
+
+FIRST = ["Ahmet", "Mehmet", "Ayşe", "Fatma", "Mustafa", "Zeynep", "Emine", "Hüseyin", "İbrahim", "Özlem",
+         "Şükrü", "Gülşen", "Ömer", "Çağla", "Ismail", "Ilgın", "Yusuf", "Elif", "Büşra", "Uğur",
+         "Hakan", "Selin", "Deniz", "Kübra", "Oğuz", "Ebru", "Serkan", "Tuğba", "Burak", "Merve"]
+LAST = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+        "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+        "Polat", "Erdoğan", "Güneş", "Akın", "Işık", "Uçar", "Tekin", "Bulut", "Acar", "Karaca"]
+TEMPLATES = ["{} bu hafta kaç saat çalıştı?", "{} ile {} karşılaştır", "{} mesaisi nedir", "{}"]
+
+def make_names(size: int, rng: random.Random):
+    """Ad + soyad (+ sayısal ek ile benzersiz soyad) kombinasyonları"""
+    names = []
+    for i in range(size):
+        last = rng.choice(LAST)
+        names.append(f"{rng.choice(FIRST)} {last}{'' if i < 900 else i}")
+    return names
+
+def variants(name: str, rng: random.Random):
+    first, last = name.split(' ', 1)
+    return [
+        name,
+        fold(name).upper(),
+        f"{first[:3]} {last}",
+        first[:-1] + ' ' + last if len(first) > 4 else first,
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    names = make_names(args.size, rng)
+    resolver = NameResolver(track_store=False)
+    started = time.perf_counter()
+    resolver.rebuild(enumerate(names), version="bench")
+    print(f"{args.size} isim indekslendi: {(time.perf_counter() - started):.2f}s, {resolver.stats()['tokens']} token")
+
+    kinds = ['tam', 'katlanmış', 'önek', 'yazım hatası']
+    latencies = {kind: [] for kind in kinds}
+    found = {kind: 0 for kind in kinds}
+    for _ in range(args.queries):
+        target = rng.randrange(args.size)
+        for kind, variant in zip(kinds, variants(names[target], rng)):
+            template = rng.choice(TEMPLATES)
+            question = template.format(*([variant] * template.count('{}')))
+            started = time.perf_counter()
+            hits = resolver.resolve(question, limit=10)
+            latencies[kind].append(time.perf_counter() - started)
+            found[kind] += any(hit['id'] == target for hit in hits)
+
+    for kind in kinds:
+        samples = np.array(latencies[kind]) * 1000
+        print(f"{kind:13s}: p50 {np.percentile(samples, 50):.3f} ms, p99 {np.percentile(samples, 99):.3f} ms, "
+              f"ilk 10'da bulundu {found[kind] / args.queries:.1%}")
+
+    started = time.perf_counter()
+    for i in range(1000):
+        resolver.add(args.size + i, f"{rng.choice(FIRST)} {rng.choice(LAST)}")
+        resolver.remove(args.size + i)
+    print(f"artımlı ekle+sil: {(time.perf_counter() - started):.3f} ms/işlem")
+
+if __name__ == '__main__':
+    main()
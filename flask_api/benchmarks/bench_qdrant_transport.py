@@ -0,0 +1,88 @@
+"""Qdrant taşıma katmanı benchmark'ı: REST ve gRPC, tekli ve batch arama, scroll.
+
+Bir Qdrant sunucusunda geçici bir koleksiyon doldurur ve her taşıma için
+ölçer:
+
+    search       - sorgu başına bir query_points çağrısı
+    search_batch - --batch sorgu tek query_batch_points isteğinde
+    scroll       - koleksiyonun tamamını payload'la sayfa sayfa okuma
+
+Her senaryo için istek başına p50/p95 gecikme ve bu sürecin CPU süresi
+(istemci tarafı serileştirme maliyeti; sorgu ya da scroll'da nokta başına) raporlanır.
+
+Kullanım (Qdrant sunucusu gerekir; REST 6333, gRPC 6334):
+    python benchmarks/bench_qdrant_transport.py --url http://localhost:6333 --size 20000
+"""
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_local_index import make_vectors, percentile_ms
+
+def measure(name: str, calls, per_call: int = 1):
+    latencies = []
+    cpu_started = time.process_time()
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    cpu_ms = (time.process_time() - cpu_started) * 1000 / max(len(latencies) * per_call, 1)
+    print(f"  {name:14s}: p50 {percentile_ms(latencies, 50):7.2f} ms, p95 {percentile_ms(latencies, 95):7.2f} ms, "
+          f"CPU {cpu_ms:.4f} ms/öğe")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:6333')
+    parser.add_argument('--grpc-port', type=int, default=6334)
+    parser.add_argument('--size', type=int, default=20_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=8, help="search_batch'te istek başına sorgu")
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, QueryRequest, VectorParams
+    parsed = urlparse(args.url)
+    vectors = make_vectors(args.size, args.dim, 200)
+    queries = make_vectors(args.queries, args.dim, 200, seed=11).tolist()
+    payloads = [{"isim": f"Çalışan {i}", "toplam_mesai": [40] * 10, "tarih_araligi": ["2025-01-01/2025-01-07"] * 10}
+                for i in range(args.size)]
+    collection = 'bench_transport'
+
+    setup = QdrantClient(host=parsed.hostname, port=parsed.port or 6333)
+    if setup.collection_exists(collection):
+        setup.delete_collection(collection)
+    setup.create_collection(collection, vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE))
+    setup.upload_collection(collection, vectors=vectors, payload=payloads, ids=list(range(args.size)), wait=True)
+    print(f"{args.size} x {args.dim} vektör yüklendi, {args.queries} sorgu")
+
+    for transport, prefer_grpc in (('rest', False), ('grpc', True)):
+        client = QdrantClient(host=parsed.hostname, port=parsed.port or 6333, grpc_port=args.grpc_port,
+                              prefer_grpc=prefer_grpc)
+        client.query_points(collection, query=queries[0], limit=args.k)
+        print(transport)
+        measure('search', [lambda q=q: client.query_points(collection, query=q, limit=args.k) for q in queries])
+        batches = [queries[i:i + args.batch] for i in range(0, len(queries), args.batch)]
+        measure('search_batch', [
+            lambda b=b: client.query_batch_points(collection, requests=[
+                QueryRequest(query=q, limit=args.k, with_payload=True) for q in b
+            ]) for b in batches
+        ], per_call=args.batch)
+
+        def scroll_all():
+            offset = None
+            while True:
+                _, offset = client.scroll(collection, limit=1000, offset=offset, with_payload=True)
+                if offset is None:
+                    break
+        measure('scroll', [scroll_all] * 3, per_call=args.size)
+        client.close()
+
+    setup.delete_collection(collection)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark'lar için sentetik mesai verisi.
+
+Satırlar argenova_ai_app/qdrant_bulk_insert.py içindeki
+``generate_sample_data`` ile aynı biçimdedir (isim, toplam_mesai,
+tarih_araligi, gunluk_mesai); isimler Türkçe ad + soyad kombinasyonlarıdır
+ve her çalışana ardışık haftalar düşer.
+"""
+import random
+from datetime import date, timedelta
+from typing import Iterator, List
+
+DAYS = ['pazartesi', 'sali', 'carsamba', 'persembe', 'cuma']
+HEADER = ['isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai']
+FIRST = ["Ahmet", "Mehmet", "Ayşe", "Fatma", "Mustafa", "Zeynep", "Emine", "Hüseyin", "İbrahim", "Özlem",
+         "Şükrü", "Gülşen", "Ömer", "Çağla", "Ismail", "Ilgın", "Yusuf", "Elif", "Büşra", "Uğur",
+         "Hakan", "Selin", "Deniz", "Kübra", "Oğuz", "Ebru", "Serkan", "Tuğba", "Burak", "Merve"]
+LAST = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+        "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+        "Polat", "Erdoğan", "Güneş", "Akın", "Işık", "Uçar", "Tekin", "Bulut", "Acar", "Karaca"]
+
+def employee_names(n: int) -> List[str]:
+    """Benzersiz ``n`` isim; ad × soyad kombinasyonları bitince soyada sayı eklenir"""
+    combos = len(FIRST) * len(LAST)
+    return [f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]}{'' if i < combos else i // combos}"
+            for i in range(n)]
+
+def week_ranges(n_weeks: int, start: date = date(2024, 7, 1)) -> List[str]:
+    weeks = []
+    for w in range(n_weeks):
+        monday = start + timedelta(weeks=w)
+        sunday = monday + timedelta(days=6)
+        # Yarısı ISO, yarısı GG.AA.YYYY biçiminde
+        if w % 2:
+            weeks.append(f"{monday:%d.%m.%Y}/{sunday:%d.%m.%Y}")
+        else:
+            weeks.append(f"{monday:%Y-%m-%d}/{sunday:%Y-%m-%d}")
+    return weeks
+
+def generate_rows(n_rows: int, n_employees: int, seed: int = 42) -> Iterator[list]:
+    """Hafta hafta tüm çalışanlar: ``n_rows // n_employees`` hafta (+ kalan)"""
+    rng = random.Random(seed)
+    names = employee_names(n_employees)
+    weeks = week_ranges(max(1, n_rows // n_employees + 1))
+    for i in range(n_rows):
+        daily = {day: rng.randint(6, 10) for day in DAYS}
+        yield [names[i % n_employees], sum(daily.values()), weeks[i // n_employees], str(daily)]
+
+def write_sheet(path: str, fmt: str, n_rows: int, n_employees: int, seed: int = 42):
+    """Satırları ``csv`` ya da ``xlsx`` olarak yaz"""
+    if fmt == 'csv':
+        import csv
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(generate_rows(n_rows, n_employees, seed))
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(HEADER)
+        for row in generate_rows(n_rows, n_employees, seed):
+            sheet.append(row)
+        workbook.save(path)
@@ -0,0 +1,119 @@
+"""Benchmark'lar için sahte Ollama sunucusu.
+
+/api/generate (stream ve tek parça), /api/embeddings ve /api/embed uç
+noktalarını taklit eder. Bir üretim ``--tokens`` token'dır ve her token
+``--token-latency`` saniye sürer; akışta token'lar bu aralıkla gönderilir.
+Her embedding isteği ``--embed-latency`` saniye bekler (toplu /api/embed
+isteğinde girdi başına). Embedding'ler metnin hash'inden türetilen
+deterministik ``--dim`` boyutlu vektörlerdir.
+
+Kullanım:
+    python benchmarks/fake_ollama.py --port 11999 --tokens 20 --token-latency 0.05
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+def fake_embedding(text: str, dim: int):
+    seed = int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:8], 'little')
+    vector = np.random.default_rng(seed).standard_normal(dim)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Başlık ve gövde ayrı yazıldığında Nagle + gecikmeli ACK her yanıta ~40 ms ekler
+    disable_nagle_algorithm = True
+    token_latency = 0.05
+    embed_latency = 0.0
+    dim = 384
+    tokens = 20
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.path == '/api/generate':
+            self._generate(body)
+        elif self.path == '/api/embed':
+            texts = body.get('input', [])
+            time.sleep(self.embed_latency * len(texts))
+            self._json({"embeddings": [fake_embedding(text, self.dim) for text in texts]})
+        elif self.path == '/api/embeddings':
+            time.sleep(self.embed_latency)
+            self._json({"embedding": fake_embedding(body.get('prompt', ''), self.dim)})
+        else:
+            self.send_error(404)
+
+    def _generate(self, body: dict):
+        prompt = body.get('prompt', '')
+        duration = int(self.tokens * self.token_latency * 1e9)
+        summary = {"done": True, "prompt_eval_count": len(prompt) // 4, "eval_count": self.tokens,
+                   "eval_duration": duration, "load_duration": 0, "total_duration": duration}
+        if not body.get('stream'):
+            time.sleep(self.tokens * self.token_latency)
+            self._json({"response": f"Sahte cevap ({len(prompt)} karakterlik prompt)", **summary})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i in range(self.tokens):
+                time.sleep(self.token_latency)
+                self._chunk({"response": f"t{i} ", "done": False})
+            self._chunk({"response": "", **summary})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci akışı kapattı (Ollama da üretimi durdurur)
+            pass
+
+    def _chunk(self, payload: dict):
+        line = (json.dumps(payload) + "\n").encode('utf-8')
+        self.wfile.write(f"{len(line):x}\r\n".encode('ascii') + line + b"\r\n")
+        self.wfile.flush()
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Yük testlerinde yüzlerce eşzamanlı bağlantı
+    request_queue_size = 1024
+
+def serve(port: int, tokens: int = 20, token_latency: float = 0.05, embed_latency: float = 0.0,
+          dim: int = 384, background: bool = False) -> ThreadingHTTPServer:
+    """Sunucuyu başlat; ``background`` ise daemon thread'de çalıştırıp döndür"""
+    handler = type('Handler', (FakeOllamaHandler,), {"tokens": tokens, "token_latency": token_latency,
+                                                     "embed_latency": embed_latency, "dim": dim})
+    server = _Server(('127.0.0.1', port), handler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=11999)
+    parser.add_argument('--tokens', type=int, default=20, help="bir üretimdeki token sayısı")
+    parser.add_argument('--token-latency', type=float, default=0.05, help="token başına süre (saniye)")
+    parser.add_argument('--embed-latency', type=float, default=0.0, help="embedding başına süre (saniye)")
+    parser.add_argument('--dim', type=int, default=384, help="embedding boyutu")
+    args = parser.parse_args()
+    print(f"Sahte Ollama 127.0.0.1:{args.port} ({args.tokens} token × {args.token_latency}s, "
+          f"embedding {args.embed_latency}s, boyut {args.dim})")
+    serve(args.port, args.tokens, args.token_latency, args.embed_latency, args.dim)
+
+if __name__ == '__main__':
+    main()
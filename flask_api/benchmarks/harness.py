@@ -0,0 +1,180 @@
+"""Benchmark'ların ortak parçaları.
+
+- API ve sahte Ollama'yı ayrı süreç olarak başlatma/durdurma
+- süreç ağacının RSS ölçümü (psutil)
+- yüzlerce eşzamanlı istek için ham asyncio HTTP/1.1 istemcisi
+- gecikme özetleri (p50/p95/p99, throughput)
+"""
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def tree_rss(pid: int) -> int:
+    """Süreç ve tüm alt süreçlerinin (gunicorn worker'ları) toplam RSS'i"""
+    try:
+        process = psutil.Process(pid)
+        processes = [process] + process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0
+    total = 0
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+class RssSampler:
+    """Ölçüm süresince süreç ağacının en yüksek RSS'ini örnekler"""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} {timeout}s içinde hazır olmadı")
+
+def start_fake_ollama(port: int, tokens: int = 20, token_latency: float = 0.05,
+                      embed_latency: float = 0.0, dim: int = 384) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_ollama.py'),
+                                '--port', str(port), '--tokens', str(tokens), '--token-latency', str(token_latency),
+                                '--embed-latency', str(embed_latency), '--dim', str(dim)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            httpx.post(f"http://127.0.0.1:{port}/api/embeddings", json={"prompt": "hazır mı"}, timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Sahte Ollama başlatılamadı")
+
+def server_command(mode: str, port: int, workers: int = 1, threads: int = 16, asgi_server: str = 'hypercorn') -> List[str]:
+    """sync: Dockerfile'daki gunicorn gthread komutu; async: asgi.py"""
+    bind = f"127.0.0.1:{port}"
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '--bind', bind, '--timeout', '300', '--worker-class', 'gthread',
+                '--workers', str(workers), '--threads', str(threads), '--backlog', '2048', 'app:create_app()']
+    if asgi_server == 'uvicorn':
+        return [sys.executable, '-m', 'uvicorn', '--host', '127.0.0.1', '--port', str(port),
+                '--log-level', 'warning', '--backlog', '2048', 'asgi:app']
+    return [sys.executable, '-m', 'hypercorn', '--bind', bind, '--backlog', '2048', 'asgi:app']
+
+def start_server(command: List[str], env: Dict[str, str], port: int, log_path: str = None) -> subprocess.Popen:
+    log = open(log_path, 'ab') if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=log, start_new_session=True)
+    wait_ready(f"http://127.0.0.1:{port}/health")
+    return process
+
+def stop_server(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+async def http_request(port: int, method: str, path: str, payload: Any = None) -> Tuple[int, bytes]:
+    """Tek bağlantılık ham HTTP/1.1 isteği: (durum kodu, gövde).
+
+    httpx'in bağlantı havuzu yüzlerce eşzamanlı istekte istemci tarafında
+    darboğaz olduğundan yük üretici bilerek en basit istemciyi kullanır.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n"
+        if payload is not None:
+            head += "Content-Type: application/json\r\n"
+        writer.write(head.encode('ascii') + b"\r\n" + body)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        response = await reader.read()
+        return status, response.split(b"\r\n\r\n", 1)[-1]
+    finally:
+        writer.close()
+
+async def run_requests(port: int, make_request: Callable[[int], Tuple[str, str, Any]],
+                       total: int, concurrency: int) -> Dict[str, Any]:
+    """``total`` isteği ``concurrency`` eşzamanlı istemciyle gönder ve özetle.
+
+    ``make_request(i)`` i. isteğin (method, path, payload) üçlüsünü döndürür.
+    """
+    latencies, statuses = [], {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            method, path, payload = make_request(i)
+            started = time.perf_counter()
+            try:
+                status, _ = await http_request(port, method, path, payload)
+            except (OSError, ValueError, IndexError) as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, statuses)
+
+def summarize(latencies: List[float], elapsed: float, statuses: Optional[Dict[Any, int]] = None) -> Dict[str, Any]:
+    samples = np.array(latencies) * 1000
+    statuses = statuses or {}
+    return {
+        "requests": len(latencies),
+        "ok": sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "seconds": round(elapsed, 2),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50Ms": round(float(np.percentile(samples, 50)), 2) if len(samples) else None,
+        "p95Ms": round(float(np.percentile(samples, 95)), 2) if len(samples) else None,
+        "p99Ms": round(float(np.percentile(samples, 99)), 2) if len(samples) else None
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
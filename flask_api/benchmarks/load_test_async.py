@@ -0,0 +1,118 @@
+"""Senkron (gunicorn gthread) ve async (ASGI) serving modlarının yük testi.
+
+Sahte Ollama'yı (benchmarks/fake_ollama.py, her üretim ``--delay`` saniye)
+ve API'yi iki modda ayrı süreçler olarak başlatır; her eşzamanlılık
+seviyesinde o kadar istemciyle /api/chat (force_llm) çağırır ve şunları
+raporlar:
+
+- throughput ve p50/p95 gecikme,
+- paralel üretim (Little yasası: throughput × üretim süresi) — sunucunun
+  Ollama'da aynı anda kaç üretimi yürütebildiği,
+- süreç ağacının yük altındaki en yüksek RSS'i ve istek başına ek bellek.
+
+Ollama'nın paralel kapasitesi ``--ollama-parallel`` ile
+AI_MAX_CONCURRENT_GENERATIONS'a verilir; kabul kuyruğu en yüksek
+eşzamanlılığı alacak kadar büyütülür. Senkron modda sınır thread sayısıdır
+(fazlası soket kuyruğunda bekler), async modda Ollama kapasitesi; aşan
+istekler kabul kuyruğunda yalnızca bir future olarak bekler.
+
+Kullanım (psutil ve httpx gerekir; async mod için quart):
+    python benchmarks/load_test_async.py --concurrency 16,64,256 --delay 1.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from harness import (RssSampler, run_requests, server_command, start_fake_ollama, start_server,
+                     stop_server, tree_rss)
+
+TOKENS = 8
+
+def bench_mode(mode: str, port: int, env: dict, args) -> list:
+    command = server_command(mode, port, args.sync_workers, args.sync_threads, args.asgi_server)
+    server = start_server(command, env, port)
+    results = []
+    try:
+        def chat(tag):
+            return lambda i: ('POST', '/api/chat', {"question": f"{tag} soru {i}: ekip bu ay nasıl çalıştı?",
+                                                    "force_llm": True})
+        # Isınma: import'lar, bağlantı havuzları, embedding cache
+        asyncio.run(run_requests(port, chat(f"{mode} ısınma"), 4, 4))
+        idle = tree_rss(server.pid)
+        for concurrency in args.concurrency:
+            with RssSampler(server.pid) as sampler:
+                result = asyncio.run(run_requests(port, chat(f"{mode} c{concurrency}"),
+                                                  concurrency * args.rounds, concurrency))
+            result.update({
+                "mode": mode,
+                "concurrency": concurrency,
+                "parallelGenerations": round(result["throughput"] * args.delay, 1),
+                "idleRssMb": round(idle / 2**20, 1),
+                "peakRssMb": round(sampler.peak / 2**20, 1),
+                "rssPerRequestKb": round(max(sampler.peak - idle, 0) / concurrency / 1024, 1)
+            })
+            results.append(result)
+            print(f"{mode:5s} c={concurrency:4d}: {result['throughput']:7.2f} istek/s, p50 {result['p50Ms']:8.1f} ms, "
+                  f"p95 {result['p95Ms']:8.1f} ms, paralel {result['parallelGenerations']:6.1f}, "
+                  f"RSS {result['idleRssMb']:.0f}→{result['peakRssMb']:.0f} MB "
+                  f"({result['rssPerRequestKb']:.0f} KB/istek), durumlar {result['statuses']}", flush=True)
+    finally:
+        stop_server(server)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='16,64,256', help="virgülle ayrılmış eşzamanlı istemci sayıları")
+    parser.add_argument('--rounds', type=int, default=2, help="istemci başına ardışık istek")
+    parser.add_argument('--delay', type=float, default=1.0, help="sahte Ollama üretim süresi (saniye)")
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--ollama-parallel', type=int, default=64, help="Ollama'ya aynı anda giden en fazla üretim")
+    parser.add_argument('--sync-workers', type=int, default=1)
+    parser.add_argument('--sync-threads', type=int, default=16)
+    parser.add_argument('--asgi-server', choices=['hypercorn', 'uvicorn'], default='hypercorn')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--ollama-port', type=int, default=11995)
+    parser.add_argument('--output', help="sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(',')]
+    queue = str(max(args.concurrency) * 2)
+
+    workdir = tempfile.mkdtemp(prefix='load_test_async_')
+    env = {
+        **os.environ,
+        "AI_SERVICE_URL": f"http://127.0.0.1:{args.ollama_port}",
+        # Qdrant yok: vektör araması yerel indeksten
+        "QDRANT_URL": "http://127.0.0.1:1",
+        "LOCAL_INDEX_POLICY": "always",
+        "EMPLOYEES_SNAPSHOT_PATH": os.path.join(workdir, 'employees.snap'),
+        "EMPLOYEES_JSON_PATH": os.path.join(workdir, 'employees.json'),
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, 'embeddings.db'),
+        "UPLOAD_JOBS_DIR": os.path.join(workdir, 'jobs'),
+        # Embedding'ler için üretimin üstünde birkaç slot
+        "AI_MAX_CONCURRENCY": str(args.ollama_parallel + 8),
+        "AI_MAX_CONCURRENT_GENERATIONS": str(args.ollama_parallel),
+        "AI_POOL_SIZE": str(args.ollama_parallel + 8),
+        "AI_ADMISSION_QUEUE_SIZE": queue,
+        "ASGI_ADMISSION_QUEUE_SIZE": queue,
+        "AI_ADMISSION_QUEUE_TIMEOUT": "600",
+    }
+    ollama = start_fake_ollama(args.ollama_port, tokens=TOKENS, token_latency=args.delay / TOKENS)
+    results = []
+    try:
+        for mode in args.modes.split(','):
+            results += bench_mode(mode, args.port, env, args)
+    finally:
+        ollama.terminate()
+        ollama.wait(timeout=10)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"delay": args.delay, "rounds": args.rounds, "ollamaParallel": args.ollama_parallel,
+                       "syncWorkers": args.sync_workers, "syncThreads": args.sync_threads, "results": results},
+                      f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
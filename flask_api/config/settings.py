@@ -9,16 +9,100 @@ class Config:
     DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
     # Qdrant Configuration
+    # http(s)://host:port[/önek]; ağsız yerel mod için ':memory:' veya 'path:<dizin>'
     QDRANT_URL = os.getenv('QDRANT_URL', 'http://192.168.2.191:6333')
+    QDRANT_API_KEY = os.getenv('QDRANT_API_KEY')
+    # gRPC (6334): aynı istekler için daha küçük mesajlar ve daha az CPU; worker başına tek kanal
+    QDRANT_PREFER_GRPC = os.getenv('QDRANT_PREFER_GRPC', 'False').lower() == 'true'
+    QDRANT_GRPC_PORT = int(os.getenv('QDRANT_GRPC_PORT', 6334))
+    # İstemci istek zaman aşımı ve işlem başına sunucu tarafı zaman aşımları (saniye)
+    QDRANT_TIMEOUT = int(os.getenv('QDRANT_TIMEOUT', 10))
+    QDRANT_SEARCH_TIMEOUT = int(os.getenv('QDRANT_SEARCH_TIMEOUT', 5))
+    QDRANT_WRITE_TIMEOUT = int(os.getenv('QDRANT_WRITE_TIMEOUT', 30))
     QDRANT_COLLECTION = os.getenv('QDRANT_COLLECTION', 'mesai')
-    QDRANT_VECTOR_SIZE = 384
-    QDRANT_DISTANCE = "Cosine"
+    # Embedding modelinin boyutu: all-minilm 384, mxbai-embed-large 1024
+    QDRANT_VECTOR_SIZE = int(os.getenv('QDRANT_VECTOR_SIZE', 384))
+    QDRANT_DISTANCE = os.getenv('QDRANT_DISTANCE', 'Cosine')
+    # Yeni koleksiyonların depolama/indeks profili: latency, memory veya bulk-load
+    # (services/collection_profiles.py); aramalar da bu profile göre yapılır
+    QDRANT_COLLECTION_PROFILE = os.getenv('QDRANT_COLLECTION_PROFILE', 'latency')
+    QDRANT_HNSW_M = int(os.getenv('QDRANT_HNSW_M', 16))
+    QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv('QDRANT_HNSW_EF_CONSTRUCT', 128))
+    # Arama anındaki HNSW ef (0: Qdrant varsayılanı)
+    QDRANT_SEARCH_HNSW_EF = int(os.getenv('QDRANT_SEARCH_HNSW_EF', 0))
+    # memory profili: int8 niceleme dilimi ve yeniden skorlamadaki aday çarpanı
+    QDRANT_QUANTIZATION_QUANTILE = float(os.getenv('QDRANT_QUANTIZATION_QUANTILE', 0.99))
+    QDRANT_RESCORE_OVERSAMPLING = float(os.getenv('QDRANT_RESCORE_OVERSAMPLING', 2.0))
+    # Ertelenmiş indekslemeden sonra geri açılan eşik (KB)
+    QDRANT_INDEXING_THRESHOLD = int(os.getenv('QDRANT_INDEXING_THRESHOLD', 20000))
+    # Alias senkronizasyonunda yeni koleksiyon yüklenirken HNSW kurulumu ertelensin mi
+    QDRANT_SYNC_DEFER_INDEXING = os.getenv('QDRANT_SYNC_DEFER_INDEXING', 'True').lower() == 'true'
+    # Ertelenmiş indeksin kurulmasını (koleksiyon yeşil) en fazla kaç saniye bekle
+    QDRANT_INDEX_WAIT_TIMEOUT = float(os.getenv('QDRANT_INDEX_WAIT_TIMEOUT', 600))
+    # scroll ile tek istekte okunan nokta sayısı (istemci varsayılanı 10)
+    QDRANT_SCROLL_PAGE_SIZE = int(os.getenv('QDRANT_SCROLL_PAGE_SIZE', 1000))
+    # /api/employees sayfa boyutu (?limit=) varsayılanı ve üst sınırı
+    EMPLOYEES_PAGE_SIZE = int(os.getenv('EMPLOYEES_PAGE_SIZE', 100))
+    EMPLOYEES_MAX_PAGE_SIZE = int(os.getenv('EMPLOYEES_MAX_PAGE_SIZE', 1000))
+
+    # Çalışan snapshot'ı ayarları
+    # Birincil kaynak: mmap ile açılan sütunsal ikili dosya
+    EMPLOYEES_SNAPSHOT_PATH = os.getenv('EMPLOYEES_SNAPSHOT_PATH', 'employees.snap')
+    # employees.json yalnızca hata ayıklama çıktısıdır (ve eski kurulumlar için okunur)
+    EMPLOYEES_JSON_PATH = os.getenv('EMPLOYEES_JSON_PATH', 'employees.json')
+    EMPLOYEES_JSON_EXPORT = os.getenv('EMPLOYEES_JSON_EXPORT', 'False').lower() == 'true'
+    # Dosya sürümünün (mtime) en fazla kaç saniyede bir kontrol edileceği
+    EMPLOYEE_SNAPSHOT_CHECK_INTERVAL = float(os.getenv('EMPLOYEE_SNAPSHOT_CHECK_INTERVAL', 2.0))
+    # CRUD değişiklikleri değişiklik günlüğüne yazılır; snapshot son değişiklikten
+    # bu kadar saniye sonra Qdrant'tan bir kez yeniden yazılır (günlük sıkıştırılır)
+    EMPLOYEE_SNAPSHOT_COMPACT_DELAY = float(os.getenv('EMPLOYEE_SNAPSHOT_COMPACT_DELAY', 30.0))
+    # Fazla mesai hesabı için haftalık standart çalışma süresi (saat)
+    STANDARD_WEEKLY_HOURS = float(os.getenv('STANDARD_WEEKLY_HOURS', 45))
     
     # AI Service Configuration
     # Production'da Ollama localhost'ta çalışacak
     AI_SERVICE_URL = os.getenv('AI_SERVICE_URL', 'http://192.168.2.191:11434')
     AI_SERVICE_MODEL = os.getenv('AI_SERVICE_MODEL', 'llama3')
     AI_TIMEOUT = 300  # 5 dakika gibi bir değer ver
+
+    # AI Service HTTP transport ayarları
+    # Worker başına keep-alive bağlantı havuzu boyutu
+    AI_POOL_SIZE = int(os.getenv('AI_POOL_SIZE', 10))
+    # (connect, read) zaman aşımları - saniye
+    AI_CHAT_CONNECT_TIMEOUT = float(os.getenv('AI_CHAT_CONNECT_TIMEOUT', 3.05))
+    AI_CHAT_READ_TIMEOUT = float(os.getenv('AI_CHAT_READ_TIMEOUT', AI_TIMEOUT))
+    AI_EMBEDDING_CONNECT_TIMEOUT = float(os.getenv('AI_EMBEDDING_CONNECT_TIMEOUT', 2.0))
+    AI_EMBEDDING_READ_TIMEOUT = float(os.getenv('AI_EMBEDDING_READ_TIMEOUT', 30.0))
+    # Embedding çağrıları için jitter'lı yeniden deneme
+    AI_EMBEDDING_RETRIES = int(os.getenv('AI_EMBEDDING_RETRIES', 2))
+    AI_RETRY_BACKOFF = float(os.getenv('AI_RETRY_BACKOFF', 0.2))
+    AI_RETRY_BACKOFF_MAX = float(os.getenv('AI_RETRY_BACKOFF_MAX', 2.0))
+    # Devre kesici: art arda kaç hatada açılsın, kaç saniye sonra tekrar denensin
+    AI_BREAKER_FAILURE_THRESHOLD = int(os.getenv('AI_BREAKER_FAILURE_THRESHOLD', 5))
+    AI_BREAKER_RESET_TIMEOUT = float(os.getenv('AI_BREAKER_RESET_TIMEOUT', 30.0))
+
+    # Toplu yükleme (Excel) ayarları
+    # Tek /api/embed isteğindeki metin sayısı
+    AI_EMBEDDING_BATCH_SIZE = int(os.getenv('AI_EMBEDDING_BATCH_SIZE', 64))
+    # /api/embed yoksa paralel tekli embedding çağrısı sayısı
+    AI_EMBEDDING_WORKERS = int(os.getenv('AI_EMBEDDING_WORKERS', 4))
+    # Tek upsert isteğindeki Qdrant noktası sayısı
+    QDRANT_UPSERT_BATCH_SIZE = int(os.getenv('QDRANT_UPSERT_BATCH_SIZE', 256))
+    # Excel senkronizasyon modu:
+    #   alias   - yeni fiziksel koleksiyon hazırla, alias'ı atomik çevir (varsayılan;
+    #             eski kurulumlar bir kez scripts/migrate_collection.py ile dönüştürülür)
+    #   diff    - yalnızca değişenleri canlı koleksiyona yaz, silinenleri kaldır
+    #             (Qdrant okuyucuları yükleme sürerken yarım uygulanmış veriyi görür)
+    #   replace - koleksiyonu sıfırla ve herkesi yeniden ekle (eski davranış)
+    UPLOAD_SYNC_MODE = os.getenv('UPLOAD_SYNC_MODE', 'alias')
+    # Dosyadan tek seferde okunan satır sayısı
+    INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', 20000))
+    # True ise hatalı satırlar atlanıp raporlanır, False ise yükleme 400 ile reddedilir
+    UPLOAD_SKIP_BAD_ROWS = os.getenv('UPLOAD_SKIP_BAD_ROWS', 'False').lower() == 'true'
+    # Arka plan yükleme işleri: durum dosyaları ve yüklenen dosyalar burada tutulur
+    # (tüm gunicorn worker'ları aynı dizini görmelidir)
+    UPLOAD_JOBS_DIR = os.getenv('UPLOAD_JOBS_DIR', 'cache/jobs')
+    UPLOAD_JOB_WORKERS = int(os.getenv('UPLOAD_JOB_WORKERS', 1))
     
     # CORS Configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://192.168.2.191:3000').split(',')
@@ -30,4 +114,103 @@ class Config:
     # Embedding (vektör) modeli için varsayılan: all-minilm (Ollama'da yüklü olmalı)
     AI_EMBEDDING_MODEL = os.getenv('AI_EMBEDDING_MODEL', 'all-minilm')
     # Chat (sohbet/generate) modeli için varsayılan: mistral:7b (Ollama'da yüklü olmalı)
-    AI_CHAT_MODEL = os.getenv('AI_CHAT_MODEL', 'llama3') 
\ No newline at end of file
+    AI_CHAT_MODEL = os.getenv('AI_CHAT_MODEL', 'llama3')
+
+    # Embedding cache (bellek LRU + SQLite disk katmanı)
+    EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'True').lower() == 'true'
+    EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', 'cache/embeddings.db')
+    EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv('EMBEDDING_CACHE_MEMORY_SIZE', 10000))
+    EMBEDDING_CACHE_MAX_ROWS = int(os.getenv('EMBEDDING_CACHE_MAX_ROWS', 200000))
+
+    # /api/chat yanıt cache'i
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', 1000))
+    ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', 600))
+    # Anlamsal katman: soru embedding'i bu kosinüs eşiğini geçerse cache'teki yanıt kullanılır
+    ANSWER_CACHE_SEMANTIC = os.getenv('ANSWER_CACHE_SEMANTIC', 'False').lower() == 'true'
+    ANSWER_CACHE_SEMANTIC_THRESHOLD = float(os.getenv('ANSWER_CACHE_SEMANTIC_THRESHOLD', 0.95))
+
+    # Süreç içi vektör indeksi (snapshot vektörleri): fallback | slo | small | always | off
+    LOCAL_INDEX_POLICY = os.getenv('LOCAL_INDEX_POLICY', 'fallback')
+    LOCAL_INDEX_SLO_MS = float(os.getenv('LOCAL_INDEX_SLO_MS', 150))
+    LOCAL_INDEX_PROBE_INTERVAL = float(os.getenv('LOCAL_INDEX_PROBE_INTERVAL', 30))
+    LOCAL_INDEX_SMALL_MAX = int(os.getenv('LOCAL_INDEX_SMALL_MAX', 50000))
+    # Bu boyuttan büyük snapshot'larda hnswlib kuruluysa HNSW grafiği kurulur (0 = kapalı)
+    LOCAL_INDEX_HNSW_MIN_SIZE = int(os.getenv('LOCAL_INDEX_HNSW_MIN_SIZE', 200000))
+    LOCAL_INDEX_HNSW_M = int(os.getenv('LOCAL_INDEX_HNSW_M', 16))
+    LOCAL_INDEX_HNSW_EF_CONSTRUCTION = int(os.getenv('LOCAL_INDEX_HNSW_EF_CONSTRUCTION', 200))
+    LOCAL_INDEX_HNSW_EF = int(os.getenv('LOCAL_INDEX_HNSW_EF', 256))
+
+    # Chat bağlamı getirme hattı (sözcüksel + vektör, RRF ile birleştirme)
+    RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', 5))
+    # Her aşamadan birleştirmeye giren aday sayısı
+    RETRIEVAL_CANDIDATES = int(os.getenv('RETRIEVAL_CANDIDATES', 50))
+    # Vektör sonuçları için en düşük kosinüs benzerliği
+    RETRIEVAL_SCORE_THRESHOLD = float(os.getenv('RETRIEVAL_SCORE_THRESHOLD', 0.7))
+    RETRIEVAL_RRF_K = int(os.getenv('RETRIEVAL_RRF_K', 60))
+    RETRIEVAL_USE_VECTOR = os.getenv('RETRIEVAL_USE_VECTOR', 'True').lower() == 'true'
+    # Bu uzunluktaki ve daha uzun sorgu kelimeleri önek olarak da eşleşir
+    RETRIEVAL_PREFIX_MIN_LENGTH = int(os.getenv('RETRIEVAL_PREFIX_MIN_LENGTH', 3))
+    # Önek eşleşmesinin tam eşleşmeye göre ağırlığı
+    RETRIEVAL_PREFIX_WEIGHT = float(os.getenv('RETRIEVAL_PREFIX_WEIGHT', 0.5))
+
+    # Sorudaki isimlerin çalışanlara eşlenmesi
+    NAME_RESOLVER_MIN_CONFIDENCE = float(os.getenv('NAME_RESOLVER_MIN_CONFIDENCE', 0.5))
+    # Bu uzunluktaki ve daha uzun kelimeler isim önekleriyle de eşleşir ("ahm" → "ahmet")
+    NAME_RESOLVER_PREFIX_MIN_LENGTH = int(os.getenv('NAME_RESOLVER_PREFIX_MIN_LENGTH', 3))
+    # Bir önekin genişletilebileceği en fazla token sayısı
+    NAME_RESOLVER_MAX_EXPANSIONS = int(os.getenv('NAME_RESOLVER_MAX_EXPANSIONS', 50))
+    # Bundan fazla çalışanla eşleşen token aday üretmez, yalnızca diğer token'ların adaylarını puanlar
+    NAME_RESOLVER_MAX_CANDIDATES = int(os.getenv('NAME_RESOLVER_MAX_CANDIDATES', 256))
+    # Yazım hatası eşleşmesi için en düşük trigram (Dice) benzerliği
+    NAME_RESOLVER_MIN_SIMILARITY = float(os.getenv('NAME_RESOLVER_MIN_SIMILARITY', 0.5))
+
+    # Sayısal soruların LLM'siz hızlı yolu (false: her soru LLM'e gider)
+    QUERY_ROUTER_ENABLED = os.getenv('QUERY_ROUTER_ENABLED', 'true').lower() == 'true'
+    # Hızlı yolda bir ismin kabul edilmesi için gereken en düşük güven
+    QUERY_ROUTER_MIN_CONFIDENCE = float(os.getenv('QUERY_ROUTER_MIN_CONFIDENCE', 0.85))
+    # Karşılaştırmada en fazla kişi; daha fazlası LLM'e gider
+    QUERY_ROUTER_MAX_EMPLOYEES = int(os.getenv('QUERY_ROUTER_MAX_EMPLOYEES', 5))
+    QUERY_ROUTER_TOP_N_DEFAULT = int(os.getenv('QUERY_ROUTER_TOP_N_DEFAULT', 5))
+    QUERY_ROUTER_TOP_N_MAX = int(os.getenv('QUERY_ROUTER_TOP_N_MAX', 50))
+
+    # Chat prompt'undaki veri tablosu için token bütçesi (talimatlar ve soru hariç)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 400))
+    # Token tahmini: bir kelime parçasının ortalama karakter sayısı (llama3, Türkçe metin)
+    CONTEXT_CHARS_PER_TOKEN = float(os.getenv('CONTEXT_CHARS_PER_TOKEN', 3.0))
+    # Bütçe kalırsa son haftanın günlük saatleri de eklenir
+    CONTEXT_DAILY_DETAIL = os.getenv('CONTEXT_DAILY_DETAIL', 'true').lower() == 'true'
+    # Modelin (ve talimat öneki KV cache'inin) Ollama'da bellekte tutulma süresi
+    AI_KEEP_ALIVE = os.getenv('AI_KEEP_ALIVE', '30m')
+
+    # Ollama kabul kontrolü (süreç başına): toplam eşzamanlı çağrı ve bunun üretime ayrılabilecek kısmı
+    AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 4))
+    AI_MAX_CONCURRENT_GENERATIONS = int(os.getenv('AI_MAX_CONCURRENT_GENERATIONS', 2))
+    # Bekleme kuyruğu doluysa 429, kuyrukta bu kadar saniye beklenirse 503 döner
+    AI_ADMISSION_QUEUE_SIZE = int(os.getenv('AI_ADMISSION_QUEUE_SIZE', 32))
+    AI_ADMISSION_QUEUE_TIMEOUT = float(os.getenv('AI_ADMISSION_QUEUE_TIMEOUT', 30))
+    # Aynı prompt/metin için eşzamanlı istekler tek Ollama çağrısını paylaşır
+    AI_SINGLE_FLIGHT = os.getenv('AI_SINGLE_FLIGHT', 'true').lower() == 'true'
+
+    # ASGI modu (asgi.py): bekleyen async istek yalnızca bir future tuttuğu için kuyruk daha uzun olabilir
+    ASGI_ADMISSION_QUEUE_SIZE = int(os.getenv('ASGI_ADMISSION_QUEUE_SIZE', 512))
+    # WSGI tarafına (yükleme dahil) giden istek gövdesi sınırı (bayt)
+    ASGI_MAX_BODY_SIZE = int(os.getenv('ASGI_MAX_BODY_SIZE', 50 * 1024 * 1024))
+
+    # Prometheus /metrics (çok süreçli gunicorn'da PROMETHEUS_MULTIPROC_DIR gunicorn.conf.py'de ayarlanır)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+
+    # İstek profilleme (X-Profile başlığı/?profile= + X-Admin-Token ya da örnekleme oranı)
+    PROFILING_ADMIN_TOKEN = os.getenv('PROFILING_ADMIN_TOKEN', '')
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0.0))
+    # Biten profiller burada tutulur (tüm gunicorn worker'ları aynı dizini görmelidir)
+    PROFILING_DIR = os.getenv('PROFILING_DIR', 'cache/profiles')
+    PROFILING_BUFFER_SIZE = int(os.getenv('PROFILING_BUFFER_SIZE', 200))
+    PROFILING_MAX_SPANS = int(os.getenv('PROFILING_MAX_SPANS', 2000))
+    PROFILING_CPU_INTERVAL_MS = float(os.getenv('PROFILING_CPU_INTERVAL_MS', 5))
+    PROFILING_CPU_MAX_STACKS = int(os.getenv('PROFILING_CPU_MAX_STACKS', 500))
+
+    # Başlangıç: açılıştan sonra arka planda ısınma (Qdrant, snapshot, indeksler, Ollama modelleri)
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'True').lower() == 'true'
+    WARMUP_OLLAMA = os.getenv('WARMUP_OLLAMA', 'True').lower() == 'true'
+    # gunicorn preload_app: ısınma master'da değil fork'tan sonra worker'da (gunicorn.conf.py açar)
+    WARMUP_AFTER_FORK = os.getenv('WARMUP_AFTER_FORK', 'False').lower() == 'true'
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""chat, chat/stream, chat/context ve embedding view'larının async (Quart) sürümleri.
+
+ASGI modunda (asgi.py) bu yollar buraya, diğer tüm yollar WSGI Flask
+uygulamasına gider. Yanıt biçimleri chat_controller ile aynıdır; Ollama ve
+Qdrant çağrıları await edilir, bellekteki snapshot üzerindeki işler (isim
+çözümleme, hızlı yol, bağlam tablosu) doğrudan çalışır.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from quart import Blueprint, Response, jsonify, request
+from config.settings import Config
+from controllers.chat_controller import _sse, build_chat_prompt
+from services.admission import Overloaded
+from services import metrics, profiling
+from services.answer_cache import answer_cache
+from services.async_ai import async_ai_service
+from services.context_builder import context_builder
+from services.employee_store import employee_store
+from services.qdrant_service import qdrant_service
+from services.query_router import query_router
+from services.retrieval import retriever
+from models.employee import ChatRequest, ChatResponse, EmbeddingRequest, EmbeddingResponse, ContextRequest, ContextResponse
+
+logger = logging.getLogger(__name__)
+
+async_chat_bp = Blueprint('async_chat', __name__)
+
+async def retrieve(question: str, embedding: Optional[List[float]] = None) -> Tuple[Dict[str, Any], Optional[List[float]]]:
+    """retriever.retrieve'ın async karşılığı; (sonuç, başarılı soru embedding'i).
+
+    Embedding ve vektör araması await edilir, isim/sözcüksel aşamalar ve
+    birleştirme senkron hatta bırakılır.
+    """
+    vector_hits, timings = [], {}
+    if Config.RETRIEVAL_USE_VECTOR:
+        stage = time.perf_counter()
+        if embedding is None:
+            with profiling.span("retrieve.embedding"):
+                result = await async_ai_service.generate_embedding(question)
+            # Fallback (rastgele) vektörle arama yapılmaz
+            embedding = result["embedding"] if result.get("success") else None
+        timings['embedding'] = round((time.perf_counter() - stage) * 1000, 2)
+        if embedding is not None:
+            stage = time.perf_counter()
+            with profiling.span("retrieve.vector"):
+                vector_hits = await qdrant_service.vector_search_async(
+                    embedding, limit=max(Config.RETRIEVAL_TOP_K, Config.RETRIEVAL_CANDIDATES),
+                    score_threshold=Config.RETRIEVAL_SCORE_THRESHOLD
+                )
+            timings['vector'] = round((time.perf_counter() - stage) * 1000, 2)
+    # Eksik çalışanları Qdrant'tan çekme ve snapshot/indeks yenileme bloklayıcıdır
+    result = await asyncio.to_thread(retriever.retrieve, question, vector_hits=vector_hits)
+    result["timings"].update(timings)
+    return result, embedding
+
+async def _prepare(question: str):
+    """Bağlam, yanıt cache'i ve prompt: (cache'teki yanıt, durum, context anahtarı, embedding, prompt)"""
+    result, embedding = await retrieve(question)
+    veri_ozet = context_builder.build(question, result["hits"])["text"]
+    context_key = answer_cache.context_key(veri_ozet, employee_store.get().revision)
+    if not answer_cache.semantic:
+        embedding = None
+    elif embedding is None:
+        # Vektör aşaması kapalıysa anlamsal cache için ayrıca embed et
+        embedding_result = await async_ai_service.generate_embedding(question)
+        embedding = embedding_result["embedding"] if embedding_result["success"] else None
+    answer, status = answer_cache.get(question, context_key, embedding)
+    return answer, status, context_key, embedding, build_chat_prompt(question, veri_ozet)
+
+@async_chat_bp.route('/chat', methods=['POST'])
+async def chat():
+    """Chat completion endpoint (async)"""
+    try:
+        data = await request.get_json()
+        chat_request = ChatRequest(**data)
+
+        with profiling.span("route"):
+            routed = await asyncio.to_thread(query_router.route, chat_request.question, force_llm=chat_request.force_llm)
+        if routed is not None:
+            response = ChatResponse(answer=routed["answer"], success=True, intent=routed["intent"])
+            return jsonify(response.dict()), 200, {"X-Answer-Route": "fast"}
+
+        with profiling.span("context"):
+            cached_answer, cache_status, context_key, embedding, prompt = await _prepare(chat_request.question)
+        if cached_answer is not None:
+            response = ChatResponse(answer=cached_answer, success=True)
+            return jsonify(response.dict()), 200, {"X-Answer-Cache": cache_status, "X-Answer-Route": "llm"}
+
+        with profiling.span("llm", promptChars=len(prompt)):
+            result = await async_ai_service.generate_completion(prompt)
+        if result["success"]:
+            answer_cache.put(chat_request.question, context_key, result["answer"], embedding)
+
+        response = ChatResponse(
+            answer=result["answer"],
+            success=result["success"],
+            error=result.get("error")
+        )
+        return jsonify(response.dict()), 200, {"X-Answer-Cache": cache_status, "X-Answer-Route": "llm"}
+
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Async Chat Controller Error: {e}")
+        return jsonify({
+            "answer": "Bir hata oluştu",
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@async_chat_bp.route('/chat/stream', methods=['POST'])
+async def chat_stream():
+    """Chat completion endpoint (async SSE token akışı)"""
+    try:
+        data = await request.get_json()
+        chat_request = ChatRequest(**data)
+        with profiling.span("route"):
+            routed = await asyncio.to_thread(query_router.route, chat_request.question, force_llm=chat_request.force_llm)
+        cached_answer, cache_status, events = None, "BYPASS", None
+        if routed is None:
+            with profiling.span("context"):
+                cached_answer, cache_status, context_key, embedding, prompt = await _prepare(chat_request.question)
+            if cached_answer is None:
+                # Slot yanıt başlamadan alınır; kuyruk doluysa istemci SSE yerine 429/503 görür
+                events = await async_ai_service.stream_completion(prompt)
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Async Chat Stream Controller Error: {e}")
+        return jsonify({
+            "answer": "Bir hata oluştu",
+            "success": False,
+            "error": str(e)
+        }), 500
+
+    async def generate():
+        if routed is not None:
+            yield _sse("token", {"token": routed["answer"]})
+            yield _sse("done", {"success": True, "cached": False, "intent": routed["intent"], "total_time": 0.0})
+            return
+        if cached_answer is not None:
+            yield _sse("token", {"token": cached_answer})
+            yield _sse("done", {"success": True, "cached": True, "total_time": 0.0})
+            return
+        tokens = []
+        try:
+            async for event in events:
+                event_type = event.pop("type")
+                if event_type == "token":
+                    tokens.append(event["token"])
+                elif event_type == "done":
+                    answer_cache.put(chat_request.question, context_key, "".join(tokens), embedding)
+                yield _sse(event_type, event)
+        finally:
+            # İstemci koparsa task iptal edilir; Ollama isteği ve slot bırakılır
+            await events.aclose()
+
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            "X-Answer-Cache": cache_status,
+            "X-Answer-Route": "fast" if routed is not None else "llm",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+    response.timeout = None
+    return response
+
+@async_chat_bp.route('/chat/context', methods=['POST'])
+async def get_context():
+    """Context endpoint (async semantic search)"""
+    try:
+        data = await request.get_json()
+        context_request = ContextRequest(**data)
+
+        result, _ = await retrieve(context_request.query, embedding=context_request.embedding)
+
+        response = ContextResponse(context=result["hits"], timings=result["timings"])
+        return jsonify(response.dict()), 200
+
+    except Exception as e:
+        logger.error(f"Async Context Controller Error: {e}")
+        all_employees = employee_store.get().employees
+        if all_employees:
+            metrics.fallback("all_data")
+        return jsonify({
+            "context": all_employees,
+            "success": False,
+            "error": "FALLBACK_TO_ALL_DATA" if all_employees else str(e)
+        }), 200 if all_employees else 500
+
+@async_chat_bp.route('/embedding', methods=['POST'])
+async def generate_embedding():
+    """Embedding endpoint (async)"""
+    try:
+        data = await request.get_json()
+        embedding_request = EmbeddingRequest(**data)
+
+        result = await async_ai_service.generate_embedding(embedding_request.text)
+
+        response = EmbeddingResponse(
+            embedding=result["embedding"],
+            success=result["success"],
+            error=result.get("error")
+        )
+        return jsonify(response.dict()), 200
+
+    except Exception as e:
+        logger.error(f"Async Embedding Controller Error: {e}")
+        metrics.fallback("random_embedding")
+        return jsonify({
+            "embedding": list(np.random.random(qdrant_service.vector_size)),
+            "success": False,
+            "error": "EMBEDDING_FALLBACK"
+        }), 200
@@ -1,96 +1,75 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from services.ai_service import ai_service
+from services.admission import Overloaded
+from services import metrics, profiling
 from services.qdrant_service import qdrant_service
+from services.employee_store import employee_store
+from services.answer_cache import answer_cache
+from services.retrieval import retriever
+from services.query_router import query_router
+from services.context_builder import CHAT_INSTRUCTIONS, context_builder
 from models.employee import ChatRequest, ChatResponse, EmbeddingRequest, EmbeddingResponse, ContextRequest, ContextResponse
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 chat_bp = Blueprint('chat', __name__)
 
+def build_chat_context(question: str) -> str:
+    """Soruyla en ilgili çalışanlardan prompt'a girecek, token bütçesine sığan veri tablosunu oluştur"""
+    # Sözcüksel (isim/tarih) ve vektör sonuçlarını birleştiren hat;
+    # hiçbir eşleşme yoksa ilgisiz bir çalışan yerine boş bağlam kullanılır
+    hits = retriever.retrieve(question)["hits"]
+    return context_builder.build(question, hits)["text"]
+
+def build_chat_prompt(question: str, veri_ozet: str = None) -> str:
+    """Sorudan ve çalışan snapshot'ından LLM prompt'unu oluştur"""
+    if veri_ozet is None:
+        veri_ozet = build_chat_context(question)
+    return f"{CHAT_INSTRUCTIONS}\n\nVeriler: {veri_ozet}\n\nSoru: {question}\nCevap:"
+
+def _lookup_answer(question: str, veri_ozet: str):
+    """Yanıt cache'ine bak; (yanıt, durum, context anahtarı, soru embedding'i) döndür"""
+    context_key = answer_cache.context_key(veri_ozet, employee_store.get().revision)
+    embedding = None
+    if answer_cache.semantic:
+        embedding_result = ai_service.generate_embedding(question)
+        # Fallback (rastgele) vektörlerle anlamsal eşleşme yapılmaz
+        if embedding_result["success"]:
+            embedding = embedding_result["embedding"]
+    answer, status = answer_cache.get(question, context_key, embedding)
+    return answer, status, context_key, embedding
+
 @chat_bp.route('/chat', methods=['POST'])
 def chat():
     """Chat completion endpoint"""
     try:
-        import json
-        import re
         data = request.get_json()
         chat_request = ChatRequest(**data)
 
-        # employees.json'dan verileri oku
-        with open("employees.json", "r", encoding="utf-8") as f:
-            employees = json.load(f)
-
-        # Kullanıcı sorusundan isim(ler) tespit et (birden fazla isim desteği)
-        # Türkçe karakterler dahil, kelime başı büyük/küçük harf duyarsız
-        names = re.findall(r"[A-Za-zÇçĞğİıÖöŞşÜü]+", chat_request.question, re.IGNORECASE)
-        names = [n.lower() for n in names]
-        filtered = []
-        if names:
-            # employees.json'daki isimlerde geçenlerden sadece soruda geçenleri al
-            for name in names:
-                filtered += [emp for emp in employees if name in emp.get('isim', '').lower()]
-            # Aynı kişi birden fazla eşleşirse tekrarları kaldır (id ile)
-            unique = {}
-            for emp in filtered:
-                emp_id = emp.get('id')
-                if emp_id is not None:
-                    unique[emp_id] = emp
-                else:
-                    # id yoksa isme göre benzersizleştir
-                    unique[emp.get('isim','').lower()] = emp
-            filtered = list(unique.values())
-        # Eğer filtrelenen yoksa ilk 1 kaydı al
-        if not filtered:
-            filtered = employees[:1]
-
-        # Önemli talimatlar (prompt instructions)
-        instructions = (
-            "ÖNEMLİ TALİMATLAR:\n"
-            "- Cevabını mutlaka Türkçe ver.\n"
-            "- Kullanıcı birden fazla kişiyi veya karşılaştırma sorusu sorduğunda, sadece ilgili kişileri karşılaştır ve diğer kişileri dahil etme\n"
-            "- Her karşılaştırma sorusuna, sadece o sorunun gerektirdiği kişileri ve bilgileri dahil et\n"
-            "- Cevaplar kısa, net ve sadece ilgili kişilere özel olsun\n"
-            "- Tek kişi sorulursa sadece o kişinin bilgilerini ver\n"
-            "- Cevabın kısa ve öz olsun, gereksiz açıklama ve maddeleme yapma\n"
-            "- İsmini, toplam saatini ve günlük saatlerini belirt\n"
-            "- Kısa bir değerlendirme ekle (en fazla 1-2 cümle)\n"
-            "- Verilen verileri tam olarak kullan, değiştirme\n"
-            "- 'Bulamadım' deme, verilen context'te arama yap\n"
-            "- Doğal ve öz yanıt ver, gereksiz tekrarlar yapma\n"
-        )
+        # Sayısal sorular (toplam, son hafta, karşılaştırma...) LLM'siz cevaplanır
+        with profiling.span("route") as stage:
+            routed = query_router.route(chat_request.question, force_llm=chat_request.force_llm)
+            stage.set(fast=routed is not None)
+        if routed is not None:
+            response = ChatResponse(answer=routed["answer"], success=True, intent=routed["intent"])
+            return jsonify(response.dict()), 200, {"X-Answer-Route": "fast"}
 
-        # Sadece temel alanları prompt'a ekle
-        allowed_keys = ['isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai']
-        filtered = [
-            {k: emp[k] for k in allowed_keys if k in emp}
-            for emp in filtered
-        ]
-
-        # Sadece özet bilgiyle prompt hazırla
-        if filtered:
-            employee_data = filtered[0]
-            isim = employee_data['isim']
-            toplam_mesai = sum(employee_data['toplam_mesai']) if isinstance(employee_data['toplam_mesai'], list) else employee_data['toplam_mesai']
-            tarih_araligi = (
-                f"{employee_data['tarih_araligi'][0]} - {employee_data['tarih_araligi'][-1]}"
-                if isinstance(employee_data['tarih_araligi'], list) and len(employee_data['tarih_araligi']) > 1
-                else (employee_data['tarih_araligi'][0] if isinstance(employee_data['tarih_araligi'], list) else employee_data['tarih_araligi'])
-            )
-            son_gunluk_mesai = (
-                employee_data['gunluk_mesai'][-1] if isinstance(employee_data['gunluk_mesai'], list) else employee_data['gunluk_mesai']
-            )
-            veri_ozet = (
-                f"İsim: {isim}\n"
-                f"Toplam Mesai (tüm dönemler): {toplam_mesai}\n"
-                f"Tarih Aralığı: {tarih_araligi}\n"
-                f"Son Günlük Mesai: {son_gunluk_mesai}"
-            )
-        else:
-            veri_ozet = ""
+        with profiling.span("context"):
+            veri_ozet = build_chat_context(chat_request.question)
+        with profiling.span("cache") as stage:
+            cached_answer, cache_status, context_key, embedding = _lookup_answer(chat_request.question, veri_ozet)
+            stage.set(status=cache_status)
+        if cached_answer is not None:
+            response = ChatResponse(answer=cached_answer, success=True)
+            return jsonify(response.dict()), 200, {"X-Answer-Cache": cache_status, "X-Answer-Route": "llm"}
 
-        prompt = f"{instructions}\n\nVeriler: {veri_ozet}\n\nSoru: {chat_request.question}\nCevap:"
-        result = ai_service.generate_completion(prompt)
+        prompt = build_chat_prompt(chat_request.question, veri_ozet)
+        with profiling.span("llm", promptChars=len(prompt)):
+            result = ai_service.generate_completion(prompt)
+        if result["success"]:
+            answer_cache.put(chat_request.question, context_key, result["answer"], embedding)
 
         response = ChatResponse(
             answer=result["answer"],
@@ -98,8 +77,11 @@ def chat():
             error=result.get("error")
         )
 
-        return jsonify(response.dict()), 200 if result["success"] else 200
-        
+        return jsonify(response.dict()), 200, {"X-Answer-Cache": cache_status, "X-Answer-Route": "llm"}
+
+    except Overloaded:
+        # 429/503 + Retry-After app seviyesindeki hata işleyicide üretilir
+        raise
     except Exception as e:
         logger.error(f"Chat Controller Error: {e}")
         return jsonify({
@@ -108,6 +90,78 @@ def chat():
             "error": str(e)
         }), 500
 
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events formatında tek bir olay"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@chat_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Chat completion endpoint (SSE token akışı)"""
+    try:
+        data = request.get_json()
+        chat_request = ChatRequest(**data)
+        with profiling.span("route"):
+            routed = query_router.route(chat_request.question, force_llm=chat_request.force_llm)
+        if routed is None:
+            with profiling.span("context"):
+                veri_ozet = build_chat_context(chat_request.question)
+            with profiling.span("cache"):
+                cached_answer, cache_status, context_key, embedding = _lookup_answer(chat_request.question, veri_ozet)
+            prompt = build_chat_prompt(chat_request.question, veri_ozet)
+        else:
+            cached_answer, cache_status = None, "BYPASS"
+        # Slot yanıt başlamadan alınır; kuyruk doluysa istemci SSE yerine 429/503 görür
+        events = ai_service.stream_completion(prompt) if routed is None and cached_answer is None else None
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Chat Stream Controller Error: {e}")
+        return jsonify({
+            "answer": "Bir hata oluştu",
+            "success": False,
+            "error": str(e)
+        }), 500
+
+    def generate():
+        if routed is not None:
+            yield _sse("token", {"token": routed["answer"]})
+            yield _sse("done", {"success": True, "cached": False, "intent": routed["intent"], "total_time": 0.0})
+            return
+        if cached_answer is not None:
+            yield _sse("token", {"token": cached_answer})
+            yield _sse("done", {"success": True, "cached": True, "total_time": 0.0})
+            return
+        tokens = []
+        try:
+            # Profil akış bitene kadar açık kalır (teardown akıştan sonra çalışır)
+            with profiling.span("llm"):
+                for event in events:
+                    event_type = event.pop("type")
+                    if event_type == "token":
+                        tokens.append(event["token"])
+                    elif event_type == "done":
+                        answer_cache.put(chat_request.question, context_key, "".join(tokens), embedding)
+                    yield _sse(event_type, event)
+        finally:
+            # İstemci bağlantıyı kapatırsa Ollama isteğini de iptal et
+            events.close()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            "X-Answer-Cache": cache_status,
+            "X-Answer-Route": "fast" if routed is not None else "llm",
+            "Cache-Control": "no-cache",
+            # Nginx'in yanıtı tamponlamasını engelle
+            "X-Accel-Buffering": "no"
+        }
+    )
+    if events is not None:
+        # Akış hiç başlamadan bağlantı kapanırsa da slot bırakılsın
+        response.call_on_close(events.close)
+    return response
+
 @chat_bp.route('/chat/context', methods=['POST'])
 def get_context():
     """Context endpoint (semantic search)"""
@@ -115,20 +169,19 @@ def get_context():
         data = request.get_json()
         context_request = ContextRequest(**data)
         
-        context = qdrant_service.search_by_embedding(
-            context_request.embedding, 
-            context_request.query
-        )
+        result = retriever.retrieve(context_request.query, embedding=context_request.embedding)
+        context = result["hits"]
         
-        response = ContextResponse(context=context)
+        response = ContextResponse(context=context, timings=result["timings"])
         return jsonify(response.dict()), 200
         
     except Exception as e:
         logger.error(f"Context Controller Error: {e}")
         
-        # Hata durumunda tüm verileri döndür
+        # Hata durumunda tüm verileri döndür (önce bellekteki snapshot)
         try:
-            all_employees = qdrant_service.list_employees()
+            all_employees = employee_store.get().employees or qdrant_service.list_employees()
+            metrics.fallback("all_data")
             return jsonify({
                 "context": all_employees,
                 "success": False,
@@ -162,8 +215,9 @@ def generate_embedding():
         logger.error(f"Embedding Controller Error: {e}")
         
         # Fallback embedding
+        metrics.fallback("random_embedding")
         import numpy as np
-        fallback_embedding = list(np.random.random(384))
+        fallback_embedding = list(np.random.random(qdrant_service.vector_size))
         
         return jsonify({
             "embedding": fallback_embedding,
@@ -0,0 +1,58 @@
+from flask import Blueprint, Response, request, jsonify
+from services import profiling
+import logging
+
+logger = logging.getLogger(__name__)
+
+debug_bp = Blueprint('debug', __name__)
+
+@debug_bp.before_request
+def require_admin_token():
+    """Profil uçları yalnızca PROFILING_ADMIN_TOKEN ile açılır"""
+    if not profiling.authorized(request.headers.get('X-Admin-Token')):
+        return jsonify({
+            "error": "Forbidden",
+            "message": "Geçerli X-Admin-Token gerekli",
+            "success": False
+        }), 403
+
+@debug_bp.route('/debug/profiles', methods=['GET'])
+def list_profiles():
+    """Tüm worker'ların son profillerinin özetleri (yeniden eskiye)"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 1000)
+        min_ms = request.args.get('minMs')
+        profiles = profiling.recent(limit, name=request.args.get('name'),
+                                    min_ms=float(min_ms) if min_ms is not None else None)
+        return jsonify({
+            "data": profiles,
+            "count": len(profiles),
+            "success": True
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "error": str(e),
+            "success": False
+        }), 400
+
+@debug_bp.route('/debug/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Tek profilin span ağacı; ?format=folded ile CPU örnekleri (flamegraph girdisi)"""
+    profile = profiling.get(profile_id)
+    if profile is None:
+        return jsonify({
+            "error": "Profil bulunamadı (PROFILING_BUFFER_SIZE sınırıyla silinmiş olabilir)",
+            "success": False
+        }), 404
+    if request.args.get('format') == 'folded':
+        stacks = profiling.folded(profile_id)
+        if stacks is None:
+            return jsonify({
+                "error": "Bu profilde CPU örneklemesi yok (X-Profile: cpu ile isteyin)",
+                "success": False
+            }), 404
+        return Response(stacks, mimetype='text/plain')
+    return jsonify({
+        "data": profile,
+        "success": True
+    }), 200
@@ -1,30 +1,50 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from services.qdrant_service import qdrant_service
 from services.ai_service import ai_service
 from models.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
-import logging
-import pandas as pd
-import tempfile
-import os
-import ast
-from scripts.export_qdrant_to_json import export_qdrant_to_json
-import pprint
 import json
+import logging
+from services.employee_stats import employee_stats
+from services.employee_store import employee_store
+from services.upload_jobs import upload_jobs
+from scripts.export_qdrant_to_json import deferred_export
+from config.settings import Config
 
 logger = logging.getLogger(__name__)
 
 employee_bp = Blueprint('employee', __name__)
 
+def _publish_change(op, emp_id=None, isim=None):
+    """CRUD değişikliğini snapshot'ın değişiklik günlüğüne yaz. Her worker
+    bir sonraki kontrolde yalnızca bu satırı okur: isim indeksi kaydı
+    ekler/çıkarır, değişen kayıt Qdrant'tan okunur, yanıt cache anahtarları
+    değişir. Snapshot'ın kendisi değişikliklerden sonra bir kez yeniden yazılır."""
+    try:
+        employee_store.record_change(op, emp_id, isim)
+    except Exception as e:
+        # Qdrant'taki değişiklik geçerli; ertelenmiş export snapshot'ı yine yetiştirir
+        logger.error(f"Değişiklik günlüğe yazılamadı: {e}")
+    deferred_export.schedule()
+
+def _requested_fields():
+    """?fields=isim,toplam_mesai → Qdrant payload seçicisi (boşsa tüm alanlar)"""
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    return [f for f in fields if f != 'id'] or None
+
 @employee_bp.route('/employees', methods=['GET'])
 def get_all_employees():
-    """Tüm çalışanları getir"""
+    """Çalışanları sayfa sayfa getir (?limit=&cursor=&fields=)"""
     try:
-        employees = qdrant_service.list_employees()
+        limit = request.args.get('limit', Config.EMPLOYEES_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, Config.EMPLOYEES_MAX_PAGE_SIZE))
+        cursor = qdrant_service.decode_cursor(request.args.get('cursor'))
+        employees, next_cursor = qdrant_service.scroll_page(limit, cursor, _requested_fields())
         
         return jsonify({
             "data": employees,
             "success": True,
-            "count": len(employees)
+            "count": len(employees),
+            "nextCursor": str(next_cursor) if next_cursor is not None else None
         }), 200
         
     except Exception as e:
@@ -34,6 +54,26 @@ def get_all_employees():
             "success": False
         }), 500
 
+@employee_bp.route('/employees/export', methods=['GET'])
+def export_employees():
+    """Tüm çalışanları NDJSON olarak akıt (satır başına bir çalışan)"""
+    fields = _requested_fields()
+
+    def generate():
+        try:
+            for employee in qdrant_service.iter_employees(fields=fields):
+                yield json.dumps(employee, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # Başlıklar gönderildiği için hata son satır olarak bildirilir
+            logger.error(f"Employees export Error: {e}")
+            yield json.dumps({"success": False, "error": str(e)}, ensure_ascii=False) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={"Content-Disposition": "attachment; filename=employees.ndjson"}
+    )
+
 @employee_bp.route('/employees', methods=['POST'])
 def add_employee():
     """Çalışan ekle"""
@@ -43,8 +83,9 @@ def add_employee():
         employee_data = employee_request.dict()
         # Embedding'i önceden oluştur ve ekle
         embedding_result = ai_service.generate_embedding(employee_data.get('isim', ''))
-        employee_data['vector'] = embedding_result.get('embedding', [0.0]*384)
+        employee_data['vector'] = embedding_result.get('embedding', [0.0] * qdrant_service.vector_size)
         employee = qdrant_service.add_employee(employee_data)
+        _publish_change('upsert', employee['id'], employee.get('isim'))
         return jsonify({"success": True, "message": "Çalışan eklendi"}), 201
     except Exception as e:
         logger.error(f"Employees POST Error: {e}")
@@ -61,6 +102,9 @@ def update_employee(employee_id):
         update_data = {k: v for k, v in employee_request.dict().items() if v is not None}
         
         employee = qdrant_service.update_employee(employee_id, update_data)
+        if employee['id'] != employee_id:
+            _publish_change('delete', employee_id)
+        _publish_change('upsert', employee['id'], employee.get('isim'))
         
         return jsonify({
             "data": employee,
@@ -80,6 +124,7 @@ def delete_employee(employee_id):
     """Çalışan sil"""
     try:
         qdrant_service.delete_employee(employee_id)
+        _publish_change('delete', employee_id)
         
         return jsonify({
             "success": True,
@@ -99,6 +144,7 @@ def delete_all_employees():
     """Tüm çalışanları topluca sil"""
     try:
         qdrant_service.delete_all_employees()
+        _publish_change('clear')
         return jsonify({"success": True, "message": "Tüm çalışanlar silindi."}), 200
     except Exception as e:
         logger.error(f"Tüm çalışanları silme hatası: {e}")
@@ -106,152 +152,111 @@ def delete_all_employees():
 
 @employee_bp.route('/upload-employees', methods=['POST'])
 def upload_employees_from_excel():
-    """Excel dosyasından toplu çalışan ekle"""
+    """Excel dosyasından toplu çalışan ekle (arka plan işi olarak)"""
     try:
-        # Qdrant koleksiyonunu tamamen sil
-        qdrant_service.delete_all_employees()
-        # employees.json dosyasını sil
-        if os.path.exists("employees.json"):
-            os.remove("employees.json")
-
         if 'file' not in request.files:
             return jsonify({"success": False, "error": "Dosya bulunamadı"}), 400
         file = request.files['file']
         if file.filename == '':
             return jsonify({"success": False, "error": "Dosya seçilmedi"}), 400
 
-        # Dosyayı geçici olarak kaydet
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            file.save(tmp.name)
-            tmp_path = tmp.name
-
-        # Excel dosyasını oku
-        df = pd.read_excel(tmp_path)
-        os.unlink(tmp_path)  # Geçici dosyayı sil
-
-        required_columns = {'isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai'}
-        if not required_columns.issubset(df.columns):
-            return jsonify({"success": False, "error": f"Excel başlıkları eksik: {required_columns - set(df.columns)}"}), 400
-
-        # Aynı isimli çalışanları birleştir
-        grouped = {}
-        for idx, row in df.iterrows():
-            # İsim temizliği
-            isim = str(row['isim']).strip().lower()
-            # Tarih aralığı temizliği ve standartlaştırma
-            tarih_raw = str(row['tarih_araligi']).strip()
-            try:
-                # Tarih aralığı ör: '2025-07-07/2025-07-13' veya '07.07.2025/13.07.2025'
-                tarih_parts = tarih_raw.replace('.', '-').split('/')
-                if len(tarih_parts) == 2:
-                    from datetime import datetime
-                    def std_date(s):
-                        s = s.strip()
-                        # Eğer zaten YYYY-MM-DD ise değişmeden dön
-                        if '-' in s and len(s) == 10:
-                            return s
-                        # Eğer DD-MM-YYYY veya DD.MM.YYYY ise çevir
-                        for fmt in ('%d-%m-%Y', '%d.%m.%Y', '%Y-%m-%d'):
-                            try:
-                                return datetime.strptime(s, fmt).strftime('%Y-%m-%d')
-                            except Exception:
-                                continue
-                        return s  # Olmazsa olduğu gibi bırak
-                    tarih_araligi = f"{std_date(tarih_parts[0])}/{std_date(tarih_parts[1])}"
-                else:
-                    tarih_araligi = tarih_raw
-            except Exception as e:
-                tarih_araligi = tarih_raw
-            # Eksik veri kontrolü
-            if not isim or not row['toplam_mesai'] or not tarih_araligi:
-                return jsonify({"success": False, "error": f"Eksik veya hatalı veri: Satır {idx+2} (isim: {isim}, tarih: {tarih_araligi})"}), 400
-            try:
-                gunluk_mesai = row['gunluk_mesai']
-                if isinstance(gunluk_mesai, str):
-                    gunluk_mesai = ast.literal_eval(gunluk_mesai)
-                if not isinstance(gunluk_mesai, dict):
-                    gunluk_mesai = {}
-            except Exception as e:
-                print(f"gunluk_mesai parse hatası: {e}, veri: {row['gunluk_mesai']}")
-                gunluk_mesai = {}
-
-            if isim not in grouped:
-                grouped[isim] = {
-                    'isim': isim,
-                    'toplam_mesai': [],
-                    'tarih_araligi': [],
-                    'gunluk_mesai': []
-                }
-            grouped[isim]['toplam_mesai'].append(int(row['toplam_mesai']))
-            grouped[isim]['tarih_araligi'].append(tarih_araligi)
-            grouped[isim]['gunluk_mesai'].append(gunluk_mesai)
-
-        pprint.pprint(grouped) # Gruplama sonrası print ile kontrol
-
-        added = 0
-        failed = 0
-        failed_rows = []
-        for isim, employee_data in grouped.items():
-            print(f"EKLENECEK: {employee_data}") # Sadece gruplu verileri ekle
-            try:
-                embedding_result = ai_service.generate_embedding(employee_data.get('isim', ''))
-                employee_data['vector'] = embedding_result.get('embedding', [0.0]*384)
-                qdrant_service.add_employee(employee_data)
-                added += 1
-            except Exception as e:
-                print(f"Qdrant ekleme hatası: {e}, veri: {employee_data}")
-                failed += 1
-                failed_rows.append(isim)
-
-        # Qdrant'a ekleme bittikten sonra employees.json'a export et
-        export_qdrant_to_json()
-
-        message = f"{added} çalışan eklendi."
-        if failed > 0:
-            message += f" {failed} satır eklenemedi: {failed_rows}"
-        return jsonify({"success": failed == 0, "message": message}), 200 if failed == 0 else 500
+        # Ayrıştırma, embedding ve senkronizasyon istek thread'i dışında çalışır
+        job = upload_jobs.submit(file)
+        logger.info(f"Yükleme işi kuyruğa alındı: {job['id']} ({file.filename})")
+        response = jsonify({
+            "success": True,
+            "jobId": job['id'],
+            "statusUrl": f"/api/jobs/{job['id']}",
+            "job": job
+        })
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
     except Exception as e:
         logger.error(f"Excel toplu ekleme hatası: {e}")
-        return jsonify({"success": False, "error": str(e)}), 500 
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@employee_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id):
+    """Yükleme işinin durumu (aşama, satır sayaçları, hız, kalan süre)"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "İş bulunamadı"}), 404
+    return jsonify({"success": True, "data": job})
 
+@employee_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_upload_job(job_id):
+    """Yükleme işini iptal et (bir sonraki batch sınırında durur)"""
+    job = upload_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "İş bulunamadı"}), 404
+    return jsonify({"success": True, "data": job}), 202
+
+@employee_bp.route('/employee-stats', methods=['GET'])
 @employee_bp.route('/api/employee-stats', methods=['GET'])
 def get_employee_stats():
     try:
-        # employees.json dosyasını oku
-        if not os.path.exists('employees.json'):
-            return jsonify({"success": False, "error": "Çalışan verileri bulunamadı"}), 404
-        
-        with open('employees.json', 'r', encoding='utf-8') as f:
-            employees = json.load(f)
+        # Snapshot sürümü için önceden hesaplanmış dizilerden oku
+        engine = employee_stats.get()
         
-        if not employees:
+        if not engine.names:
             return jsonify({"success": False, "error": "Çalışan verisi bulunamadı"}), 404
         
-        # İstatistikleri hesapla
-        total_employees = len(employees)
-        total_records = sum(len(emp.get('tarih_araligi', [])) for emp in employees)
-        
-        # Ortalama mesai saatlerini hesapla
-        total_hours = 0
-        total_periods = 0
-        
-        for emp in employees:
-            toplam_mesai_list = emp.get('toplam_mesai', [])
-            if toplam_mesai_list:
-                total_hours += sum(toplam_mesai_list)
-                total_periods += len(toplam_mesai_list)
-        
-        avg_work_hours = round(total_hours / total_periods, 2) if total_periods > 0 else 0
-        
-        stats = {
-            "totalEmployees": total_employees,
-            "totalRecords": total_records,
-            "avgWorkHours": avg_work_hours,
-            "totalWorkHours": total_hours
-        }
-        
-        return jsonify({"success": True, "stats": stats})
+        return jsonify({"success": True, "stats": engine.summary()})
         
     except Exception as e:
-        print(f"İstatistik hesaplama hatası: {e}")
-        return jsonify({"success": False, "error": f"İstatistik hesaplanırken hata oluştu: {str(e)}"}), 500 
\ No newline at end of file
+        logger.error(f"İstatistik hesaplama hatası: {e}")
+        return jsonify({"success": False, "error": f"İstatistik hesaplanırken hata oluştu: {str(e)}"}), 500
+
+@employee_bp.route('/employee-stats/top-overtime', methods=['GET'])
+def get_top_overtime():
+    """Fazla mesaisi en yüksek N çalışan (haftalık STANDARD_WEEKLY_HOURS üzeri)"""
+    try:
+        n = max(1, min(request.args.get('n', 10, type=int), 1000))
+        return jsonify({"success": True, "data": employee_stats.get().top_overtime(n)}), 200
+    except Exception as e:
+        logger.error(f"Top overtime hatası: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@employee_bp.route('/employee-stats/weekdays', methods=['GET'])
+def get_weekday_averages():
+    """Haftanın günlerine göre ortalama mesai"""
+    try:
+        return jsonify({"success": True, "data": employee_stats.get().weekday_averages()}), 200
+    except Exception as e:
+        logger.error(f"Gün ortalaması hatası: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@employee_bp.route('/employee-stats/weekly', methods=['GET'])
+def get_weekly_trend():
+    """Hafta bazında toplam/ortalama mesai ve bir önceki haftaya göre fark"""
+    try:
+        return jsonify({"success": True, "data": employee_stats.get().weekly_trend()}), 200
+    except Exception as e:
+        logger.error(f"Haftalık istatistik hatası: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@employee_bp.route('/employee-stats/percentiles', methods=['GET'])
+def get_percentiles():
+    """Haftalık mesai dağılımının yüzdelikleri (ör. ?p=50,90,99)"""
+    try:
+        points = [float(p) for p in request.args.get('p', '50,90,95,99').split(',') if p.strip()]
+        if any(p < 0 or p > 100 for p in points):
+            return jsonify({"success": False, "error": "Yüzdelik 0-100 arasında olmalı"}), 400
+        return jsonify({"success": True, "data": employee_stats.get().percentiles(points)}), 200
+    except ValueError:
+        return jsonify({"success": False, "error": "Geçersiz yüzdelik değeri"}), 400
+    except Exception as e:
+        logger.error(f"Yüzdelik hesaplama hatası: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@employee_bp.route('/employee-stats/employees/<path:isim>', methods=['GET'])
+def get_employee_detail_stats(isim):
+    """Tek çalışanın haftalık ve gün bazlı istatistikleri"""
+    try:
+        data = employee_stats.get().employee(isim)
+        if data is None:
+            return jsonify({"success": False, "error": "Çalışan bulunamadı"}), 404
+        return jsonify({"success": True, "data": data}), 200
+    except Exception as e:
+        logger.error(f"Çalışan istatistik hatası: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,32 @@
+"""Gunicorn ayarları (gunicorn çalışma dizinindeki bu dosyayı kendiliğinden okur).
+
+Uygulama master süreçte bir kez import edilir (``preload_app``); worker'lar
+hazır kopyayla fork edildiği için açılışları import maliyeti ödemez.
+Qdrant/Ollama bağlantıları ve arka plan ısınması import anında açılmaz,
+fork'tan sonra her worker'da başlar (services/startup.py).
+
+Prometheus metrikleri worker'lar arasında PROMETHEUS_MULTIPROC_DIR
+üzerinden toplanır (services/metrics.py). prometheus_client değişkeni import
+anında okuduğu için değişken burada, uygulama yüklenmeden önce ayarlanır;
+dizin worker'lar açılmadan önce temizlenir.
+"""
+import os
+import shutil
+import tempfile
+
+preload_app = True
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'prometheus_multiproc'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+os.environ.setdefault('WARMUP_AFTER_FORK', 'True')
+
+def on_starting(server):
+    # Eski çalıştırmalardan (ve master'ın import sırasında) kalan metrik dosyaları
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    # Ölen worker'ın canlı gauge'ları (kuyruk, süren çağrılar) toplama katılmasın
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
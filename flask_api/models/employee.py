@@ -26,11 +26,13 @@ class EmployeeResponse(EmployeeBase):
 
 class ChatRequest(BaseModel):
     question: str = Field(..., description="Kullanıcı sorusu")
+    force_llm: bool = Field(False, description="Hızlı yolu atla, soruyu her zaman LLM'e gönder")
 
 class ChatResponse(BaseModel):
     answer: str
     success: bool = True
     error: Optional[str] = None
+    intent: Optional[str] = None
 
 class EmbeddingRequest(BaseModel):
     text: str = Field(..., description="Embedding oluşturulacak metin")
@@ -46,5 +48,6 @@ class ContextRequest(BaseModel):
 
 class ContextResponse(BaseModel):
     context: List[dict]
+    timings: Optional[Dict[str, float]] = None
     success: bool = True
     error: Optional[str] = None 
\ No newline at end of file
@@ -1,15 +1,58 @@
 import sys
 import os
-import json
+import logging
+import threading
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import Config
 from services.qdrant_service import qdrant_service
+from services.employee_store import employee_store
 
-def export_qdrant_to_json(json_path="employees.json"):
+logger = logging.getLogger(__name__)
+
+def export_qdrant_to_json(json_path=None):
+    """Qdrant verisini sütunsal snapshot'a yaz (json_path verilirse JSON da yazılır)"""
+    # Okumaya başlamadan önceki an: bundan önce günlüğe düşen değişiklikler snapshot'ta
+    started = time.time_ns()
     employees = qdrant_service.list_employees()
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(employees, f, ensure_ascii=False, indent=2)
-    print(f"{len(employees)} kayıt {json_path} dosyasına yazıldı.")
+    # Atomik yazım: okuyucular ya eski ya yeni sürümü görür
+    employee_store.write(employees, json_path=json_path, data_version=started)
+    print(f"{len(employees)} kayıt {employee_store.path} dosyasına yazıldı.")
+
+class _DeferredExport:
+    """CRUD değişikliklerinden sonra snapshot'ı tek seferde yeniden yazar.
+
+    Her değişiklik zamanlayıcıyı EMPLOYEE_SNAPSHOT_COMPACT_DELAY kadar öteler;
+    arka arkaya gelen CRUD istekleri tek bir Qdrant okumasıyla snapshot'a yansır.
+    """
+
+    def __init__(self):
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def schedule(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(Config.EMPLOYEE_SNAPSHOT_COMPACT_DELAY, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        if not employee_store.get().changes:
+            # Başka bir worker (ya da yükleme işi) snapshot'ı zaten yeniledi
+            return
+        try:
+            export_qdrant_to_json()
+        except Exception as e:
+            # Değişiklikler günlükte kalır; bir sonraki CRUD yeniden zamanlar
+            logger.error(f"Ertelenmiş snapshot export hatası: {e}")
+
+deferred_export = _DeferredExport()
 
 if __name__ == "__main__":
     print("Qdrant verileri çekiliyor...")
-    export_qdrant_to_json() 
\ No newline at end of file
+    # Komut satırından çalıştırıldığında JSON'u da yaz (hata ayıklama için)
+    export_qdrant_to_json(json_path=sys.argv[1] if len(sys.argv) > 1 else None)
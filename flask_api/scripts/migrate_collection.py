@@ -0,0 +1,156 @@
+"""Bir Qdrant koleksiyonunu başka bir profile (services/collection_profiles.py) taşı.
+
+Noktalar vektörleri ve payload'larıyla batch'ler halinde yeni bir fiziksel
+koleksiyona kopyalanır; nokta sayısı ve örnek sorgularla recall doğrulanır,
+ardından alias (QDRANT_COLLECTION) tek atomik işlemle yeni koleksiyona
+çevrilir. API alias adını kullandığı için geçiş kesintisizdir; eski
+koleksiyon ``--keep-old`` verilmezse alias çevrildikten sonra silinir.
+
+QDRANT_COLLECTION henüz alias değil de gerçek bir koleksiyonsa Qdrant aynı
+adda alias oluşturamaz. Bu tek seferlik dönüştürme ``--convert-collection``
+ile açıkça istenmelidir: kopya doğrulandıktan sonra eski koleksiyon silinip
+alias hemen oluşturulur; arada kısa bir kesinti olur ve eski koleksiyon
+saklanamaz (``--keep-old`` ile birlikte verilemez). Sonraki geçişler kesintisizdir.
+
+Kullanım:
+    python scripts/migrate_collection.py --profile memory
+    python scripts/migrate_collection.py --profile memory --convert-collection
+    python scripts/migrate_collection.py --profile memory --defer-indexing --batch-size 1000
+    python scripts/migrate_collection.py --profile latency --no-swap --keep-old
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from config.settings import Config
+from services import collection_profiles
+from services.qdrant_service import AliasConversionRequired, qdrant_service
+
+def measure_recall(source: str, target: str, profile, queries: int, k: int):
+    """Kaynaktaki örnek vektörlerle: kaynakta tam arama ve hedefte profil aramasının örtüşmesi"""
+    from qdrant_client.models import SearchParams
+    client = qdrant_service.client
+    points, _ = client.scroll(collection_name=source, limit=queries, with_payload=False, with_vectors=True)
+    search_params = collection_profiles.search_params(profile)
+    recall, latencies = [], []
+    for point in points:
+        expected = {p.id for p in client.query_points(source, query=point.vector, limit=k,
+                                                      search_params=SearchParams(exact=True)).points}
+        started = time.perf_counter()
+        found = client.query_points(target, query=point.vector, limit=k, search_params=search_params).points
+        latencies.append(time.perf_counter() - started)
+        if expected:
+            recall.append(len({p.id for p in found} & expected) / len(expected))
+    if not latencies:
+        return None
+    return {
+        "queries": len(latencies),
+        f"recall@{k}": round(float(np.mean(recall)), 4) if recall else None,
+        "p50Ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95Ms": round(float(np.percentile(latencies, 95)) * 1000, 2)
+    }
+
+def migrate(args) -> int:
+    alias = args.alias
+    convert = False
+    if not args.no_swap:
+        try:
+            qdrant_service.require_alias(alias)
+        except AliasConversionRequired as e:
+            if not args.convert_collection:
+                print(e)
+                return 1
+            if args.keep_old:
+                print(f"'{alias}' alias'a dönüştürülürken eski koleksiyon saklanamaz; --keep-old ile "
+                      f"dönüştürme yapılmaz (önce --no-swap ile bir yedek kopya alın)")
+                return 1
+            convert = True
+    source = args.source or qdrant_service.get_alias_target(alias) or alias
+    source_info = qdrant_service.collection_info(source)
+    profile = collection_profiles.get(args.profile, defer_indexing=True if args.defer_indexing else None)
+    target = args.target or f"{alias}_{int(time.time() * 1000)}"
+    print(f"'{source}' ({source_info['points']} nokta, {source_info['vectorSize']} boyut) → "
+          f"'{target}' (profil: {profile['name']})")
+
+    if not qdrant_service.create_collection(target, profile=profile, vector_size=source_info['vectorSize']):
+        print("Hedef koleksiyon oluşturulamadı.")
+        return 1
+    started = time.perf_counter()
+    total = source_info['points'] or 0
+
+    def progress(copied: int):
+        rate = copied / max(time.perf_counter() - started, 1e-9)
+        print(f"  {copied}/{total} nokta kopyalandı ({rate:.0f} nokta/s)", flush=True)
+
+    try:
+        copied = qdrant_service.copy_points(source, target, batch_size=args.batch_size, on_batch=progress)
+        copy_seconds = time.perf_counter() - started
+        if profile['defer_indexing']:
+            print("İndeksleme açılıyor...")
+            qdrant_service.finalize_collection(target, profile)
+        target_info = qdrant_service.collection_info(target)
+        if target_info['points'] != source_info['points']:
+            raise RuntimeError(f"Nokta sayısı tutmuyor: kaynak {source_info['points']}, hedef {target_info['points']}")
+    except (Exception, KeyboardInterrupt) as e:
+        # Yarım koleksiyon yayınlanmaz
+        print(f"Taşıma başarısız, '{target}' siliniyor: {e}")
+        qdrant_service.client.delete_collection(target)
+        return 1
+
+    report = {
+        "source": {"name": source, **source_info},
+        "target": {"name": target, "profile": profile['name'], **target_info},
+        "copied": copied,
+        "copySeconds": round(copy_seconds, 2),
+        "totalSeconds": round(time.perf_counter() - started, 2),
+        "estimatedRamBytes": collection_profiles.estimate_ram_bytes(profile, copied, target_info['vectorSize']),
+        "search": measure_recall(source, target, profile, args.verify, args.k) if args.verify else None
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.no_swap:
+        print(f"Alias değiştirilmedi; yeni koleksiyon: '{target}'")
+        return 0
+    if convert:
+        print(f"'{alias}' koleksiyonu alias'a dönüştürülüyor (veri '{target}' içinde, kısa kesinti)")
+        try:
+            qdrant_service.convert_to_alias(alias, target)
+        except AliasConversionRequired as e:
+            print(f"{e}; '{target}' siliniyor")
+            qdrant_service.client.delete_collection(target)
+            return 1
+        print(f"Alias '{alias}' → '{target}'")
+        return 0
+    old_target = qdrant_service.publish_collection(alias, target, keep_old=args.keep_old)
+    print(f"Alias '{alias}' → '{target}'")
+    if old_target and old_target != target:
+        print(f"Eski koleksiyon '{old_target}' {'saklandı' if args.keep_old else 'silindi'}.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', required=True, choices=list(collection_profiles.PROFILES))
+    parser.add_argument('--alias', default=Config.QDRANT_COLLECTION, help="Çevrilecek alias (API'nin kullandığı ad)")
+    parser.add_argument('--source', default=None, help="Boşsa alias'ın hedefi (alias yoksa aynı adlı koleksiyon)")
+    parser.add_argument('--target', default=None, help="Boşsa <alias>_<zaman damgası>")
+    parser.add_argument('--batch-size', type=int, default=Config.QDRANT_UPSERT_BATCH_SIZE)
+    parser.add_argument('--defer-indexing', action='store_true',
+                        help="Kopyalama bitene kadar HNSW kurma (bulk-load profilinde zaten açık)")
+    parser.add_argument('--verify', type=int, default=50, help="Recall için örnek sorgu sayısı (0: atla)")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--no-swap', action='store_true', help="Alias'ı çevirme, yalnızca kopyala ve ölç")
+    parser.add_argument('--keep-old', action='store_true', help="Alias'ın eski hedefini silme")
+    parser.add_argument('--convert-collection', action='store_true',
+                        help="Alias adındaki gerçek koleksiyonu bir kez alias'a dönüştür (kısa kesinti)")
+    try:
+        code = migrate(parser.parse_args())
+    finally:
+        qdrant_service.client.close()
+    sys.exit(code)
+
+if __name__ == '__main__':
+    main()
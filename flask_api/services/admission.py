@@ -0,0 +1,380 @@
+"""Ollama çağrıları için kabul kontrolü (admission control).
+
+- SingleFlight: aynı anahtarla (model + prompt/metin) süren bir çağrı varsa
+  yeni çağıran upstream'e gitmez, ilk çağrının sonucunu bekler.
+- AdmissionController: toplam eşzamanlı çağrı sınırı, türe göre ek sınır
+  (ör. üretim en fazla AI_MAX_CONCURRENT_GENERATIONS slot kullanır, kalan
+  slotlar embedding'lere açık kalır) ve öncelikli, sınırlı bir bekleme
+  kuyruğu. Kuyruk doluysa Overloaded(429), kuyrukta AI_ADMISSION_QUEUE_TIMEOUT
+  saniyeden uzun beklenirse Overloaded(503) fırlatılır.
+
+Sınırlar süreç başınadır; gunicorn gthread worker'ı ile tek süreçteki tüm
+istekler aynı kuyruğu paylaşır. ASGI modunda (asgi.py) async view'lar aynı
+kuyruğu ``acquire_async`` ile kullanır; bekleyen bir async istek thread değil
+yalnızca bir future tutar.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional
+from config.settings import Config
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Küçük sayı önce: etkileşimli embedding'ler üretimin, toplu işler ikisinin de arkasında
+PRIORITIES = {"embed": 0, "generate": 1, "batch": 2}
+
+class Overloaded(Exception):
+    """Ollama kuyruğu dolu (429) veya bekleme süresi aşıldı (503)"""
+
+    def __init__(self, status: int, retry_after: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class _AsyncEvent:
+    """threading.Event yerine geçen, event loop'u bloklamadan beklenebilen olay.
+
+    ``set`` kilit altında herhangi bir thread'den çağrılabilir.
+    """
+
+    __slots__ = ('_loop', '_future')
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._future = self._loop.create_future()
+
+    def set(self):
+        self._loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self._future.done():
+            self._future.set_result(True)
+
+    async def wait(self, timeout: Optional[float]) -> bool:
+        try:
+            await asyncio.wait_for(asyncio.shield(self._future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+class _Waiter:
+    __slots__ = ('kind', 'event', 'granted', 'enqueued_at')
+
+    def __init__(self, kind: str, event=None):
+        self.kind = kind
+        self.event = event or threading.Event()
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+class Ticket:
+    """Alınmış bir slot; release birden çok kez çağrılabilir"""
+
+    __slots__ = ('_controller', 'kind', '_started', '_released')
+
+    def __init__(self, controller: 'AdmissionController', kind: str):
+        self._controller = controller
+        self.kind = kind
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(self.kind, (time.monotonic() - self._started) * 1000)
+
+class AdmittedStream:
+    """Slot'u akış bitince ya da kapatılınca (hiç başlamamış olsa bile) bırakan iterator"""
+
+    def __init__(self, events: Iterator, ticket: Ticket):
+        self._events = events
+        self._ticket = ticket
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._events)
+        except StopIteration:
+            self._ticket.release()
+            raise
+
+    def close(self):
+        try:
+            self._events.close()
+        finally:
+            self._ticket.release()
+
+class AsyncAdmittedStream:
+    """AdmittedStream'in async iterator karşılığı"""
+
+    def __init__(self, events, ticket: Ticket):
+        self._events = events
+        self._ticket = ticket
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._events.__anext__()
+        except StopAsyncIteration:
+            self._ticket.release()
+            raise
+
+    async def aclose(self):
+        try:
+            # Upstream bağlantı jeneratörün 'async with' bloğunda kapanır
+            await self._events.aclose()
+        finally:
+            self._ticket.release()
+
+class AdmissionController:
+    """Öncelikli, sınırlı kuyruklu eşzamanlılık sınırlayıcı"""
+
+    def __init__(self, limit: int = None, kind_limits: Dict[str, int] = None,
+                 max_queue: int = None, queue_timeout: float = None):
+        self.limit = limit or Config.AI_MAX_CONCURRENCY
+        self.kind_limits = kind_limits if kind_limits is not None else {"generate": Config.AI_MAX_CONCURRENT_GENERATIONS}
+        self.max_queue = Config.AI_ADMISSION_QUEUE_SIZE if max_queue is None else max_queue
+        self.queue_timeout = Config.AI_ADMISSION_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self._lock = threading.Lock()
+        self._queue = []  # (öncelik, sıra, _Waiter)
+        self._seq = itertools.count()
+        self._running = {kind: 0 for kind in PRIORITIES}
+        self._stats = {kind: {"admitted": 0, "rejected": 0, "timedOut": 0, "waitMsTotal": 0.0,
+                              "waitMsMax": 0.0, "completed": 0, "serviceMsTotal": 0.0} for kind in PRIORITIES}
+
+    def _has_capacity(self, kind: str) -> bool:
+        if sum(self._running.values()) >= self.limit:
+            return False
+        kind_limit = self.kind_limits.get(kind)
+        return kind_limit is None or self._running[kind] < kind_limit
+
+    def _dispatch(self):
+        """Boşalan slotları öncelik sırasıyla uygun bekleyenlere ver (kilit altında)"""
+        skipped = []
+        while self._queue and sum(self._running.values()) < self.limit:
+            item = heapq.heappop(self._queue)
+            waiter = item[2]
+            if self._has_capacity(waiter.kind):
+                self._grant(waiter)
+            else:
+                # Türünün sınırı dolu; daha düşük öncelikli ama başka türden bekleyenler geçebilir
+                skipped.append(item)
+        for item in skipped:
+            heapq.heappush(self._queue, item)
+
+    def _grant(self, waiter: _Waiter):
+        waiter.granted = True
+        self._running[waiter.kind] += 1
+        stats = self._stats[waiter.kind]
+        waited = (time.monotonic() - waiter.enqueued_at) * 1000
+        metrics.ADMISSION_QUEUED.labels(waiter.kind).dec()
+        metrics.ADMISSION_RUNNING.labels(waiter.kind).inc()
+        metrics.ADMISSION_WAIT.labels(waiter.kind).observe(waited / 1000)
+        stats["admitted"] += 1
+        stats["waitMsTotal"] += waited
+        stats["waitMsMax"] = max(stats["waitMsMax"], waited)
+        waiter.event.set()
+
+    def retry_after(self, kind: str) -> int:
+        """Kuyruğun boşalması için tahmini süre (saniye)"""
+        stats = self._stats[kind]
+        service_s = stats["serviceMsTotal"] / stats["completed"] / 1000 if stats["completed"] else 5.0
+        capacity = min(self.limit, self.kind_limits.get(kind) or self.limit)
+        return max(1, math.ceil(service_s * (len(self._queue) + 1) / capacity))
+
+    def _enqueue(self, waiter: _Waiter, timeout: Optional[float]):
+        with self._lock:
+            if timeout is not None and len(self._queue) >= self.max_queue and not self._has_capacity(waiter.kind):
+                self._stats[waiter.kind]["rejected"] += 1
+                metrics.ADMISSION_REJECTED.labels(waiter.kind, "queue_full").inc()
+                raise Overloaded(429, self.retry_after(waiter.kind), "AI servisi kuyruğu dolu")
+            heapq.heappush(self._queue, (PRIORITIES[waiter.kind], next(self._seq), waiter))
+            metrics.ADMISSION_QUEUED.labels(waiter.kind).inc()
+            self._dispatch()
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Bekleyeni kuyruktan çıkar; slot bu arada verilmişse False"""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._queue = [item for item in self._queue if item[2] is not waiter]
+            heapq.heapify(self._queue)
+            metrics.ADMISSION_QUEUED.labels(waiter.kind).dec()
+            return True
+
+    def _timed_out(self, kind: str) -> Overloaded:
+        with self._lock:
+            self._stats[kind]["timedOut"] += 1
+            metrics.ADMISSION_REJECTED.labels(kind, "timeout").inc()
+            return Overloaded(503, self.retry_after(kind), "AI servisi kuyrukta zaman aşımı")
+
+    def acquire(self, kind: str, timeout: Optional[float] = -1) -> 'Ticket':
+        """Slot alınana kadar bekle; ``timeout=None`` sınırsız bekler (toplu işler)"""
+        timeout = self.queue_timeout if timeout == -1 else timeout
+        waiter = _Waiter(kind)
+        self._enqueue(waiter, timeout)
+        if not waiter.event.wait(timeout) and self._abandon(waiter):
+            raise self._timed_out(kind)
+        return Ticket(self, kind)
+
+    async def acquire_async(self, kind: str, timeout: Optional[float] = -1) -> 'Ticket':
+        """``acquire``'ın event loop'u bloklamayan sürümü.
+
+        İstek iptal edilirse (istemci bağlantıyı kapattığında) bekleyen kuyruktan
+        çıkarılır; slot o arada verilmişse geri bırakılır.
+        """
+        timeout = self.queue_timeout if timeout == -1 else timeout
+        waiter = _Waiter(kind, _AsyncEvent())
+        self._enqueue(waiter, timeout)
+        try:
+            granted = await waiter.event.wait(timeout)
+        except asyncio.CancelledError:
+            if not self._abandon(waiter):
+                Ticket(self, kind).release()
+            raise
+        if not granted and self._abandon(waiter):
+            raise self._timed_out(kind)
+        return Ticket(self, kind)
+
+    def _release(self, kind: str, service_ms: float):
+        with self._lock:
+            self._running[kind] -= 1
+            self._stats[kind]["completed"] += 1
+            metrics.ADMISSION_RUNNING.labels(kind).dec()
+            self._stats[kind]["serviceMsTotal"] += service_ms
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, kind: str, timeout: Optional[float] = -1):
+        ticket = self.acquire(kind, timeout)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    @asynccontextmanager
+    async def slot_async(self, kind: str, timeout: Optional[float] = -1):
+        ticket = await self.acquire_async(kind, timeout)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = {kind: 0 for kind in PRIORITIES}
+            for _, _, waiter in self._queue:
+                queued[waiter.kind] += 1
+            kinds = {}
+            for kind, stats in self._stats.items():
+                admitted = stats["admitted"]
+                kinds[kind] = {
+                    "running": self._running[kind],
+                    "queued": queued[kind],
+                    "admitted": admitted,
+                    "rejected": stats["rejected"],
+                    "timedOut": stats["timedOut"],
+                    "avgWaitMs": round(stats["waitMsTotal"] / admitted, 2) if admitted else 0.0,
+                    "maxWaitMs": round(stats["waitMsMax"], 2),
+                    "avgServiceMs": round(stats["serviceMsTotal"] / stats["completed"], 2) if stats["completed"] else 0.0
+                }
+            return {
+                "limit": self.limit,
+                "kindLimits": dict(self.kind_limits),
+                "maxQueue": self.max_queue,
+                "queueDepth": len(self._queue),
+                "kinds": kinds
+            }
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Aynı anahtarlı eşzamanlı çağrıları tek çağrıda birleştirir"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "inFlight": len(self._calls),
+            "sharedRate": round(self.shared / self.calls, 3) if self.calls else 0.0
+        }
+
+class AsyncSingleFlight:
+    """SingleFlight'ın tek event loop içindeki async karşılığı.
+
+    Ortak çağrı ayrı bir task'ta yürür; ilk çağıranın iptal edilmesi
+    sonucu bekleyen diğer istekleri etkilemez.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "inFlight": len(self._tasks),
+            "sharedRate": round(self.shared / self.calls, 3) if self.calls else 0.0
+        }
@@ -1,8 +1,16 @@
 import requests
+import json
 import logging
+import threading
+import time
 import numpy as np
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Iterator, Optional
 from config.settings import Config
+from services.ai_transport import AITransport, CircuitOpenError
+from services.embedding_cache import EmbeddingCache
+from services.admission import AdmissionController, AdmittedStream, Overloaded, SingleFlight
+from services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -12,22 +20,65 @@ class AIService:
         self.embedding_model = getattr(Config, "AI_EMBEDDING_MODEL", "all-minilm")
         self.chat_model = getattr(Config, "AI_CHAT_MODEL", "llama3")
         self.timeout = Config.AI_TIMEOUT
-        
+        # (connect, read) zaman aşımları: chat uzun üretim, embedding kısa çağrı
+        self.chat_timeout = (Config.AI_CHAT_CONNECT_TIMEOUT, Config.AI_CHAT_READ_TIMEOUT)
+        self.embedding_timeout = (Config.AI_EMBEDDING_CONNECT_TIMEOUT, Config.AI_EMBEDDING_READ_TIMEOUT)
+        self.transport = AITransport(self.base_url)
+        # Ollama'nın çoklu girdili /api/embed uç noktası (eski sürümlerde yok)
+        self._batch_embed_supported = True
+        # Deterministik embedding sonuçları için (model, metin) anahtarlı cache;
+        # SQLite bağlantısı import anında değil ilk kullanımda (fork'tan sonra) açılır
+        self._embedding_cache = None
+        self._embedding_cache_lock = threading.Lock()
+        # Eşzamanlılık sınırı, öncelikli kuyruk ve aynı istekleri birleştirme
+        self.admission = AdmissionController()
+        self.single_flight = SingleFlight()
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        if not Config.EMBEDDING_CACHE_ENABLED:
+            return None
+        if self._embedding_cache is None:
+            with self._embedding_cache_lock:
+                if self._embedding_cache is None:
+                    self._embedding_cache = EmbeddingCache(self.embedding_model)
+        return self._embedding_cache
+
+    def _coalesce(self, key: tuple, fn):
+        if not Config.AI_SINGLE_FLIGHT:
+            return fn()
+        return self.single_flight.do(key, fn)
+
     def generate_completion(self, prompt: str) -> Dict[str, Any]:
-        """Chat completion"""
+        """Chat completion.
+
+        Aynı prompt için süren bir istek varsa onun sonucu paylaşılır. Kuyruk
+        doluysa veya beklerken zaman aşılırsa Overloaded fırlatılır.
+        """
+        return self._coalesce(("generate", self.chat_model, prompt), lambda: self._admitted_completion(prompt))
+
+    def _admitted_completion(self, prompt: str) -> Dict[str, Any]:
+        with self.admission.slot("generate"):
+            return self._request_completion(prompt)
+
+    def _request_completion(self, prompt: str) -> Dict[str, Any]:
+        """Ollama'dan tek completion iste"""
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.chat_model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            with metrics.ollama_call("generate"):
+                response = self.transport.post(
+                    "/api/generate",
+                    {
+                        "model": self.chat_model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "keep_alive": Config.AI_KEEP_ALIVE
+                    },
+                    timeout=self.chat_timeout
+                )
+                response.raise_for_status()
+                
+                data = response.json()
+                metrics.record_generation(data)
             answer = (
                 data.get('response') or data.get('text') or str(data)
             )
@@ -36,6 +87,12 @@ class AIService:
                 "answer": answer,
                 "success": True
             }
+        except CircuitOpenError:
+            return {
+                "answer": "Üzgünüm, AI servisi şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin.",
+                "success": False,
+                "error": "AI_SERVICE_CIRCUIT_OPEN"
+            }
         except requests.exceptions.ConnectionError:
             logger.error("AI Service connection failed")
             return {
@@ -58,20 +115,132 @@ class AIService:
                 "error": str(e)
             }
     
+    def stream_completion(self, prompt: str) -> Iterator[Dict[str, Any]]:
+        """Chat completion (stream).
+
+        Ollama'nın NDJSON token akışını olay sözlükleri olarak döndürür:
+        ``{"type": "token", "token": ...}`` ve en sonda ``{"type": "done", ...}``
+        özeti. Tüketici jeneratörü kapatırsa (istemci bağlantısı koptuğunda)
+        upstream bağlantı da kapatılır ve Ollama üretimi durdurur.
+
+        Slot çağrı anında alınır (kuyruk doluysa Overloaded burada fırlatılır)
+        ve akış bitince ya da kapatılınca bırakılır.
+        """
+        ticket = self.admission.acquire("generate")
+        return AdmittedStream(self._stream_completion(prompt), ticket)
+
+    def _stream_completion(self, prompt: str) -> Iterator[Dict[str, Any]]:
+        started = time.time()
+        response = None
+        with metrics.ollama_call("generate_stream") as call:
+            try:
+                response = self.transport.post(
+                    "/api/generate",
+                    {
+                        "model": self.chat_model,
+                        "prompt": prompt,
+                        "stream": True,
+                        "keep_alive": Config.AI_KEEP_ALIVE
+                    },
+                    timeout=self.chat_timeout,
+                    stream=True
+                )
+                response.raise_for_status()
+
+                first_token_at = None
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        raise RuntimeError(chunk['error'])
+                    token = chunk.get('response', '')
+                    if token:
+                        if first_token_at is None:
+                            first_token_at = time.time()
+                        yield {"type": "token", "token": token}
+                    if chunk.get('done'):
+                        metrics.record_generation(chunk)
+                        yield {
+                            "type": "done",
+                            "success": True,
+                            "total_time": round(time.time() - started, 3),
+                            "time_to_first_token": round(first_token_at - started, 3) if first_token_at else None,
+                            "total_duration": chunk.get('total_duration'),
+                            "load_duration": chunk.get('load_duration'),
+                            "prompt_eval_count": chunk.get('prompt_eval_count'),
+                            "prompt_eval_duration": chunk.get('prompt_eval_duration'),
+                            "eval_count": chunk.get('eval_count'),
+                            "eval_duration": chunk.get('eval_duration')
+                        }
+                        return
+                # Ollama 'done' göndermeden kapattı: yanıt yarım, cache'e yazılmamalı
+                call.failed = True
+                logger.error("AI Service stream 'done' olmadan kapandı")
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_INCOMPLETE",
+                       "answer": "AI servisi yanıtı tamamlamadan kesildi. Lütfen tekrar deneyin."}
+            except CircuitOpenError:
+                call.failed = True
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_CIRCUIT_OPEN",
+                       "answer": "Üzgünüm, AI servisi şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin."}
+            except requests.exceptions.ConnectionError:
+                call.failed = True
+                logger.error("AI Service connection failed (stream)")
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_UNAVAILABLE",
+                       "answer": "Üzgünüm, AI servisi şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin."}
+            except requests.exceptions.Timeout:
+                call.failed = True
+                logger.error("AI Service timeout (stream)")
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_TIMEOUT",
+                       "answer": "AI servisi yanıt vermiyor. Lütfen daha sonra tekrar deneyin."}
+            except Exception as e:
+                call.failed = True
+                logger.error(f"AI Service Stream Error: {e}")
+                yield {"type": "error", "success": False, "error": str(e),
+                       "answer": f"AI servisinde hata: {e}"}
+            finally:
+                # GeneratorExit dahil her durumda upstream isteği iptal et
+                if response is not None:
+                    response.close()
+
     def generate_embedding(self, text: str) -> Dict[str, Any]:
         """Embedding oluştur"""
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                return {"embedding": cached, "success": True, "cached": True}
+        result = self._coalesce(("embed", self.embedding_model, text), lambda: self._admitted_embedding(text))
+        # Fallback (rastgele) vektörler asla cache'lenmez
+        if result["success"] and self.embedding_cache is not None:
+            self.embedding_cache.put(text, result["embedding"])
+        return result
+
+    def _admitted_embedding(self, text: str, kind: str = "embed") -> Dict[str, Any]:
         try:
-            response = requests.post(
-                f"{self.base_url}/api/embeddings",
-                json={
-                    "model": self.embedding_model,
-                    "prompt": text  # Ollama için 'prompt' kullanılmalı!
-                },
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            # Toplu işler (yükleme) kuyrukta sınırsız bekler, etkileşimli istekler reddedilebilir
+            with self.admission.slot(kind, timeout=None if kind == "batch" else -1):
+                return self._request_embedding(text)
+        except Overloaded as e:
+            logger.warning(f"Embedding isteği kabul edilmedi: {e}")
+            return self._generate_fallback_embedding("EMBEDDING_OVERLOADED")
+
+    def _request_embedding(self, text: str) -> Dict[str, Any]:
+        """Ollama'dan tek embedding iste (cache'siz)"""
+        try:
+            with metrics.ollama_call("embeddings"):
+                # Embedding idempotent olduğu için geçici hatalarda tekrar denenir
+                response = self.transport.post(
+                    "/api/embeddings",
+                    {
+                        "model": self.embedding_model,
+                        "prompt": text  # Ollama için 'prompt' kullanılmalı!
+                    },
+                    timeout=self.embedding_timeout,
+                    retries=Config.AI_EMBEDDING_RETRIES
+                )
+                response.raise_for_status()
+                
+                data = response.json()
             embedding = data.get('embedding', [])
             
             # Embedding boyutunu kontrol et
@@ -82,6 +251,8 @@ class AIService:
                 "embedding": embedding,
                 "success": True
             }
+        except CircuitOpenError:
+            return self._generate_fallback_embedding("EMBEDDING_CIRCUIT_OPEN")
         except requests.exceptions.ConnectionError:
             logger.error("AI Service connection failed for embedding")
             return self._generate_fallback_embedding("EMBEDDING_CONNECTION_ERROR")
@@ -92,8 +263,105 @@ class AIService:
             logger.error(f"Embedding API Error: {e}")
             return self._generate_fallback_embedding("EMBEDDING_ERROR")
     
+    def generate_embeddings(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Toplu embedding oluştur (sonuçlar girdilerle aynı sırada).
+
+        Önce tek istekte Ollama'nın çoklu girdili ``/api/embed`` uç noktası
+        denenir; desteklenmiyorsa sınırlı bir worker havuzu ile tek tek
+        ``generate_embedding`` çağrılır. Cache'te bulunan metinler Ollama'ya
+        hiç gönderilmez.
+        """
+        if not texts:
+            return []
+        if self.embedding_cache is None:
+            return self._request_embeddings(texts)
+
+        results: List[Dict[str, Any]] = [None] * len(texts)
+        pending = {}
+        for i, (text, cached) in enumerate(zip(texts, self.embedding_cache.get_many(texts))):
+            if cached is not None:
+                results[i] = {"embedding": cached, "success": True, "cached": True}
+            else:
+                pending.setdefault(text, []).append(i)
+        if pending:
+            unique_texts = list(pending)
+            fresh = self._request_embeddings(unique_texts)
+            successful = [(text, result["embedding"]) for text, result in zip(unique_texts, fresh) if result["success"]]
+            if successful:
+                self.embedding_cache.put_many([t for t, _ in successful], [e for _, e in successful])
+            for text, result in zip(unique_texts, fresh):
+                for i in pending[text]:
+                    results[i] = result
+        return results
+
+    def _request_embeddings(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Ollama'dan toplu embedding iste (cache'siz)"""
+        if self._batch_embed_supported:
+            try:
+                with self.admission.slot("batch", timeout=None), metrics.ollama_call("embed"):
+                    response = self.transport.post(
+                        "/api/embed",
+                        {
+                            "model": self.embedding_model,
+                            "input": texts
+                        },
+                        timeout=self.embedding_timeout,
+                        retries=Config.AI_EMBEDDING_RETRIES
+                    )
+                if response.status_code == 404 and 'model' not in response.text:
+                    logger.info("Ollama /api/embed desteklemiyor, tekli embedding'e geçiliyor")
+                    self._batch_embed_supported = False
+                else:
+                    response.raise_for_status()
+                    embeddings = response.json().get('embeddings', [])
+                    if len(embeddings) == len(texts):
+                        return [{"embedding": embedding, "success": True} for embedding in embeddings]
+                    logger.warning(f"Toplu embedding sayısı uyuşmuyor: {len(embeddings)} != {len(texts)}")
+            except CircuitOpenError:
+                return [self._generate_fallback_embedding("EMBEDDING_CIRCUIT_OPEN") for _ in texts]
+            except Exception as e:
+                logger.error(f"Batch Embedding API Error: {e}")
+
+        workers = max(1, min(Config.AI_EMBEDDING_WORKERS, len(texts)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda text: self._admitted_embedding(text, "batch"), texts))
+
+    def warm_models(self) -> Dict[str, bool]:
+        """Sohbet ve embedding modellerini Ollama belleğine yükle.
+
+        Prompt'suz generate ve boş embed isteği yalnızca modeli yükler; ilk
+        kullanıcı isteği model yükleme süresini beklemez.
+        """
+        calls = {
+            "chat": ("/api/generate", {"model": self.chat_model, "stream": False, "keep_alive": Config.AI_KEEP_ALIVE},
+                     self.chat_timeout),
+            "embedding": ("/api/embed", {"model": self.embedding_model, "input": [], "keep_alive": Config.AI_KEEP_ALIVE},
+                          self.embedding_timeout)
+        }
+        loaded = {}
+        for name, (path, payload, timeout) in calls.items():
+            try:
+                with metrics.ollama_call(f"warmup_{name}"):
+                    response = self.transport.post(path, payload, timeout=timeout)
+                    response.raise_for_status()
+                loaded[name] = True
+            except Exception as e:
+                logger.warning(f"{name} modeli ısıtılamadı: {e}")
+                loaded[name] = False
+        return loaded
+
+    def health(self) -> Dict[str, Any]:
+        """Devre kesici, embedding cache ve kabul kuyruğu durumu"""
+        return {
+            "circuitBreaker": self.transport.breaker.snapshot(),
+            "embeddingCache": self.embedding_cache.stats() if self.embedding_cache is not None else None,
+            "admission": self.admission.stats(),
+            "singleFlight": self.single_flight.stats()
+        }
+
     def _generate_fallback_embedding(self, error_type: str) -> Dict[str, Any]:
         """Fallback embedding oluştur"""
+        metrics.fallback("random_embedding")
         # Basit embedding simülasyonu
         fallback_embedding = list(np.random.random(Config.QDRANT_VECTOR_SIZE))
         
@@ -0,0 +1,153 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Devre açıkken upstream'e hiç gidilmeden fırlatılır"""
+
+class CircuitBreaker:
+    """Basit closed → open → half_open devre kesici"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """İstek gönderilebilir mi? Açık devrede yalnızca tek bir deneme isteğine izin verir"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("AI Service devre kesici kapandı")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"AI Service devre kesici açıldı ({self._failures} ardışık hata)")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Sonucu kaydedilmeden biten isteğin (iptal, kesinti) deneme hakkını bırak"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def snapshot(self) -> Dict[str, Any]:
+        """/health için durum özeti"""
+        state = self.state
+        with self._lock:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == self.OPEN else 0.0
+            return {
+                "state": state,
+                "consecutiveFailures": self._failures,
+                "retryInSeconds": round(retry_in, 1)
+            }
+
+class AITransport:
+    """Ollama için ortak HTTP katmanı: keep-alive bağlantı havuzu, jitter'lı
+    yeniden deneme ve devre kesici"""
+
+    def __init__(self, base_url: str = None):
+        self.base_url = base_url or Config.AI_SERVICE_URL
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=Config.AI_POOL_SIZE,
+            pool_block=False
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.AI_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=Config.AI_BREAKER_RESET_TIMEOUT
+        )
+
+    def post(self, path: str, payload: Dict[str, Any], timeout: Tuple[float, float],
+             retries: int = 0, stream: bool = False) -> requests.Response:
+        """POST isteği gönder.
+
+        ``retries`` yalnızca idempotent çağrılar (embedding) için verilmelidir;
+        bağlantı hatası, zaman aşımı ve 5xx yanıtlarında üstel + jitter'lı
+        bekleme ile tekrar denenir.
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("AI Service devre kesici açık")
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}",
+                    json=payload,
+                    timeout=timeout,
+                    stream=stream
+                )
+                if response.status_code >= 500:
+                    response.close()
+                    response.raise_for_status()
+                self.breaker.record_success()
+                return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError) as e:
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.warning(f"AI Service isteği başarısız ({e}), {delay:.2f}s sonra tekrar denenecek ({attempt}/{retries})")
+                time.sleep(delay)
+            except Exception:
+                # Beklenmeyen hatalar (ChunkedEncodingError, InvalidHeader...) da hata sayılır
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # Kesinti: sonuç bilinmiyor, devre half_open'da takılı kalmasın
+                self.breaker.release_probe()
+                raise
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Full-jitter üstel bekleme süresi"""
+        ceiling = min(Config.AI_RETRY_BACKOFF_MAX, Config.AI_RETRY_BACKOFF * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def close(self):
+        self.session.close()
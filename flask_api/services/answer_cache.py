@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+def normalize_question(question: str) -> str:
+    """Soruyu cache anahtarı için normalleştir (Türkçe küçük harf, noktalama ve fazla boşluk yok)"""
+    text = (question or "").replace("I", "ı").replace("İ", "i").lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+class AnswerCache:
+    """/api/chat yanıt cache'i.
+
+    Tam eşleşme katmanı (normalleştirilmiş soru + prompt verisi + veri sürümü)
+    ve isteğe bağlı anlamsal katman (aynı prompt verisi için soru embedding'i
+    kosinüs eşiğinin üzerindeyse) içerir. Kayıtlar TTL ve boyut ile sınırlıdır.
+
+    Cache her worker'da ayrıdır; geçersiz kılma ``clear()`` ile değil veri
+    sürümüyle olur: snapshot yeniden yazılınca (yükleme, CRUD) tüm worker'larda
+    anahtar değişir, eski kayıtlar erişilmez olup TTL/LRU ile düşer.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None,
+                 semantic: bool = None, threshold: float = None):
+        self.max_entries = Config.ANSWER_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = Config.ANSWER_CACHE_TTL if ttl is None else ttl
+        self.semantic = Config.ANSWER_CACHE_SEMANTIC if semantic is None else semantic
+        self.threshold = Config.ANSWER_CACHE_SEMANTIC_THRESHOLD if threshold is None else threshold
+        # key -> (answer, expires_at, context_key, normalized_embedding)
+        self._entries: "OrderedDict[str, Tuple[str, float, str, Optional[np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def context_key(context: str, data_version: str) -> str:
+        """Prompt'a giren veri ve veri sürümü için anahtar"""
+        return hashlib.sha1(f"{data_version}\x00{context}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(question: str, context_key: str) -> str:
+        return hashlib.sha1(f"{context_key}\x00{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+    def get(self, question: str, context_key: str,
+            embedding: Optional[List[float]] = None) -> Tuple[Optional[str], str]:
+        """(yanıt, durum) döndür; durum HIT, SEMANTIC veya MISS"""
+        key = self._key(question, context_key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0], "HIT"
+                del self._entries[key]
+
+            if self.semantic and embedding is not None:
+                query = self._normalize(embedding)
+                best_score, best_answer = -1.0, None
+                if query is not None:
+                    for answer, expires_at, entry_context, vector in self._entries.values():
+                        if entry_context != context_key or vector is None or expires_at <= now:
+                            continue
+                        score = float(np.dot(query, vector))
+                        if score > best_score:
+                            best_score, best_answer = score, answer
+                if best_answer is not None and best_score >= self.threshold:
+                    self.semantic_hits += 1
+                    return best_answer, "SEMANTIC"
+
+            self.misses += 1
+            return None, "MISS"
+
+    def put(self, question: str, context_key: str, answer: str,
+            embedding: Optional[List[float]] = None):
+        key = self._key(question, context_key)
+        vector = self._normalize(embedding) if (self.semantic and embedding is not None) else None
+        with self._lock:
+            self._entries[key] = (answer, time.time() + self.ttl, context_key, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def clear(self):
+        """Çalışan verisi değiştiğinde tüm yanıtları geçersiz kıl"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semanticHits": self.semantic_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.semantic_hits) / total, 4) if total else 0.0
+            }
+
+# Singleton instance
+answer_cache = AnswerCache()
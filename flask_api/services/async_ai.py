@@ -0,0 +1,290 @@
+"""Ollama için async istemci (ASGI modu).
+
+AIService ile aynı istek/yanıt sözlüklerini üretir; devre kesici, kabul
+kuyruğu ve embedding cache'i senkron servisle paylaşılır. Böylece WSGI ve
+async view'lar aynı süreçte çalışırken Ollama'ya giden toplam yük tek
+yerden sınırlanır. Bekleyen bir chat isteği thread değil yalnızca bir
+coroutine tutar.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List
+import httpx
+from config.settings import Config
+from services.ai_service import ai_service
+from services.ai_transport import CircuitOpenError
+from services.admission import AsyncAdmittedStream, AsyncSingleFlight, Overloaded
+from services import metrics
+
+logger = logging.getLogger(__name__)
+# httpx her isteği INFO seviyesinde loglar
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+_UNAVAILABLE = "Üzgünüm, AI servisi şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin."
+_TIMEOUT = "AI servisi yanıt vermiyor. Lütfen daha sonra tekrar deneyin."
+_INCOMPLETE = "AI servisi yanıtı tamamlamadan kesildi. Lütfen tekrar deneyin."
+# Bir httpx istemcisinin en fazla bağlantısı
+_SHARD_SIZE = 8
+
+class AsyncAIService:
+    def __init__(self, sync_service=None):
+        sync_service = sync_service or ai_service
+        self.base_url = Config.AI_SERVICE_URL
+        self.chat_model = sync_service.chat_model
+        self.embedding_model = sync_service.embedding_model
+        self.breaker = sync_service.transport.breaker
+        self.admission = sync_service.admission
+        self.sync_service = sync_service
+        self.single_flight = AsyncSingleFlight()
+        self.chat_timeout = httpx.Timeout(Config.AI_CHAT_READ_TIMEOUT, connect=Config.AI_CHAT_CONNECT_TIMEOUT)
+        self.embedding_timeout = httpx.Timeout(Config.AI_EMBEDDING_READ_TIMEOUT, connect=Config.AI_EMBEDDING_CONNECT_TIMEOUT)
+        self._clients: List[httpx.AsyncClient] = []
+        self._next_client = None
+        self._client_loop = None
+
+    @property
+    def embedding_cache(self):
+        # Senkron servisle ortak; ilk kullanımda açılır
+        return self.sync_service.embedding_cache
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Çalışan event loop'a bağlı, keep-alive havuzlu istemci (ilk kullanımda açılır).
+
+        httpcore her bağlantı olayında havuzdaki tüm bağlantıları taradığı için
+        AI_POOL_SIZE bağlantı en fazla _SHARD_SIZE'lık istemcilere bölünür ve
+        istekler bunlara sırayla dağıtılır.
+        """
+        loop = asyncio.get_running_loop()
+        if not self._clients or self._client_loop is not loop:
+            shards = max(1, math.ceil(Config.AI_POOL_SIZE / _SHARD_SIZE))
+            size = math.ceil(Config.AI_POOL_SIZE / shards)
+            self._clients = [
+                httpx.AsyncClient(base_url=self.base_url,
+                                  limits=httpx.Limits(max_connections=size, max_keepalive_connections=size))
+                for _ in range(shards)
+            ]
+            self._next_client = itertools.cycle(self._clients)
+            self._client_loop = loop
+        return next(self._next_client)
+
+    async def close(self):
+        clients, self._clients = self._clients, []
+        for client in clients:
+            await client.aclose()
+
+    async def _post(self, path: str, payload: Dict[str, Any], timeout: httpx.Timeout, retries: int = 0) -> httpx.Response:
+        """AITransport.post'un async karşılığı (devre kesici + jitter'lı yeniden deneme)"""
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("AI Service devre kesici açık")
+            try:
+                response = await self.client.post(path, json=payload, timeout=timeout)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+                self.breaker.record_success()
+                return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                delay = random.uniform(0, min(Config.AI_RETRY_BACKOFF_MAX, Config.AI_RETRY_BACKOFF * (2 ** attempt)))
+                attempt += 1
+                logger.warning(f"AI Service isteği başarısız ({e}), {delay:.2f}s sonra tekrar denenecek ({attempt}/{retries})")
+                await asyncio.sleep(delay)
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # asyncio.CancelledError: devre half_open'da takılı kalmasın
+                self.breaker.release_probe()
+                raise
+
+    async def _coalesce(self, key: tuple, fn):
+        if not Config.AI_SINGLE_FLIGHT:
+            return await fn()
+        return await self.single_flight.do(key, fn)
+
+    async def generate_completion(self, prompt: str) -> Dict[str, Any]:
+        """Chat completion; kuyruk doluysa veya beklerken zaman aşılırsa Overloaded"""
+        return await self._coalesce(("generate", self.chat_model, prompt), lambda: self._admitted_completion(prompt))
+
+    async def _admitted_completion(self, prompt: str) -> Dict[str, Any]:
+        async with self.admission.slot_async("generate"):
+            return await self._request_completion(prompt)
+
+    async def _request_completion(self, prompt: str) -> Dict[str, Any]:
+        try:
+            with metrics.ollama_call("generate"):
+                response = await self._post(
+                    "/api/generate",
+                    {
+                        "model": self.chat_model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "keep_alive": Config.AI_KEEP_ALIVE
+                    },
+                    timeout=self.chat_timeout
+                )
+                response.raise_for_status()
+                data = response.json()
+                metrics.record_generation(data)
+            return {
+                "answer": data.get('response') or data.get('text') or str(data),
+                "success": True
+            }
+        except CircuitOpenError:
+            return {"answer": _UNAVAILABLE, "success": False, "error": "AI_SERVICE_CIRCUIT_OPEN"}
+        except httpx.TimeoutException:
+            logger.error("AI Service timeout")
+            return {"answer": _TIMEOUT, "success": False, "error": "AI_SERVICE_TIMEOUT"}
+        except httpx.TransportError:
+            logger.error("AI Service connection failed")
+            return {"answer": _UNAVAILABLE, "success": False, "error": "AI_SERVICE_UNAVAILABLE"}
+        except Exception as e:
+            logger.error(f"AI Service Error: {e}")
+            return {"answer": f"AI servisinde hata: {e}", "success": False, "error": str(e)}
+
+    async def stream_completion(self, prompt: str) -> AsyncIterator[Dict[str, Any]]:
+        """Chat completion (stream); olaylar AIService.stream_completion ile aynıdır.
+
+        Slot çağrı anında alınır (Overloaded burada fırlatılır) ve akış bitince,
+        hata verince ya da tüketici akışı kapatınca bırakılır.
+        """
+        ticket = await self.admission.acquire_async("generate")
+        return AsyncAdmittedStream(self._stream_completion(prompt), ticket)
+
+    async def _stream_completion(self, prompt: str) -> AsyncIterator[Dict[str, Any]]:
+        started = time.time()
+        # Devre kesici sonucu kaydedildi mi (izin alınıp kaydedilmeden çıkılırsa deneme hakkı bırakılır)
+        settled = True
+        with metrics.ollama_call("generate_stream") as call:
+            try:
+                if not self.breaker.allow():
+                    raise CircuitOpenError("AI Service devre kesici açık")
+                settled = False
+                payload = {"model": self.chat_model, "prompt": prompt, "stream": True, "keep_alive": Config.AI_KEEP_ALIVE}
+                async with self.client.stream("POST", "/api/generate", json=payload, timeout=self.chat_timeout) as response:
+                    settled = True
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    response.raise_for_status()
+                    first_token_at = None
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get('error'):
+                            raise RuntimeError(chunk['error'])
+                        token = chunk.get('response', '')
+                        if token:
+                            if first_token_at is None:
+                                first_token_at = time.time()
+                            yield {"type": "token", "token": token}
+                        if chunk.get('done'):
+                            metrics.record_generation(chunk)
+                            yield {
+                                "type": "done",
+                                "success": True,
+                                "total_time": round(time.time() - started, 3),
+                                "time_to_first_token": round(first_token_at - started, 3) if first_token_at else None,
+                                "total_duration": chunk.get('total_duration'),
+                                "load_duration": chunk.get('load_duration'),
+                                "prompt_eval_count": chunk.get('prompt_eval_count'),
+                                "prompt_eval_duration": chunk.get('prompt_eval_duration'),
+                                "eval_count": chunk.get('eval_count'),
+                                "eval_duration": chunk.get('eval_duration')
+                            }
+                            return
+                    # Ollama 'done' göndermeden kapattı: yanıt yarım, cache'e yazılmamalı
+                    call.failed = True
+                    logger.error("AI Service stream 'done' olmadan kapandı")
+                    yield {"type": "error", "success": False, "error": "AI_SERVICE_INCOMPLETE", "answer": _INCOMPLETE}
+            except CircuitOpenError:
+                call.failed = True
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_CIRCUIT_OPEN", "answer": _UNAVAILABLE}
+            except httpx.TimeoutException:
+                call.failed = True
+                settled = True
+                self.breaker.record_failure()
+                logger.error("AI Service timeout (stream)")
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_TIMEOUT", "answer": _TIMEOUT}
+            except httpx.TransportError:
+                call.failed = True
+                settled = True
+                self.breaker.record_failure()
+                logger.error("AI Service connection failed (stream)")
+                yield {"type": "error", "success": False, "error": "AI_SERVICE_UNAVAILABLE", "answer": _UNAVAILABLE}
+            except Exception as e:
+                call.failed = True
+                if not settled:
+                    settled = True
+                    self.breaker.record_failure()
+                logger.error(f"AI Service Stream Error: {e}")
+                yield {"type": "error", "success": False, "error": str(e), "answer": f"AI servisinde hata: {e}"}
+            finally:
+                if not settled:
+                    # İptal (CancelledError, GeneratorExit) yanıt gelmeden
+                    self.breaker.release_probe()
+
+    async def generate_embedding(self, text: str) -> Dict[str, Any]:
+        """Embedding oluştur (SQLite cache katmanı thread'de okunur/yazılır)"""
+        if self.embedding_cache is not None:
+            cached = await asyncio.to_thread(self.embedding_cache.get, text)
+            if cached is not None:
+                return {"embedding": cached, "success": True, "cached": True}
+        result = await self._coalesce(("embed", self.embedding_model, text), lambda: self._admitted_embedding(text))
+        if result["success"] and self.embedding_cache is not None:
+            await asyncio.to_thread(self.embedding_cache.put, text, result["embedding"])
+        return result
+
+    async def _admitted_embedding(self, text: str) -> Dict[str, Any]:
+        try:
+            async with self.admission.slot_async("embed"):
+                return await self._request_embedding(text)
+        except Overloaded as e:
+            logger.warning(f"Embedding isteği kabul edilmedi: {e}")
+            return ai_service._generate_fallback_embedding("EMBEDDING_OVERLOADED")
+
+    async def _request_embedding(self, text: str) -> Dict[str, Any]:
+        try:
+            with metrics.ollama_call("embeddings"):
+                response = await self._post(
+                    "/api/embeddings",
+                    {"model": self.embedding_model, "prompt": text},
+                    timeout=self.embedding_timeout,
+                    retries=Config.AI_EMBEDDING_RETRIES
+                )
+                response.raise_for_status()
+                embedding = response.json().get('embedding', [])
+            if len(embedding) != Config.QDRANT_VECTOR_SIZE:
+                logger.warning(f"Embedding boyutu beklenenden farklı: {len(embedding)}")
+            return {"embedding": embedding, "success": True}
+        except CircuitOpenError:
+            return ai_service._generate_fallback_embedding("EMBEDDING_CIRCUIT_OPEN")
+        except httpx.TimeoutException:
+            logger.error("AI Service timeout for embedding")
+            return ai_service._generate_fallback_embedding("EMBEDDING_TIMEOUT")
+        except httpx.TransportError:
+            logger.error("AI Service connection failed for embedding")
+            return ai_service._generate_fallback_embedding("EMBEDDING_CONNECTION_ERROR")
+        except Exception as e:
+            logger.error(f"Embedding API Error: {e}")
+            return ai_service._generate_fallback_embedding("EMBEDDING_ERROR")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "singleFlight": self.single_flight.stats()
+        }
+
+# Singleton instance
+async_ai_service = AsyncAIService()
@@ -0,0 +1,122 @@
+"""Qdrant koleksiyon profilleri: depolama düzeni, HNSW ve arama ayarları.
+
+    latency   - vektörler ve HNSW grafiği RAM'de, niceleme yok (en düşük gecikme)
+    memory    - orijinal float32 vektörler diskte (mmap), RAM'de yalnızca int8
+                skaler nicelenmiş kopya; aday listesi nicelenmiş vektörlerle
+                bulunur, ilk QDRANT_RESCORE_OVERSAMPLING x limit aday orijinal
+                vektörlerle yeniden skorlanır (~4 kat az RAM, recall ~aynı)
+    bulk-load - latency düzeni, ama yükleme bitene kadar HNSW kurulmaz
+                (m=0, indexing_threshold=0); ``finalize_kwargs`` ile açılır
+
+Her profilde indeksleme ertelenebilir (``defer_indexing``): büyük bir
+kopyalama/yükleme sırasında her segment için graf tekrar tekrar kurulmaz,
+veri bittikten sonra bir kez kurulur. Düzen (diskte/RAM'de, niceleme)
+koleksiyon oluşturulurken belirlenir; değiştirmek için
+scripts/migrate_collection.py ile yeni koleksiyona kopyalanıp alias çevrilir.
+"""
+from typing import Any, Dict
+from config.settings import Config
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "latency": {
+        "vectors_on_disk": False,
+        "quantization": False,
+        "defer_indexing": False
+    },
+    "memory": {
+        "vectors_on_disk": True,
+        "quantization": True,
+        "defer_indexing": False
+    },
+    "bulk-load": {
+        "vectors_on_disk": False,
+        "quantization": False,
+        "defer_indexing": True
+    }
+}
+
+def get(name: str = None, defer_indexing: bool = None) -> Dict[str, Any]:
+    """Profil ayarları (isim verilmezse QDRANT_COLLECTION_PROFILE)"""
+    name = name or Config.QDRANT_COLLECTION_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Bilinmeyen koleksiyon profili: {name} (seçenekler: {', '.join(PROFILES)})")
+    profile = {"name": name, **PROFILES[name]}
+    if defer_indexing is not None:
+        profile["defer_indexing"] = defer_indexing
+    return profile
+
+def _models():
+    # qdrant_service bu modülü import eder; kilitli import yardımcısı çağrı anında alınır
+    from services.qdrant_service import qdrant_models
+    return qdrant_models()
+
+def _hnsw_config(deferred: bool):
+    models = _models()
+    if deferred:
+        # m=0 graf kurulumunu kapatır; veri bitince finalize_kwargs ile açılır
+        return models.HnswConfigDiff(m=0, ef_construct=Config.QDRANT_HNSW_EF_CONSTRUCT)
+    return models.HnswConfigDiff(m=Config.QDRANT_HNSW_M, ef_construct=Config.QDRANT_HNSW_EF_CONSTRUCT)
+
+def create_kwargs(profile: Dict[str, Any], vector_size: int, distance: str = None) -> Dict[str, Any]:
+    """``client.create_collection`` argümanları"""
+    models = _models()
+    kwargs = {
+        "vectors_config": models.VectorParams(
+            size=vector_size,
+            distance=models.Distance(distance or Config.QDRANT_DISTANCE),
+            on_disk=profile["vectors_on_disk"]
+        ),
+        "hnsw_config": _hnsw_config(profile["defer_indexing"])
+    }
+    if profile["quantization"]:
+        kwargs["quantization_config"] = models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=Config.QDRANT_QUANTIZATION_QUANTILE,
+            always_ram=True
+        ))
+    if profile["defer_indexing"]:
+        kwargs["optimizers_config"] = models.OptimizersConfigDiff(indexing_threshold=0)
+    return kwargs
+
+def finalize_kwargs(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Ertelenmiş indekslemeyi açan ``client.update_collection`` argümanları"""
+    return {
+        "hnsw_config": _hnsw_config(False),
+        "optimizers_config": _models().OptimizersConfigDiff(indexing_threshold=Config.QDRANT_INDEXING_THRESHOLD)
+    }
+
+def search_params(profile: Dict[str, Any]):
+    """Profile uygun ``query_points(search_params=...)`` (varsayılanlar yeterliyse None)"""
+    models = _models()
+    hnsw_ef = Config.QDRANT_SEARCH_HNSW_EF or None
+    if profile["quantization"]:
+        return models.SearchParams(hnsw_ef=hnsw_ef, quantization=models.QuantizationSearchParams(
+            rescore=True,
+            oversampling=Config.QDRANT_RESCORE_OVERSAMPLING
+        ))
+    return models.SearchParams(hnsw_ef=hnsw_ef) if hnsw_ef else None
+
+def describe(info) -> Dict[str, Any]:
+    """``get_collection`` sonucunun profil açısından özeti (rapor ve loglar için)"""
+    vectors = info.config.params.vectors
+    quantization = info.config.quantization_config
+    return {
+        "status": str(getattr(info.status, 'value', info.status)),
+        "points": info.points_count,
+        "indexedVectors": info.indexed_vectors_count,
+        "vectorSize": vectors.size,
+        "distance": str(getattr(vectors.distance, 'value', vectors.distance)),
+        "vectorsOnDisk": bool(vectors.on_disk),
+        "quantization": type(quantization).__name__ if quantization is not None else None,
+        "hnswM": info.config.hnsw_config.m,
+        "indexingThreshold": info.config.optimizer_config.indexing_threshold
+    }
+
+def estimate_ram_bytes(profile: Dict[str, Any], points: int, vector_size: int) -> int:
+    """Vektörler ve HNSW bağlantıları için yaklaşık RAM (payload ve sabit maliyetler hariç)"""
+    vectors = 0 if profile["vectors_on_disk"] else points * vector_size * 4
+    if profile["quantization"]:
+        vectors += points * vector_size
+    # Taban katmanda nokta başına ~2m bağlantı (4 bayt); üst katmanlar ihmal edilir
+    graph = points * Config.QDRANT_HNSW_M * 2 * 4
+    return vectors + graph
@@ -0,0 +1,219 @@
+"""Chat prompt'u için token bütçeli, sıkıştırılmış çalışan bağlamı.
+
+Getirilen çalışanlar satır başına uzun metin yerine tek bir çalışan × hafta
+tablosu olarak yazılır; hafta etiketleri başlıkta bir kez geçer:
+
+    Haftalar (2025, başlangıç günü): H1=07-07, H2=07-14
+    İsim | Toplam (hafta) | H1 | H2
+    Ahmet Yılmaz | 82 (2) | 40 | 42
+    Ayşe Demir | 41 (1) | 41 | -
+    Son hafta günlük saatler (pazartesi sali carsamba persembe cuma cumartesi pazar):
+    Ahmet Yılmaz H2: 8 9 8 8 9 - -
+
+Tablo CONTEXT_TOKEN_BUDGET'a sığana kadar önce en eski hafta sütunları,
+sonra en az ilgili satırlar çıkarılır; günlük ayrıntı satırları bütçede
+yer kaldıkça ilgi sırasıyla eklenir. Sabit talimat bloğu (CHAT_INSTRUCTIONS)
+her prompt'un başında değişmeden durur; böylece Ollama aynı önekin
+KV cache'ini istekler arasında yeniden kullanabilir.
+"""
+import logging
+import math
+import re
+import threading
+from typing import Any, Dict, List
+import numpy as np
+from config.settings import Config
+from services.employee_stats import employee_stats
+from services.employee_store import employee_store
+from services.retrieval import tokenize, week_mask
+from services.snapshot_format import WEEKDAYS, as_list, day_index, week_sort_key
+
+logger = logging.getLogger(__name__)
+
+# Önemli talimatlar (prompt instructions)
+CHAT_INSTRUCTIONS = (
+    "ÖNEMLİ TALİMATLAR:\n"
+    "- Cevabını mutlaka Türkçe ver.\n"
+    "- Veriler tablo halindedir: H1, H2... sütunları 'Haftalar' satırında başlangıç günü verilen haftalardır, '-' kayıt yok demektir\n"
+    "- Toplam sütunu kişinin tüm dönemlerdeki toplam saatidir, parantez içi hafta sayısıdır\n"
+    "- Kullanıcı birden fazla kişiyi veya karşılaştırma sorusu sorduğunda, sadece ilgili kişileri karşılaştır ve diğer kişileri dahil etme\n"
+    "- Her karşılaştırma sorusuna, sadece o sorunun gerektirdiği kişileri ve bilgileri dahil et\n"
+    "- Cevaplar kısa, net ve sadece ilgili kişilere özel olsun\n"
+    "- Tek kişi sorulursa sadece o kişinin bilgilerini ver\n"
+    "- Cevabın kısa ve öz olsun, gereksiz açıklama ve maddeleme yapma\n"
+    "- İsmini, toplam saatini ve günlük saatlerini belirt\n"
+    "- Kısa bir değerlendirme ekle (en fazla 1-2 cümle)\n"
+    "- Verilen verileri tam olarak kullan, değiştirme\n"
+    "- 'Bulamadım' deme, verilen context'te arama yap\n"
+    "- Doğal ve öz yanıt ver, gereksiz tekrarlar yapma\n"
+)
+
+_PIECE = re.compile(r"\d+|[^\W\d_]+|[^\w\s]|\n")
+
+def estimate_tokens(text: str) -> int:
+    """llama3 BPE token sayısı için hızlı tahmin.
+
+    Sayılar en fazla 3 haneli parçalara, kelimeler ortalama
+    CONTEXT_CHARS_PER_TOKEN karakterlik parçalara bölünür; her noktalama
+    işareti ve satır sonu bir token sayılır.
+    """
+    tokens = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            tokens += math.ceil(len(piece) / Config.CONTEXT_CHARS_PER_TOKEN)
+        else:
+            tokens += 1
+    return tokens
+
+def _hours(value: float) -> str:
+    value = float(value)
+    return f"{value:.0f}" if value.is_integer() else f"{value:.1f}"
+
+class _Row:
+    """Bir çalışanın tabloya girecek verisi: hafta → saat ve hafta → günlük saatler"""
+
+    __slots__ = ('isim', 'hours', 'daily')
+
+    def __init__(self, isim: str, hours: Dict[str, float], daily: Dict[str, Dict[str, float]]):
+        self.isim = isim
+        self.hours = hours
+        self.daily = daily
+
+    @classmethod
+    def from_engine(cls, engine, i: int) -> '_Row':
+        present = np.flatnonzero(~np.isnan(engine.weekly[i]))
+        hours = {engine.weeks[w]: float(engine.weekly[i, w]) for w in present}
+        daily = {}
+        for w in present:
+            days = engine.daily[i, w]
+            daily[engine.weeks[w]] = {day: float(days[d]) for d, day in enumerate(WEEKDAYS) if not np.isnan(days[d])}
+        return cls(engine.names[i], hours, daily)
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> '_Row':
+        """Snapshot'ta olmayan (Qdrant'tan gelen) kayıt"""
+        totals = as_list(record.get('toplam_mesai'))
+        days = as_list(record.get('gunluk_mesai'))
+        hours, daily = {}, {}
+        for j, week in enumerate(as_list(record.get('tarih_araligi'))):
+            week = str(week)
+            try:
+                hours[week] = hours.get(week, 0.0) + float(totals[j])
+            except (IndexError, TypeError, ValueError):
+                continue
+            if j < len(days) and isinstance(days[j], dict):
+                daily[week] = {}
+                for day, h in days[j].items():
+                    d = day_index(day)
+                    if d is not None and isinstance(h, (int, float)):
+                        daily[week][WEEKDAYS[d]] = float(h)
+        return cls(record.get('isim', ''), hours, daily)
+
+class ContextBuilder:
+    """Getirilen çalışanlardan bütçeye sığan prompt bağlamı üretir"""
+
+    def __init__(self):
+        self.instruction_tokens = estimate_tokens(CHAT_INSTRUCTIONS)
+        self._lock = threading.Lock()
+        self._built = 0
+        self._tokens = 0
+        self._truncated = 0
+
+    def _rows(self, hits: List[Dict[str, Any]]) -> List[_Row]:
+        snapshot = employee_store.get()
+        engine = employee_stats.for_snapshot(snapshot)
+        by_id = snapshot.by_id
+        rows = []
+        for hit in hits:
+            i = by_id.get(hit.get('id'))
+            if i is not None and i < len(engine.names):
+                rows.append(_Row.from_engine(engine, i))
+            else:
+                rows.append(_Row.from_record(hit))
+        return rows
+
+    @staticmethod
+    def _week_labels(weeks: List[str]) -> str:
+        """Hafta başlıkları; tüm haftalar aynı yıldaysa yıl bir kez yazılır"""
+        starts = [str(week).split('/')[0] for week in weeks]
+        years = {start[:4] for start in starts}
+        if len(years) == 1 and all(len(start) == 10 for start in starts):
+            return f"Haftalar ({years.pop()}, başlangıç günü): " + ", ".join(f"H{j}={start[5:]}" for j, start in enumerate(starts, 1))
+        return "Haftalar (başlangıç günü): " + ", ".join(f"H{j}={start}" for j, start in enumerate(starts, 1))
+
+    def _render(self, rows: List[_Row], weeks: List[str], daily_rows: List[_Row], truncated: bool) -> str:
+        lines = []
+        if weeks:
+            lines.append(self._week_labels(weeks))
+        lines.append(" | ".join(["İsim", "Toplam (hafta)"] + [f"H{j}" for j in range(1, len(weeks) + 1)]))
+        for row in rows:
+            cells = [row.isim, f"{_hours(sum(row.hours.values()))} ({len(row.hours)})"]
+            cells += [_hours(row.hours[week]) if week in row.hours else "-" for week in weeks]
+            lines.append(" | ".join(cells))
+        labels = {week: f"H{j}" for j, week in enumerate(weeks, 1)}
+        daily_lines = []
+        for row in daily_rows:
+            week = next((w for w in reversed(weeks) if row.daily.get(w)), None)
+            if week is not None:
+                days = " ".join(_hours(row.daily[week][day]) if day in row.daily[week] else "-" for day in WEEKDAYS)
+                daily_lines.append(f"{row.isim} {labels[week]}: {days}")
+        if daily_lines:
+            lines.append(f"Son hafta günlük saatler ({' '.join(WEEKDAYS)}):")
+            lines.extend(daily_lines)
+        if truncated:
+            lines.append("Not: yer darlığından yalnızca en ilgili kişiler ve son haftalar gösteriliyor")
+        return "\n".join(lines)
+
+    def build(self, question: str, hits: List[Dict[str, Any]], budget: int = None) -> Dict[str, Any]:
+        """Bağlam metni ve boyutu: {"text", "tokens", "employees", "weeks", "truncated"}"""
+        budget = budget or Config.CONTEXT_TOKEN_BUDGET
+        if not hits:
+            return {"text": "", "tokens": 0, "employees": 0, "weeks": 0, "truncated": False}
+        rows = self._rows(hits)
+        # Kronolojik sıra: bütçe en eski haftayı (baştan) düşürür, günlük detay en yeniyi (sondan) alır
+        weeks = sorted({week for row in rows for week in row.hours}, key=week_sort_key)
+        # Soruda tarih geçiyorsa yalnızca o haftalar
+        mask = week_mask(weeks, tokenize(question))
+        if mask is not None and mask.any():
+            weeks = [week for week, keep in zip(weeks, mask) if keep]
+
+        truncated = False
+        text = self._render(rows, weeks, [], truncated)
+        while estimate_tokens(text) > budget and (len(weeks) > 1 or len(rows) > 1):
+            if len(weeks) > 1:
+                weeks = weeks[1:]
+            else:
+                rows = rows[:-1]
+            truncated = True
+            text = self._render(rows, weeks, [], truncated)
+
+        if Config.CONTEXT_DAILY_DETAIL:
+            daily_rows = []
+            for row in rows:
+                candidate = self._render(rows, weeks, daily_rows + [row], truncated)
+                if estimate_tokens(candidate) > budget:
+                    break
+                daily_rows.append(row)
+                text = candidate
+
+        tokens = estimate_tokens(text)
+        with self._lock:
+            self._built += 1
+            self._tokens += tokens
+            self._truncated += truncated
+        return {"text": text, "tokens": tokens, "employees": len(rows), "weeks": len(weeks), "truncated": truncated}
+
+    def stats(self) -> Dict[str, Any]:
+        built = self._built
+        return {
+            "built": built,
+            "budget": Config.CONTEXT_TOKEN_BUDGET,
+            "instructionTokens": self.instruction_tokens,
+            "avgContextTokens": round(self._tokens / built, 1) if built else 0.0,
+            "truncated": self._truncated
+        }
+
+# Singleton instance
+context_builder = ContextBuilder()
@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """Cache anahtarı için metni normalleştir (Unicode NFC + boşluk sadeleştirme)"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+class EmbeddingCache:
+    """(embedding modeli, normalleştirilmiş metin) anahtarlı iki katmanlı cache.
+
+    Bellek katmanı LRU, disk katmanı SQLite'tır (WAL modu sayesinde gunicorn
+    worker'ları aynı dosyayı paylaşabilir). Model değiştiğinde disk katmanı
+    otomatik olarak temizlenir. Yalnızca başarılı embedding'ler yazılmalıdır.
+    """
+
+    def __init__(self, model: str, path: str = None, memory_size: int = None, max_rows: int = None):
+        self.model = model
+        self.path = path or Config.EMBEDDING_CACHE_PATH
+        self.memory_size = Config.EMBEDDING_CACHE_MEMORY_SIZE if memory_size is None else memory_size
+        self.max_rows = Config.EMBEDDING_CACHE_MAX_ROWS if max_rows is None else max_rows
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_evict = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_enabled = bool(self.path)
+        if self._disk_enabled:
+            try:
+                self._init_disk()
+            except Exception as e:
+                logger.error(f"Embedding cache diski açılamadı, yalnızca bellek kullanılacak: {e}")
+                self._disk_enabled = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_disk(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'model'").fetchone()
+            if row is None or row[0] != self.model:
+                if row is not None:
+                    logger.info(f"Embedding modeli değişti ({row[0]} → {self.model}), cache temizleniyor")
+                conn.execute("DELETE FROM embeddings")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('model', ?)", (self.model,))
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Metinlerin cache'teki embedding'leri (olmayanlar için None)"""
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing and self._disk_enabled:
+            try:
+                found = self._disk_get(list(missing))
+            except Exception as e:
+                logger.error(f"Embedding cache okuma hatası: {e}")
+                found = {}
+            with self._lock:
+                for key, vector in found.items():
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        results[i] = vector
+                        self.hits += 1
+                        self.disk_hits += 1
+
+        with self._lock:
+            self.misses += sum(len(indices) for indices in missing.values())
+        return results
+
+    def put(self, text: str, embedding: List[float]):
+        self.put_many([text], [embedding])
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """Başarılı embedding'leri cache'e yaz (fallback vektörler asla yazılmamalı)"""
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                if not embedding:
+                    continue
+                key = self._key(text)
+                vector = list(embedding)
+                self._remember(key, vector)
+                rows.append((key, array("f", vector).tobytes(), now))
+        if not rows or not self._disk_enabled:
+            return
+        try:
+            conn = self._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+                )
+            self._writes_since_evict += len(rows)
+            if self._writes_since_evict >= 1000:
+                self._evict()
+        except Exception as e:
+            logger.error(f"Embedding cache yazma hatası: {e}")
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, List[float]]:
+        conn = self._conn()
+        found = {}
+        # SQLite parametre limiti için parça parça sorgula
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ):
+                vector = array("f")
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+        if found:
+            with conn:
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(time.time(), key) for key in found]
+                )
+        return found
+
+    def _evict(self):
+        """Disk katmanını max_rows sınırına indir (en uzun süre kullanılmayanlar silinir)"""
+        self._writes_since_evict = 0
+        conn = self._conn()
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_rows
+        if excess > 0:
+            with conn:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)", (excess,)
+                )
+            logger.info(f"Embedding cache: {excess} kayıt silindi")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._disk_enabled:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM embeddings")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "model": self.model,
+                "memoryEntries": len(self._memory),
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else 0.0,
+                "diskEnabled": self._disk_enabled
+            }
@@ -0,0 +1,172 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.settings import Config
+from services.employee_store import employee_store, EmployeeSnapshot
+from services.snapshot_format import MISSING, WEEKDAYS, as_list, day_index, week_sort_key
+
+logger = logging.getLogger(__name__)
+
+class StatsEngine:
+    """Bir snapshot sürümü için çalışan × hafta × gün yoğun NumPy dizileri
+    ve önceden hesaplanmış toplamlar"""
+
+    def __init__(self, snapshot: EmployeeSnapshot):
+        self.version = snapshot.version
+        if snapshot.columns is not None:
+            self._load_columns(snapshot.columns)
+        else:
+            self._load_records(snapshot.employees)
+        self.name_index = {name.lower(): i for i, name in enumerate(self.names)}
+        self._precompute()
+
+    def _load_columns(self, columns):
+        """Sütunsal snapshot: tamsayı dizilerinden vektörel dönüşüm (Python döngüsü yok)"""
+        self.names: List[str] = columns.names
+        self.weeks: List[str] = columns.weeks
+        self.weekly = np.where(columns.weekly == MISSING, np.nan, columns.weekly).astype(np.float32)
+        self.daily = np.where(columns.daily == MISSING, np.nan, columns.daily).astype(np.float32)
+
+    def _load_records(self, employees):
+        """Eski JSON snapshot'ı: kayıtları tek tek dizilere yerleştir"""
+        self.names = [emp.get('isim', '') for emp in employees]
+        self.weeks = sorted({str(t) for emp in employees for t in as_list(emp.get('tarih_araligi'))},
+                            key=week_sort_key)
+        week_index = {week: i for i, week in enumerate(self.weeks)}
+        n_emp, n_weeks = len(employees), len(self.weeks)
+
+        # Eksik hücreler NaN; aynı hafta birden fazla kez geldiyse toplanır
+        self.weekly = np.full((n_emp, n_weeks), np.nan, dtype=np.float32)
+        self.daily = np.full((n_emp, n_weeks, len(WEEKDAYS)), np.nan, dtype=np.float32)
+        for e, emp in enumerate(employees):
+            totals = as_list(emp.get('toplam_mesai'))
+            days = as_list(emp.get('gunluk_mesai'))
+            for j, week in enumerate(as_list(emp.get('tarih_araligi'))):
+                w = week_index[str(week)]
+                if j < len(totals):
+                    try:
+                        self.weekly[e, w] = np.nan_to_num(self.weekly[e, w]) + float(totals[j])
+                    except (TypeError, ValueError):
+                        pass
+                if j < len(days) and isinstance(days[j], dict):
+                    for day, hours in days[j].items():
+                        d = day_index(day)
+                        if d is None:
+                            continue
+                        try:
+                            self.daily[e, w, d] = np.nan_to_num(self.daily[e, w, d]) + float(hours)
+                        except (TypeError, ValueError):
+                            pass
+
+    def _precompute(self):
+        present = ~np.isnan(self.weekly)
+        weekly = np.where(present, self.weekly, 0.0)
+
+        self.employee_totals = weekly.sum(axis=1)
+        self.employee_periods = present.sum(axis=1)
+        self.total_hours = float(weekly.sum())
+        self.total_periods = int(present.sum())
+
+        standard = Config.STANDARD_WEEKLY_HOURS
+        self.employee_overtime = np.where(present, np.maximum(self.weekly - standard, 0.0), 0.0).sum(axis=1)
+        self.overtime_order = np.argsort(-self.employee_overtime, kind='stable')
+
+        day_present = ~np.isnan(self.daily)
+        day_hours = np.where(day_present, self.daily, 0.0)
+        day_counts = day_present.sum(axis=(0, 1))
+        self.weekday_avg = day_hours.sum(axis=(0, 1)) / np.maximum(day_counts, 1)
+        self.weekday_counts = day_counts
+        self.employee_weekday_avg = day_hours.sum(axis=1) / np.maximum(day_present.sum(axis=1), 1)
+
+        week_counts = present.sum(axis=0)
+        self.week_totals = weekly.sum(axis=0)
+        self.week_avg = self.week_totals / np.maximum(week_counts, 1)
+        self.week_counts = week_counts
+        self.week_deltas = np.diff(self.week_totals, prepend=self.week_totals[:1]) if len(self.weeks) else self.week_totals
+        self.sorted_weekly = np.sort(self.weekly[present])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "totalEmployees": len(self.names),
+            "totalRecords": self.total_periods,
+            "avgWorkHours": round(self.total_hours / self.total_periods, 2) if self.total_periods else 0,
+            "totalWorkHours": self.total_hours
+        }
+
+    def top_overtime(self, n: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "isim": self.names[i],
+                "overtimeHours": float(self.employee_overtime[i]),
+                "totalHours": float(self.employee_totals[i]),
+                "weeks": int(self.employee_periods[i])
+            }
+            for i in self.overtime_order[:n]
+        ]
+
+    def weekday_averages(self) -> List[Dict[str, Any]]:
+        return [
+            {"day": day, "avgHours": round(float(self.weekday_avg[d]), 2), "records": int(self.weekday_counts[d])}
+            for d, day in enumerate(WEEKDAYS)
+        ]
+
+    def weekly_trend(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "week": week,
+                "totalHours": float(self.week_totals[w]),
+                "avgHours": round(float(self.week_avg[w]), 2),
+                "employees": int(self.week_counts[w]),
+                "deltaHours": float(self.week_deltas[w])
+            }
+            for w, week in enumerate(self.weeks)
+        ]
+
+    def percentiles(self, points: List[float]) -> Dict[str, float]:
+        if not len(self.sorted_weekly):
+            return {f"p{p:g}": 0.0 for p in points}
+        values = np.percentile(self.sorted_weekly, points)
+        return {f"p{p:g}": round(float(v), 2) for p, v in zip(points, values)}
+
+    def employee(self, isim: str) -> Optional[Dict[str, Any]]:
+        i = self.name_index.get(isim.lower())
+        if i is None:
+            return None
+        row = self.weekly[i]
+        weeks = [
+            {"week": week, "hours": float(row[w])}
+            for w, week in enumerate(self.weeks) if not np.isnan(row[w])
+        ]
+        return {
+            "isim": self.names[i],
+            "totalHours": float(self.employee_totals[i]),
+            "overtimeHours": float(self.employee_overtime[i]),
+            "weeks": weeks,
+            "weekdayAverages": {day: round(float(self.employee_weekday_avg[i, d]), 2) for d, day in enumerate(WEEKDAYS)}
+        }
+
+class EmployeeStatsService:
+    """Snapshot sürümü değiştiğinde StatsEngine'i bir kez yeniden kurar"""
+
+    def __init__(self):
+        self._engine: Optional[StatsEngine] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> StatsEngine:
+        return self.for_snapshot(employee_store.get())
+
+    def for_snapshot(self, snapshot: EmployeeSnapshot) -> StatsEngine:
+        """Verilen snapshot'ın istatistikleri; snapshot ile birlikte okunan
+        veriler (by_id, extras) aynı sürümden gelir"""
+        engine = self._engine
+        if engine is not None and engine.version == snapshot.version:
+            return engine
+        with self._lock:
+            if self._engine is None or self._engine.version != snapshot.version:
+                self._engine = StatsEngine(snapshot)
+                logger.info(f"İstatistik dizileri hazırlandı: {self._engine.weekly.shape} (sürüm {snapshot.version})")
+            return self._engine
+
+# Singleton instance
+employee_stats = EmployeeStatsService()
@@ -0,0 +1,305 @@
+import copy
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import Config
+from services import profiling
+from services.snapshot_format import ColumnarSnapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+class _CurrentIds(Mapping):
+    """id → kayıt indeksi; snapshot yazıldıktan sonra değişen kayıtları gizler"""
+
+    def __init__(self, snapshot: 'EmployeeSnapshot'):
+        self._snapshot = snapshot
+        self._rows = snapshot._rows_by_id
+
+    def __getitem__(self, emp_id) -> int:
+        if self._snapshot.is_stale(emp_id):
+            raise KeyError(emp_id)
+        return self._rows[emp_id]
+
+    def __iter__(self):
+        return (emp_id for emp_id in self._rows if not self._snapshot.is_stale(emp_id))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+class EmployeeSnapshot:
+    """Çalışan verisinin değişmez (immutable) bellek içi görünümü.
+
+    Sütunsal snapshot'tan açıldığında kayıt sözlükleri yalnızca ihtiyaç
+    duyulduğunda oluşturulur; diziler doğrudan ``columns`` üzerinden okunur.
+    ``changes`` snapshot yazıldıktan sonra günlüğe düşen CRUD değişiklikleridir;
+    bu kayıtlar ``by_id`` içinde görünmez, güncel hâlleri Qdrant'tan okunur.
+    """
+
+    def __init__(self, employees: List[Dict[str, Any]] = None, version: str = "empty",
+                 columns: Optional[ColumnarSnapshot] = None):
+        self._employees = employees if employees is not None else []
+        self.columns = columns
+        self.version = version
+        self.loaded_at = time.time()
+        self.changes: Tuple[Dict[str, Any], ...] = ()
+        self.stale_ids = frozenset()
+        self.cleared = False
+
+    @property
+    def revision(self) -> str:
+        """Bekleyen değişiklikleri de içeren sürüm (yanıt cache anahtarları için)"""
+        return f"{self.version}+{len(self.changes)}" if self.changes else self.version
+
+    def with_changes(self, changes: List[Dict[str, Any]]) -> 'EmployeeSnapshot':
+        """Aynı diziler üzerinde, verilen değişiklikleri bilen görünüm"""
+        view = copy.copy(self)
+        view.changes = tuple(changes)
+        view.stale_ids = frozenset(change['id'] for change in view.changes if change.get('id') is not None)
+        view.cleared = any(change['op'] == 'clear' for change in view.changes)
+        return view
+
+    def is_stale(self, emp_id) -> bool:
+        """Kayıt snapshot yazıldıktan sonra eklendi, güncellendi ya da silindi mi?"""
+        return self.cleared or emp_id in self.stale_ids
+
+    @cached_property
+    def employees(self) -> List[Dict[str, Any]]:
+        return self.columns.records() if self.columns is not None else self._employees
+
+    @cached_property
+    def names(self) -> List[Tuple[str, int]]:
+        """(küçük harfli isim, kayıt indeksi) - isim eşleştirmede her istekte .lower() çağırmamak için"""
+        names = self.columns.names if self.columns is not None else [emp.get('isim', '') for emp in self._employees]
+        return [(str(name).lower(), i) for i, name in enumerate(names)]
+
+    @cached_property
+    def _rows_by_id(self) -> Dict[int, int]:
+        if self.columns is not None:
+            return {int(emp_id): i for i, emp_id in enumerate(self.columns.ids.tolist())}
+        return {emp['id']: i for i, emp in enumerate(self._employees) if emp.get('id') is not None}
+
+    @property
+    def by_id(self) -> Mapping:
+        """id → kayıt indeksi (snapshot'tan sonra değişen kayıtlar hariç)"""
+        return _CurrentIds(self) if self.changes else self._rows_by_id
+
+    def record(self, i: int) -> Dict[str, Any]:
+        return self.columns.record(i) if self.columns is not None else self._employees[i]
+
+    def __len__(self) -> int:
+        return len(self.columns) if self.columns is not None else len(self._employees)
+
+class EmployeeStore:
+    """Sürümlü çalışan snapshot'ı.
+
+    Birincil kaynak mmap ile açılan sütunsal dosyadır (EMPLOYEES_SNAPSHOT_PATH);
+    yoksa eski employees.json okunur. Dosya yalnızca sürüm (mtime) değiştiğinde
+    yeniden açılır ve yeni snapshot tek bir referans ataması ile yerine konur;
+    okuyucular kilit almaz.
+
+    CRUD değişiklikleri snapshot'ı yeniden yazmaz: ``record_change`` ile
+    yanındaki değişiklik günlüğüne (``<snapshot>.changes``, JSON satırları)
+    eklenir. Her süreç günlüğün yalnızca yeni satırlarını okur ve snapshot'ın
+    veri sürümünden sonraki değişiklikleri ``EmployeeSnapshot.changes`` olarak
+    yayınlar; ``write`` snapshot'a girmiş satırları günlükten atar.
+    """
+
+    def __init__(self, path: str = None, json_path: str = None, check_interval: float = None):
+        self.path = path or Config.EMPLOYEES_SNAPSHOT_PATH
+        self.json_path = json_path or Config.EMPLOYEES_JSON_PATH
+        self.check_interval = Config.EMPLOYEE_SNAPSHOT_CHECK_INTERVAL if check_interval is None else check_interval
+        self.changes_path = f"{self.path}.changes"
+        self._snapshot = self._base = EmployeeSnapshot(version="empty")
+        self._changes: List[Dict[str, Any]] = []
+        # (ilk satır, okunan bayt) - günlük yalnızca kaldığı yerden okunur; ilk satır
+        # değiştiyse günlük sıkıştırılmıştır (sıkıştırma benzersiz bir başlık satırı yazar)
+        self._changes_state: Optional[Tuple[bytes, int]] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+    @staticmethod
+    def _file_version(path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return f"{st.st_mtime_ns}-{st.st_size}"
+
+    def get(self) -> EmployeeSnapshot:
+        """Güncel snapshot'ı döndür (gerekirse yeniden yükle)"""
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._refresh(now)
+        return self._snapshot
+
+    def _refresh(self, now: float):
+        if not self._lock.acquire(blocking=False):
+            # Başka bir thread zaten yüklüyor, eski snapshot ile devam et
+            return
+        try:
+            self._last_check = now
+            # Önce günlük, sonra snapshot: yazıcı snapshot'ı günlüğü sıkıştırmadan önce
+            # değiştirdiği için sıkıştırılmış günlük eski snapshot ile eşleşmez
+            changed = self._read_changes()
+            base = self._load_base()
+            if changed or base is not self._base:
+                self._base = base
+                self._publish()
+        except Exception as e:
+            logger.error(f"Çalışan snapshot'ı yüklenemedi: {e}")
+        finally:
+            self._lock.release()
+
+    def _load_base(self) -> EmployeeSnapshot:
+        """Dosya sürümü değiştiyse snapshot'ı aç, değişmediyse mevcut olanı döndür"""
+        version = self._file_version(self.path)
+        if version is not None:
+            if version == self._base.version:
+                return self._base
+            # O(1): yalnızca header okunur, diziler mmap görünümüdür
+            with profiling.span("snapshot.open"):
+                snapshot = EmployeeSnapshot(version=version, columns=ColumnarSnapshot(self.path))
+            logger.info(f"Çalışan snapshot'ı açıldı: {len(snapshot)} kayıt (sürüm {version})")
+            return snapshot
+        # Sütunsal dosya yoksa eski JSON formatını oku
+        version = self._file_version(self.json_path)
+        if version is None:
+            return self._base if self._base.version == "empty" else EmployeeSnapshot(version="empty")
+        if version == self._base.version:
+            return self._base
+        with profiling.span("snapshot.load_json"):
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                employees = json.load(f)
+        logger.info(f"Çalışan snapshot'ı yüklendi (JSON): {len(employees)} kayıt (sürüm {version})")
+        return EmployeeSnapshot(employees, version=version)
+
+    def _read_changes(self) -> bool:
+        """Günlüğün yeni satırlarını oku (self._lock altında); bir şey değiştiyse True"""
+        try:
+            f = open(self.changes_path, "rb")
+        except FileNotFoundError:
+            if self._changes_state is None:
+                return False
+            self._changes, self._changes_state = [], None
+            return True
+        with f:
+            head = f.readline()
+            if not head.endswith(b"\n"):
+                # İlk satır henüz yazılıyor
+                return False
+            reset = self._changes_state is None or self._changes_state[0] != head
+            offset = 0 if reset else self._changes_state[1]
+            f.seek(offset)
+            data = f.read()
+        # Yarım kalmış son satır bir sonraki okumaya bırakılır
+        end = data.rfind(b"\n") + 1
+        if not reset and not end:
+            return False
+        if reset:
+            self._changes = []
+        entries = (json.loads(line) for line in data[:end].splitlines() if line.strip())
+        self._changes.extend(entry for entry in entries if entry['op'] != 'compact')
+        self._changes_state = (head, offset + end)
+        return True
+
+    def _publish(self):
+        """Snapshot'ın veri sürümünden sonraki değişiklikleri snapshot ile birlikte yayınla"""
+        base = self._base
+        # JSON snapshot'ın veri sürümü bilinmez: günlükteki her şey bekliyor sayılır
+        data_version = base.columns.data_version if base.columns is not None else 0
+        pending = [change for change in self._changes if change['ts'] >= data_version]
+        self._snapshot = base.with_changes(pending) if pending else base
+
+    def record_change(self, op: str, emp_id: Any = None, isim: str = None):
+        """Qdrant'a yazılmış bir CRUD değişikliğini günlüğe ekle.
+
+        ``op``: 'upsert' (ekleme/güncelleme), 'delete' ya da 'clear' (tümü
+        silindi). Değişiklik Qdrant'a yazıldıktan sonra çağrılmalıdır: zaman
+        damgası snapshot'ın veri sürümüyle karşılaştırılır.
+        """
+        entry = {"ts": time.time_ns(), "op": op, "id": emp_id, "isim": isim}
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._writer_lock():
+            fd = os.open(self.changes_path, os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        self.invalidate()
+
+    def _compact_changes(self, data_version: int):
+        """Snapshot'a girmiş (veri sürümünden önceki) satırları günlükten at"""
+        try:
+            with open(self.changes_path, "rb") as f:
+                lines = [line for line in f.read().splitlines() if line.strip()]
+        except FileNotFoundError:
+            return
+        entries = [(line, json.loads(line)) for line in lines]
+        keep = [line for line, entry in entries if entry['op'] != 'compact' and entry['ts'] >= data_version]
+        header = json.dumps({"ts": data_version, "op": "compact"}).encode("utf-8")
+        tmp_path = f"{self.changes_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(line + b"\n" for line in [header] + keep))
+        os.replace(tmp_path, self.changes_path)
+
+    def invalidate(self):
+        """Bir sonraki get() çağrısında sürüm kontrolünü zorla"""
+        self._last_check = 0.0
+
+    @contextmanager
+    def _writer_lock(self):
+        """Yazıcıları (tüm süreç ve thread'lerde) sıraya sok"""
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def write(self, employees: List[Dict[str, Any]], json_path: str = None, data_version: int = None):
+        """Yeni sürümü atomik olarak yaz ve snapshot'ı hemen değiştir.
+
+        ``data_version`` verinin okunmaya başlandığı an (time.time_ns()); bundan
+        önceki günlük satırları snapshot'a girmiş sayılır ve günlükten atılır.
+        JSON çıktısı yalnızca hata ayıklama içindir: ``json_path`` verilirse
+        ya da EMPLOYEES_JSON_EXPORT açıksa ayrıca yazılır.
+        """
+        json_path = json_path or (self.json_path if Config.EMPLOYEES_JSON_EXPORT else None)
+        data_version = data_version or time.time_ns()
+        with self._writer_lock():
+            write_snapshot(self.path, employees, data_version=data_version)
+            if json_path:
+                directory = os.path.dirname(os.path.abspath(json_path))
+                tmp_path = os.path.join(directory, f".{os.path.basename(json_path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(employees, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, json_path)
+            self._compact_changes(data_version)
+            with self._lock:
+                version = self._file_version(self.path)
+                self._read_changes()
+                # Eski snapshot'ın mmap'i burada kapatılmaz: okuyucular dizilerini hâlâ
+                # kullanıyor olabilir; son referans düşünce mmap nesnesiyle birlikte kapanır
+                self._base = EmployeeSnapshot(version=version, columns=ColumnarSnapshot(self.path))
+                self._publish()
+                self._last_check = time.monotonic()
+
+    def clear(self):
+        """Snapshot dosyalarını ve değişiklik günlüğünü sil"""
+        with self._lock:
+            for path in (self.path, self.json_path, self.changes_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._changes, self._changes_state = [], None
+            self._snapshot = self._base = EmployeeSnapshot(version="empty")
+            self._last_check = time.monotonic()
+
+# Singleton instance
+employee_store = EmployeeStore()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import Config
+from services import profiling
+from services.ai_service import ai_service
+from services.qdrant_service import qdrant_service
+
+logger = logging.getLogger(__name__)
+
+SYNC_FIELDS = ('isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai')
+
+def employee_key(isim: str) -> str:
+    """Çalışanı tanımlayan normalleştirilmiş isim"""
+    return " ".join(str(isim or "").strip().lower().split())
+
+def point_id_for(key: str) -> int:
+    """Normalleştirilmiş isimden deterministik (63 bit) Qdrant nokta id'si"""
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+def content_hash(employee: Dict[str, Any]) -> str:
+    """Kaydın içerik özeti (vektör hariç)"""
+    content = {field: employee.get(field) for field in SYNC_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+@profiling.traced("sync.embed_upsert")
+def _embed_and_upsert(employees: List[Dict[str, Any]], ids: List[int], collection_name: str,
+                      on_batch: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Yalnızca verilen çalışanları batch'ler halinde embed edip upsert et.
+
+    ``on_batch(embedded, upserted)`` her batch yazıldıktan sonra çağrılır;
+    istisna fırlatırsa (ör. iptal) kalan batch'ler işlenmez.
+    """
+    batch_size = Config.AI_EMBEDDING_BATCH_SIZE
+    upserted = 0
+    failed_rows = []
+    failed_batches = []
+    for start in range(0, len(employees), batch_size):
+        batch = employees[start:start + batch_size]
+        batch_ids = ids[start:start + batch_size]
+        try:
+            embedding_results = ai_service.generate_embeddings([emp.get('isim', '') for emp in batch])
+            for employee_data, embedding_result in zip(batch, embedding_results):
+                employee_data['vector'] = embedding_result.get('embedding', [0.0]*Config.QDRANT_VECTOR_SIZE)
+                if not embedding_result.get('success'):
+                    # Fallback vektörlü kayıt bir sonraki senkronizasyonda yeniden denensin
+                    employee_data['content_hash'] = None
+        except Exception as e:
+            logger.error(f"Embedding batch hatası: {e}")
+            failed_rows.extend(emp['isim'] for emp in batch)
+            failed_batches.append({"batch": start // batch_size, "error": str(e)})
+            if on_batch is not None:
+                on_batch(len(batch), 0)
+            continue
+        result = qdrant_service.add_employees_bulk(batch, ids=batch_ids, collection_name=collection_name)
+        upserted += len(result["added"])
+        for failed_batch in result["failed_batches"]:
+            failed_rows.extend(failed_batch["isimler"])
+            failed_batches.append({"batch": start // batch_size, "error": failed_batch["error"]})
+        if on_batch is not None:
+            on_batch(len(batch), len(result["added"]))
+    return {"upserted": upserted, "failed_rows": failed_rows, "failed_batches": failed_batches}
+
+def sync_employees(employees: List[Dict[str, Any]], mode: str = None,
+                   on_batch: Optional[Callable[[int, int], None]] = None,
+                   on_plan: Optional[Callable[[int, int, int], None]] = None) -> Dict[str, Any]:
+    """Qdrant'ı verilen çalışan listesiyle eşitle.
+
+    ``diff``: yalnızca yeni/değişen çalışanlar embed edilip upsert edilir,
+    listede olmayanlar silinir. Değişiklikler canlı koleksiyona uygulanır;
+    snapshot okuyucuları export'a kadar önceki sürümü görür, Qdrant'tan
+    okuyan yollar (vektör araması, CRUD listeleri) ise yarım uygulanmış
+    yüklemeyi görebilir. Bu yüzden varsayılan ``alias``'tır.
+
+    ``alias``: değişmeyen noktalar (vektörleriyle) yeni bir fiziksel
+    koleksiyona kopyalanır, değişenler eklenir ve alias tek işlemle çevrilir;
+    Qdrant okuyucuları da geçiş anına kadar önceki sürümü görür. Servis adı
+    alias değil gerçek bir koleksiyonsa AliasConversionRequired fırlatılır
+    (koleksiyon bir kez scripts/migrate_collection.py ile dönüştürülmeli).
+
+    ``replace``: eski davranış; koleksiyon sıfırlanır ve herkes yeniden eklenir.
+
+    Nokta id'leri isimden türetildiği ve içerik özeti noktayla birlikte
+    yazıldığı için yarıda kalan bir ``diff`` senkronizasyonu aynı dosyayla
+    yeniden çalıştırıldığında son yazılan batch'ten devam eder.
+    ``on_plan(changed, unchanged, removed)`` fark hesaplandıktan sonra çağrılır.
+    """
+    mode = mode or Config.UPLOAD_SYNC_MODE
+    if mode == 'replace':
+        qdrant_service.delete_all_employees()
+    desired = {}
+    for employee in employees:
+        key = employee_key(employee.get('isim'))
+        if not key:
+            continue
+        employee['content_hash'] = content_hash(employee)
+        desired[point_id_for(key)] = employee
+
+    with profiling.span("sync.diff", employees=len(desired)):
+        existing = {point_id: digest for point_id, _, digest in qdrant_service.list_employee_hashes()}
+        changed_ids = [point_id for point_id, emp in desired.items() if existing.get(point_id) != emp['content_hash']]
+        removed_ids = [point_id for point_id in existing if point_id not in desired]
+    unchanged = len(desired) - len(changed_ids)
+    logger.info(f"Senkronizasyon ({mode}): {len(changed_ids)} yeni/değişen, {unchanged} aynı, {len(removed_ids)} silinecek")
+    if on_plan is not None:
+        on_plan(len(changed_ids), unchanged, len(removed_ids))
+
+    if mode == 'alias' and (changed_ids or removed_ids):
+        alias = qdrant_service.collection_name
+        # Alias'sız eski kurulum: kopyalamaya başlamadan reddet (koleksiyon silinmez)
+        qdrant_service.require_alias(alias)
+        source = qdrant_service.get_alias_target(alias)
+        target = qdrant_service.new_physical_collection_name()
+        # Yükleme sırasında HNSW segment segment kurulmaz; veri bitince bir kez kurulur
+        defer_indexing = Config.QDRANT_SYNC_DEFER_INDEXING
+        qdrant_service.create_collection(target, defer_indexing=defer_indexing)
+        try:
+            # Alias henüz yoksa (ilk yükleme) kopyalanacak eski sürüm yok
+            copied = qdrant_service.copy_points(source, target, exclude_ids=set(changed_ids) | set(removed_ids)) if source else 0
+            result = _embed_and_upsert([desired[i] for i in changed_ids], changed_ids, target, on_batch)
+            if defer_indexing and not result["failed_batches"]:
+                qdrant_service.finalize_collection(target)
+        except Exception:
+            # İptal veya beklenmeyen hata: yarım koleksiyon yayınlanmadan silinir
+            qdrant_service.client.delete_collection(target)
+            raise
+        if result["failed_batches"]:
+            # Yarım kalan sürüm yayınlanmaz; eski koleksiyon aynen kalır
+            qdrant_service.client.delete_collection(target)
+            raise Exception(f"Senkronizasyon tamamlanamadı, değişiklik yayınlanmadı: {result['failed_batches']}")
+        qdrant_service.publish_collection(alias, target)
+        result.update({"copied": copied})
+    elif mode == 'alias':
+        result = {"upserted": 0, "failed_rows": [], "failed_batches": []}
+    else:
+        result = _embed_and_upsert([desired[i] for i in changed_ids], changed_ids,
+                                   qdrant_service.collection_name, on_batch)
+        if removed_ids:
+            qdrant_service.delete_employees(removed_ids)
+
+    result.update({
+        "mode": mode,
+        "changed": len(changed_ids),
+        "unchanged": unchanged,
+        "removed": len(removed_ids)
+    })
+    return result
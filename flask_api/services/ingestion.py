@@ -0,0 +1,186 @@
+"""Excel/CSV/Parquet mesai tablolarının akışlı ve vektörel olarak okunması.
+
+Satırlar parça parça (chunk) okunur; tarih aralığı ve günlük mesai gibi
+alanlar satır satır değil sütun bazında, tekrar eden değerler yalnızca bir
+kez ayrıştırılarak işlenir. Hatalı satırlar ilk hatada durmak yerine toplu
+olarak raporlanır.
+"""
+import ast
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai']
+
+class IngestionError(Exception):
+    """Dosya okunamadığında veya başlıklar eksik olduğunda fırlatılır"""
+
+def detect_format(filename: str) -> str:
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext in ('.csv', '.txt'):
+        return 'csv'
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext == '.xls':
+        return 'xls'
+    return 'xlsx'
+
+def _check_columns(columns) -> None:
+    missing = set(REQUIRED_COLUMNS) - set(columns)
+    if missing:
+        raise IngestionError(f"Excel başlıkları eksik: {missing}")
+
+def iter_chunks(path: str, fmt: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """Dosyayı en fazla ``chunk_size`` satırlık DataFrame parçaları halinde oku"""
+    chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+    if fmt == 'csv':
+        reader = pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        for i, chunk in enumerate(reader):
+            if i == 0:
+                _check_columns(chunk.columns)
+            yield chunk[REQUIRED_COLUMNS]
+    elif fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise IngestionError("Parquet desteği için pyarrow kurulu olmalı")
+        parquet = pq.ParquetFile(path)
+        _check_columns(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=REQUIRED_COLUMNS):
+            yield batch.to_pandas()
+    elif fmt == 'xls':
+        # Eski .xls için akışlı okuyucu yok
+        df = pd.read_excel(path)
+        _check_columns(df.columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size][REQUIRED_COLUMNS]
+    else:
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(c).strip() if c is not None else '' for c in next(rows, [])]
+            _check_columns(header)
+            indices = [header.index(column) for column in REQUIRED_COLUMNS]
+            buffer = []
+            for row in rows:
+                buffer.append([row[i] if i < len(row) else None for i in indices])
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame(buffer, columns=REQUIRED_COLUMNS)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=REQUIRED_COLUMNS)
+        finally:
+            workbook.close()
+
+def _map_unique(series: pd.Series, func) -> pd.Series:
+    """Fonksiyonu yalnızca tekil değerlere uygula (tekrar eden tarih/gün değerleri için)"""
+    uniques = pd.unique(series)
+    return series.map(dict(zip(uniques, map(func, uniques))))
+
+def _parse_daily(value) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return {}
+    try:
+        # Excel'deki "{'pazartesi': 8}" biçimi için önce hızlı JSON yolu
+        parsed = json.loads(value.replace("'", '"'))
+    except ValueError:
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            logger.warning(f"gunluk_mesai parse hatası, veri: {value}")
+            return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+def _standardize_dates(series: pd.Series) -> pd.Series:
+    """'07.07.2025/13.07.2025' → '2025-07-07/2025-07-13' (sütun bazında, tekil değerler üzerinde)"""
+    raw = series.fillna('').astype(str).str.strip()
+    uniques = pd.Series(pd.unique(raw))
+    if uniques.empty:
+        return raw
+    parts = uniques.str.replace('.', '-', regex=False).str.split('/', n=1, expand=True)
+    if parts.shape[1] < 2:
+        return raw
+    standardized = uniques.copy()
+    two_parts = parts[1].notna()
+    sides = []
+    for side in (parts[0], parts[1]):
+        side = side.fillna('').str.strip()
+        iso = pd.to_datetime(side, format='%Y-%m-%d', errors='coerce')
+        dmy = pd.to_datetime(side, format='%d-%m-%Y', errors='coerce')
+        # Ayrıştırılamayan taraf olduğu gibi bırakılır
+        sides.append(iso.fillna(dmy).dt.strftime('%Y-%m-%d').fillna(side))
+    standardized[two_parts] = sides[0][two_parts] + '/' + sides[1][two_parts]
+    return raw.map(dict(zip(uniques, standardized)))
+
+def parse_chunk(df: pd.DataFrame, row_offset: int = 0) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Bir parçayı sütun bazında temizle; (geçerli satırlar, hatalı satırlar) döndür"""
+    parsed = pd.DataFrame(index=df.index)
+    parsed['isim'] = df['isim'].fillna('').astype(str).str.strip().str.lower()
+    parsed['toplam_mesai'] = pd.to_numeric(df['toplam_mesai'], errors='coerce')
+    parsed['tarih_araligi'] = _standardize_dates(df['tarih_araligi'])
+    parsed['gunluk_mesai'] = _map_unique(df['gunluk_mesai'].astype(object).where(df['gunluk_mesai'].notna(), ''), _parse_daily)
+    # Excel satır numarası (başlık satırı + 1 tabanlı)
+    parsed['satir'] = range(row_offset + 2, row_offset + 2 + len(df))
+
+    bad = (parsed['isim'].isin(['', 'nan'])) | parsed['toplam_mesai'].isna() | (parsed['toplam_mesai'] == 0) \
+        | (parsed['tarih_araligi'] == '')
+    errors = [
+        {"satir": int(row.satir), "isim": row.isim, "tarih": row.tarih_araligi, "toplam_mesai": None if pd.isna(row.toplam_mesai) else row.toplam_mesai}
+        for row in parsed[bad].itertuples(index=False)
+    ]
+    good = parsed[~bad].copy()
+    good['toplam_mesai'] = good['toplam_mesai'].astype(int)
+    return good, errors
+
+def group_employees(parsed: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Aynı isimli satırları (dosyadaki sırayı koruyarak) tek çalışan kaydında birleştir"""
+    if parsed.empty:
+        return []
+    # groupby().agg(list) Python seviyesinde çalışır; bunun yerine isim
+    # kodlarına göre kararlı sıralama yapıp dizileri grup sınırlarından böl
+    codes, names = pd.factorize(parsed['isim'], sort=False)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    toplam = np.split(parsed['toplam_mesai'].to_numpy()[order], bounds)
+    tarih = np.split(parsed['tarih_araligi'].to_numpy(dtype=object)[order], bounds)
+    gunluk = np.split(parsed['gunluk_mesai'].to_numpy(dtype=object)[order], bounds)
+    return [
+        {
+            'isim': isim,
+            'toplam_mesai': toplam[i].tolist(),
+            'tarih_araligi': tarih[i].tolist(),
+            'gunluk_mesai': gunluk[i].tolist()
+        }
+        for i, isim in enumerate(names)
+    ]
+
+def load_employees(path: str, fmt: str = None, chunk_size: int = None,
+                   on_chunk: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    """Dosyayı oku, ayrıştır ve çalışan bazında grupla.
+
+    Dönen sözlük: ``employees`` (gruplanmış kayıtlar), ``errors`` (tüm hatalı
+    satırlar) ve ``rows`` (okunan satır sayısı). ``on_chunk`` her parçadan
+    sonra o ana kadar okunan satır sayısıyla çağrılır.
+    """
+    fmt = fmt or detect_format(path)
+    parsed_chunks = []
+    errors = []
+    rows = 0
+    for chunk in iter_chunks(path, fmt, chunk_size):
+        good, bad = parse_chunk(chunk.reset_index(drop=True), rows)
+        rows += len(chunk)
+        parsed_chunks.append(good)
+        errors.extend(bad)
+        if on_chunk is not None:
+            on_chunk(rows)
+    parsed = pd.concat(parsed_chunks, ignore_index=True) if parsed_chunks else pd.DataFrame(columns=REQUIRED_COLUMNS)
+    return {"employees": group_employees(parsed), "errors": errors, "rows": rows}
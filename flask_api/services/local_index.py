@@ -0,0 +1,178 @@
+"""Snapshot vektörleri üzerinde süreç içi (Qdrant'sız) vektör arama.
+
+Tam (exact) arama tek bir NumPy matris-vektör çarpımıdır: sütunsal
+snapshot'taki float32 vektörler mmap üzerinden okunur, satır normları bir
+kez hesaplanır ve kosinüs skoru ``(V @ q) / |V|`` ile bulunur; böylece
+normalize edilmiş matris her worker'da ayrıca kopyalanmaz. Büyük
+koleksiyonlarda ``hnswlib`` kuruluysa arka planda bir HNSW grafiği kurulur
+ve hazır olduğunda yaklaşık (ANN) arama onunla yapılır.
+
+Ne zaman kullanılacağı LOCAL_INDEX_POLICY ile belirlenir:
+    fallback - yalnızca Qdrant araması hata verdiğinde (varsayılan)
+    slo      - Qdrant gecikmesi LOCAL_INDEX_SLO_MS'i aştığında birincil yol
+    small    - snapshot LOCAL_INDEX_SMALL_MAX kayıttan küçükse her zaman
+    always   - her zaman (Qdrant yalnızca yedek)
+    off      - kapalı
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import Config
+from services import profiling
+from services.employee_store import employee_store, EmployeeSnapshot
+
+logger = logging.getLogger(__name__)
+
+class LocalVectorIndex:
+    """Bir snapshot sürümü için kosinüs top-k indeksi"""
+
+    def __init__(self, snapshot: EmployeeSnapshot, hnsw_min_size: int = None):
+        self.version = snapshot.version
+        self.snapshot = snapshot
+        if snapshot.columns is not None:
+            self.vectors = snapshot.columns.vectors
+        else:
+            rows = [emp.get('vector') or [] for emp in snapshot.employees]
+            dim = max((len(v) for v in rows), default=0)
+            self.vectors = np.zeros((len(rows), dim), dtype=np.float32)
+            for i, vector in enumerate(rows):
+                if len(vector) == dim:
+                    self.vectors[i] = vector
+        norms = np.linalg.norm(self.vectors, axis=1) if self.vectors.size else np.zeros(len(self.vectors))
+        # Sıfır vektörlü kayıtlar (embedding alınamamış) hiçbir zaman eşleşmez
+        self.inv_norms = np.divide(1.0, norms, out=np.zeros_like(norms, dtype=np.float32), where=norms > 0).astype(np.float32)
+        self.dim = self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+        self._hnsw = None
+        hnsw_min_size = Config.LOCAL_INDEX_HNSW_MIN_SIZE if hnsw_min_size is None else hnsw_min_size
+        if hnsw_min_size and len(self) >= hnsw_min_size:
+            threading.Thread(target=self.build_hnsw, name='local-index-hnsw', daemon=True).start()
+
+    def __len__(self) -> int:
+        return len(self.inv_norms)
+
+    def build_hnsw(self):
+        try:
+            import hnswlib
+        except ImportError:
+            logger.info("hnswlib kurulu değil, yerel indeks yalnızca tam arama yapacak")
+            return
+        started = time.perf_counter()
+        index = hnswlib.Index(space='cosine', dim=self.dim)
+        index.init_index(max_elements=len(self), ef_construction=Config.LOCAL_INDEX_HNSW_EF_CONSTRUCTION,
+                         M=Config.LOCAL_INDEX_HNSW_M)
+        present = np.flatnonzero(self.inv_norms > 0)
+        index.add_items(self.vectors[present], present)
+        index.set_ef(Config.LOCAL_INDEX_HNSW_EF)
+        self._hnsw = index
+        logger.info(f"HNSW grafiği hazır: {len(present)} vektör, {time.perf_counter() - started:.1f}s (sürüm {self.version})")
+
+    @property
+    def hnsw_ready(self) -> bool:
+        return self._hnsw is not None
+
+    def search(self, embedding: List[float], limit: int = 10, score_threshold: float = None,
+               exact: bool = None) -> List[Tuple[int, float]]:
+        """(kayıt indeksi, kosinüs skoru) listesini skora göre azalan sırada döndür"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if not len(self) or query.shape != (self.dim,) or query_norm == 0:
+            return []
+        limit = min(limit, len(self))
+        if self._hnsw is not None and not exact:
+            labels, distances = self._hnsw.knn_query(query, k=min(limit, self._hnsw.get_current_count()))
+            hits = [(int(i), float(1.0 - d)) for i, d in zip(labels[0], distances[0])]
+        else:
+            scores = (self.vectors @ (query / query_norm)) * self.inv_norms
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            hits = [(int(i), float(scores[i])) for i in top]
+        if score_threshold is not None:
+            hits = [(i, s) for i, s in hits if s >= score_threshold]
+        return hits
+
+class LocalIndexService:
+    """Snapshot sürümü değiştiğinde indeksi yeniden kurar ve kullanım politikasını uygular"""
+
+    def __init__(self, policy: str = None):
+        self.policy = policy or Config.LOCAL_INDEX_POLICY
+        self._index: Optional[LocalVectorIndex] = None
+        self._lock = threading.Lock()
+        # Qdrant arama gecikmesinin üssel hareketli ortalaması (ms)
+        self.remote_latency_ms: Optional[float] = None
+        self._last_remote_probe = 0.0
+        self.served = {"local": 0, "remote": 0, "fallback": 0}
+
+    def get(self) -> LocalVectorIndex:
+        snapshot = employee_store.get()
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+        with self._lock:
+            if self._index is None or self._index.version != snapshot.version:
+                self._index = LocalVectorIndex(snapshot)
+                logger.info(f"Yerel vektör indeksi hazırlandı: {len(self._index)} x {self._index.dim} (sürüm {snapshot.version})")
+            return self._index
+
+    def prefer_local(self) -> bool:
+        """Bu istek Qdrant'a gitmeden yerel indeksten mi karşılansın?"""
+        if self.policy in ('off', 'fallback'):
+            return False
+        if self.policy == 'always':
+            return True
+        if self.policy == 'small':
+            return 0 < len(employee_store.get()) <= Config.LOCAL_INDEX_SMALL_MAX
+        if self.policy == 'slo':
+            if self.remote_latency_ms is None or self.remote_latency_ms <= Config.LOCAL_INDEX_SLO_MS:
+                return False
+            # Qdrant düzelmiş mi diye arada bir yine uzak aramaya izin ver
+            now = time.monotonic()
+            if now - self._last_remote_probe >= Config.LOCAL_INDEX_PROBE_INTERVAL:
+                self._last_remote_probe = now
+                return False
+            return True
+        return False
+
+    def record_remote(self, elapsed_ms: float):
+        """Başarılı Qdrant aramasının süresini kaydet"""
+        self.served["remote"] += 1
+        if self.remote_latency_ms is None:
+            self.remote_latency_ms = elapsed_ms
+        else:
+            self.remote_latency_ms = 0.8 * self.remote_latency_ms + 0.2 * elapsed_ms
+
+    @profiling.traced("local_index.search")
+    def search(self, embedding: List[float], limit: int = 10, score_threshold: float = None,
+               fallback: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Qdrant search_by_embedding ile aynı biçimde sonuç döndür.
+
+        İndeks boşsa veya vektör boyutu uyuşmuyorsa None döner (çağıran
+        başka bir yola geçer).
+        """
+        if self.policy == 'off':
+            return None
+        index = self.get()
+        if not len(index) or len(embedding) != index.dim:
+            return None
+        hits = index.search(embedding, limit=limit, score_threshold=score_threshold)
+        self.served["fallback" if fallback else "local"] += 1
+        # Snapshot'tan sonra değişen/silinen kayıtlar (değişiklik günlüğü) döndürülmez
+        current = employee_store.get()
+        records = (index.snapshot.record(i) for i, _ in hits)
+        return [{"score": score, **record} for (_, score), record in zip(hits, records)
+                if not current.is_stale(record.get('id'))]
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        return {
+            "policy": self.policy,
+            "size": len(index) if index is not None else 0,
+            "dim": index.dim if index is not None else 0,
+            "hnsw": index.hnsw_ready if index is not None else False,
+            "remoteLatencyMs": round(self.remote_latency_ms, 2) if self.remote_latency_ms is not None else None,
+            "served": dict(self.served)
+        }
+
+# Singleton instance
+local_index = LocalIndexService()
@@ -0,0 +1,151 @@
+"""Prometheus metrikleri (/metrics).
+
+Gunicorn birden çok worker ile çalıştığında her süreç kendi değerlerini
+PROMETHEUS_MULTIPROC_DIR altındaki dosyalara yazar ve /metrics tüm
+süreçlerin toplamını döndürür. Dizin gunicorn.conf.py'de her başlangıçta
+temizlenir; ölen worker'ların canlı gauge'ları ``child_exit`` ile düşülür.
+Değişken tanımlı değilse (tek süreç: flask run, hypercorn) varsayılan
+registry kullanılır. prometheus_client değişkeni import anında okur; bu
+yüzden dizin uygulama import edilmeden önce ayarlanmış olmalıdır.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from services import profiling
+
+logger = logging.getLogger(__name__)
+
+# Hızlı yol (ms) ile LLM üretimi (onlarca saniye) arasını kapsayan kovalar
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUESTS = Counter('http_requests_total', "API istekleri", ['method', 'route', 'status'])
+HTTP_ERRORS = Counter('http_request_errors_total', "5xx ile biten API istekleri", ['method', 'route'])
+HTTP_LATENCY = Histogram('http_request_duration_seconds', "Yanıt başlığına kadar geçen süre",
+                         ['method', 'route'], buckets=_LATENCY_BUCKETS)
+
+OLLAMA_LATENCY = Histogram('ollama_request_duration_seconds', "Ollama çağrı süresi (stream'de akışın sonuna kadar)",
+                           ['operation', 'outcome'], buckets=_LATENCY_BUCKETS)
+QDRANT_LATENCY = Histogram('qdrant_request_duration_seconds', "Qdrant çağrı süresi",
+                           ['operation', 'outcome'], buckets=_LATENCY_BUCKETS)
+
+FALLBACKS = Counter('fallbacks_total', "Yedek yola düşülen durumlar", ['kind'])
+
+LLM_PROMPT_TOKENS = Counter('llm_prompt_tokens_total', "Ollama'nın değerlendirdiği prompt token'ları")
+LLM_COMPLETION_TOKENS = Counter('llm_completion_tokens_total', "Ollama'nın ürettiği token'lar")
+LLM_EVAL_SECONDS = Counter('llm_eval_seconds_total', "Token üretiminde geçen süre (eval_duration toplamı)")
+LLM_TOKENS_PER_SECOND = Gauge('llm_tokens_per_second', "Son üretimin hızı (eval_count / eval_duration)",
+                              multiprocess_mode='mostrecent')
+LLM_LOAD_SECONDS = Gauge('llm_model_load_seconds', "Son üretimdeki model yükleme süresi (load_duration)",
+                         multiprocess_mode='mostrecent')
+
+ADMISSION_RUNNING = Gauge('ai_admission_running', "Ollama'da süren çağrılar", ['kind'], multiprocess_mode='livesum')
+ADMISSION_QUEUED = Gauge('ai_admission_queued', "Kabul kuyruğunda bekleyen çağrılar", ['kind'],
+                         multiprocess_mode='livesum')
+ADMISSION_WAIT = Histogram('ai_admission_wait_seconds', "Kuyrukta bekleme süresi", ['kind'], buckets=_LATENCY_BUCKETS)
+ADMISSION_REJECTED = Counter('ai_admission_rejected_total', "Kuyruk dolu (429) ya da zaman aşımı (503)",
+                             ['kind', 'reason'])
+
+STARTUP_PHASE_SECONDS = Gauge('startup_phase_seconds', "Başlangıç aşamalarının süresi (services/startup.py)", ['phase'],
+                              multiprocess_mode='max')
+
+class _Call:
+    """Ölçülen çağrı; hatayı kendisi yakalayan kod ``failed = True`` ile işaretler"""
+    __slots__ = ('failed',)
+
+    def __init__(self):
+        self.failed = False
+
+@contextmanager
+def _timed(histogram: Histogram, operation: str, span_name: str):
+    started = time.perf_counter()
+    call = _Call()
+    outcome = None
+    # Profil açıksa çağrı aynı zamanda profilin bir span'ıdır
+    span = profiling.span(span_name)
+    try:
+        with span:
+            yield call
+    except (GeneratorExit, asyncio.CancelledError):
+        # İstemci akışı kapattı; hata sayılmaz
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        call.failed = True
+        raise
+    finally:
+        outcome = outcome or ("error" if call.failed else "ok")
+        if outcome != "ok":
+            span.set(outcome=outcome)
+        histogram.labels(operation, outcome).observe(time.perf_counter() - started)
+
+def ollama_call(operation: str):
+    """``with metrics.ollama_call("generate"):`` bloğunun süresini ve sonucunu kaydet"""
+    return _timed(OLLAMA_LATENCY, operation, f"ollama.{operation}")
+
+def qdrant_call(operation: str):
+    """``with metrics.qdrant_call("search"):`` bloğunun süresini ve sonucunu kaydet"""
+    return _timed(QDRANT_LATENCY, operation, f"qdrant.{operation}")
+
+def fallback(kind: str):
+    FALLBACKS.labels(kind).inc()
+
+def record_generation(data: Dict[str, Any]):
+    """Ollama'nın üretim sonu alanlarından token sayaçları (süreler nanosaniye)"""
+    try:
+        LLM_PROMPT_TOKENS.inc(data.get('prompt_eval_count') or 0)
+        completion = data.get('eval_count') or 0
+        LLM_COMPLETION_TOKENS.inc(completion)
+        eval_seconds = (data.get('eval_duration') or 0) / 1e9
+        if eval_seconds > 0:
+            LLM_EVAL_SECONDS.inc(eval_seconds)
+            LLM_TOKENS_PER_SECOND.set(completion / eval_seconds)
+        if data.get('load_duration') is not None:
+            LLM_LOAD_SECONDS.set(data['load_duration'] / 1e9)
+        if profiling.active():
+            # Ollama'nın kendi ölçtüğü aşamalar, çağrı span'ının altında ardışık
+            offset = 0.0
+            for stage, key in (('load', 'load_duration'), ('prompt_eval', 'prompt_eval_duration'),
+                               ('eval', 'eval_duration')):
+                if data.get(key):
+                    profiling.add_child(f"ollama.{stage}", data[key] / 1e6, offset)
+                    offset += data[key] / 1e6
+            profiling.annotate(promptTokens=data.get('prompt_eval_count'), completionTokens=completion)
+    except (TypeError, ValueError) as e:
+        logger.debug(f"Üretim metrikleri okunamadı: {e}")
+
+def observe_request(method: str, route: Optional[str], status: int, seconds: float):
+    # Eşleşmeyen yollar tek etikette toplanır (etiket sayısı sınırsız büyümesin)
+    route = route or "unmatched"
+    HTTP_REQUESTS.labels(method, route, str(status)).inc()
+    HTTP_LATENCY.labels(method, route).observe(seconds)
+    if status >= 500:
+        HTTP_ERRORS.labels(method, route).inc()
+
+def init_app(app):
+    """Flask uygulamasına istek sayaç/süre kancalarını ekle"""
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe(response):
+        started = g.pop('metrics_started', None)
+        if started is not None and request.path != '/metrics':
+            rule = request.url_rule.rule if request.url_rule is not None else None
+            observe_request(request.method, rule, response.status_code, time.perf_counter() - started)
+        return response
+
+def render() -> Tuple[bytes, str]:
+    """Prometheus metin biçimi: (gövde, content-type)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
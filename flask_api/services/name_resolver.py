@@ -0,0 +1,271 @@
+"""Sorudaki kelimeleri çalışan isimlerine eşleyen isim çözümleme indeksi.
+
+- Türkçe büyük/küçük harf katlama (İ→i, I→ı) ve aksan normalleştirme
+  (ç→c, ğ→g, ı→i, ö→o, ş→s, ü→u): "IŞIK", "ışık" ve "isik" aynı token olur.
+- Tam eşleşme için token → çalışan id'leri; kısmi yazımlar için sıralı
+  token sözlüğü üzerinde önek araması (trie ile aynı işlevi görür, ekleme
+  ve silme bisect ile yapılır); yazım hataları için trigram indeksi.
+- Soru kalıbı kelimeleri (ne, kaç, saat, ve...) eşleştirmeye katılmaz.
+
+İndeks snapshot sürümü değiştiğinde yeniden kurulur. CRUD değişiklikleri
+snapshot'ın değişiklik günlüğünden (EmployeeSnapshot.changes) gelir ve
+indekse yalnızca yeni satırlar add/remove/clear ile uygulanır.
+"""
+import bisect
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Tuple
+from config.settings import Config
+from services.employee_store import employee_store
+
+logger = logging.getLogger(__name__)
+
+_TR_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_ASCII = str.maketrans({'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u', 'â': 'a', 'î': 'i', 'û': 'u'})
+_WORD = re.compile(r"[^\W_]+")
+
+STOP_WORDS = frozenset(
+    "ve ile ya da de ki mi mu ne neden nasil kac kim kimin kime hangi hangisi bu su o "
+    "bir icin gibi kadar daha en cok az her tum toplam saat saati saatleri mesai mesaisi "
+    "calisti calismis calisma calisan calisanlar gun gunu gunler hafta haftasi haftada "
+    "ay ayinda yil ortalama fazla karsilastir karsilastirma goster soyle nedir var mi "
+    "bana benim onun bey hanim".split()
+)
+
+def fold(text: str) -> str:
+    """Türkçe kurallarla küçült, birleşik işaretleri at ve ASCII'ye indir"""
+    text = unicodedata.normalize('NFKD', str(text).translate(_TR_UPPER).lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return text.translate(_ASCII)
+
+def fold_tokens(text: str, drop_stop_words: bool = True) -> List[str]:
+    tokens = _WORD.findall(fold(text))
+    return [t for t in tokens if not (drop_stop_words and t in STOP_WORDS)]
+
+def _trigrams(token: str) -> set:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameResolver:
+    """Çalışan isimleri için artımlı güncellenebilen eşleştirme indeksi"""
+
+    def __init__(self, track_store: bool = True):
+        # False ise indeks yalnızca rebuild/add/remove ile beslenir (benchmark, testler)
+        self.track_store = track_store
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self.version = None
+        # İndeksin kurulduğu snapshot sürümü ve uygulanmış günlük satırı sayısı
+        self._base_version = None
+        self._applied = 0
+        self._reset()
+
+    def _reset(self):
+        self._names: Dict[Any, str] = {}
+        self._name_tokens: Dict[Any, Tuple[str, ...]] = {}
+        self._postings: Dict[str, set] = {}
+        self._vocab: List[str] = []
+        self._trigrams: Dict[str, set] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _add_token(self, token: str, emp_id):
+        ids = self._postings.get(token)
+        if ids is None:
+            ids = self._postings[token] = set()
+            bisect.insort(self._vocab, token)
+            for gram in _trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(token)
+        ids.add(emp_id)
+
+    def _remove_token(self, token: str, emp_id):
+        ids = self._postings.get(token)
+        if ids is None:
+            return
+        ids.discard(emp_id)
+        if not ids:
+            del self._postings[token]
+            i = bisect.bisect_left(self._vocab, token)
+            if i < len(self._vocab) and self._vocab[i] == token:
+                del self._vocab[i]
+            for gram in _trigrams(token):
+                tokens = self._trigrams.get(gram)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigrams[gram]
+
+    def add(self, emp_id, isim: str):
+        """Çalışanı ekle (aynı id varsa ismi güncellenir)"""
+        # İndeks henüz kurulmadıysa sonradan yapılacak kurulum bu değişikliği ezmesin
+        if self.version is None:
+            self.ensure_current()
+        with self._lock:
+            self.remove(emp_id)
+            tokens = tuple(dict.fromkeys(fold_tokens(isim, drop_stop_words=False)))
+            self._names[emp_id] = isim
+            self._name_tokens[emp_id] = tokens
+            for token in tokens:
+                self._add_token(token, emp_id)
+
+    def remove(self, emp_id):
+        if self.version is None:
+            self.ensure_current()
+        with self._lock:
+            tokens = self._name_tokens.pop(emp_id, None)
+            if tokens is None:
+                return
+            del self._names[emp_id]
+            for token in tokens:
+                self._remove_token(token, emp_id)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def rebuild(self, entries: Iterable[Tuple[Any, str]], version: str = None):
+        """İndeksi (id, isim) çiftlerinden sıfırdan kur"""
+        started = time.perf_counter()
+        postings: Dict[str, set] = {}
+        names, name_tokens = {}, {}
+        for emp_id, isim in entries:
+            tokens = tuple(dict.fromkeys(fold_tokens(isim, drop_stop_words=False)))
+            names[emp_id] = isim
+            name_tokens[emp_id] = tokens
+            for token in tokens:
+                postings.setdefault(token, set()).add(emp_id)
+        trigrams: Dict[str, set] = {}
+        for token in postings:
+            for gram in _trigrams(token):
+                trigrams.setdefault(gram, set()).add(token)
+        with self._lock:
+            self._names, self._name_tokens, self._postings = names, name_tokens, postings
+            self._vocab = sorted(postings)
+            self._trigrams = trigrams
+            self.version = version
+        logger.info(f"İsim indeksi kuruldu: {len(names)} isim, {len(postings)} token, "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def ensure_current(self):
+        """Snapshot sürümü değiştiyse indeksi yeniden kur, yeni günlük satırlarını uygula"""
+        if not self.track_store:
+            return
+        snapshot = employee_store.get()
+        if snapshot.revision == self.version:
+            return
+        with self._build_lock:
+            if snapshot.revision == self.version:
+                return
+            if snapshot.version != self._base_version:
+                if snapshot.columns is not None:
+                    entries = zip(snapshot.columns.ids.tolist(), snapshot.columns.names)
+                else:
+                    entries = ((emp.get('id', emp.get('isim')), emp.get('isim', '')) for emp in snapshot.employees)
+                self.rebuild(entries, snapshot.version)
+                self._base_version, self._applied = snapshot.version, 0
+            # Aynı snapshot için günlük yalnızca uzar: daha önce uygulananlar atlanır
+            for change in snapshot.changes[self._applied:]:
+                if change['op'] == 'clear':
+                    self.clear()
+                elif change['op'] == 'delete':
+                    self.remove(change['id'])
+                else:
+                    self.add(change['id'], change.get('isim') or '')
+            self._applied = len(snapshot.changes)
+            self.version = snapshot.revision
+
+    def _token_matches(self, token: str) -> List[Tuple[str, float]]:
+        """Sorgu token'ı için (indeks token'ı, ağırlık): tam > önek > bulanık"""
+        matches = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        if len(token) >= Config.NAME_RESOLVER_PREFIX_MIN_LENGTH:
+            start = bisect.bisect_left(self._vocab, token)
+            for vocab_token in self._vocab[start:start + Config.NAME_RESOLVER_MAX_EXPANSIONS]:
+                if not vocab_token.startswith(token):
+                    break
+                if vocab_token != token:
+                    matches.append((vocab_token, 0.6 + 0.3 * len(token) / len(vocab_token)))
+        if not matches and len(token) >= 4:
+            # Yazım hatası: trigram Dice benzerliği. Eşiği geçen bir token en
+            # nadir (len - gerekli + 1) trigramdan en az birini paylaşmak zorunda;
+            # adaylar yalnızca bu trigramlardan toplanır.
+            grams = _trigrams(token)
+            min_similarity = Config.NAME_RESOLVER_MIN_SIMILARITY
+            required = max(math.ceil(min_similarity * (len(grams) + max(len(token) - 2, 1)) / 2), 1)
+            rarest = sorted(grams, key=lambda gram: len(self._trigrams.get(gram, ())))[:len(grams) - required + 1]
+            candidates = set()
+            for gram in rarest:
+                candidates.update(self._trigrams.get(gram, ()))
+            for vocab_token in candidates:
+                if abs(len(vocab_token) - len(token)) > 2:
+                    continue
+                vocab_grams = _trigrams(vocab_token)
+                similarity = 2 * len(grams & vocab_grams) / (len(grams) + len(vocab_grams))
+                if similarity >= min_similarity:
+                    matches.append((vocab_token, 0.9 * similarity))
+        return matches
+
+    def resolve(self, text: str, limit: int = 10, min_confidence: float = None) -> List[Dict[str, Any]]:
+        """Metinde geçen çalışanları güven skoruna göre sıralı döndür.
+
+        Her aday: ``id``, ``isim``, ``confidence`` (0-1) ve ``matched``
+        (eşleşen isim token'ları).
+        """
+        self.ensure_current()
+        min_confidence = Config.NAME_RESOLVER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        query_tokens = [t for t in dict.fromkeys(fold_tokens(text)) if len(t) >= 2]
+        with self._lock:
+            # Nadir token'lar önce: aday kümesini onlar belirler, çok yaygın
+            # token'lar (ör. sık geçen bir ad) yalnızca mevcut adayları puanlar
+            per_token = []
+            for token in query_tokens:
+                matches = self._token_matches(token)
+                if matches:
+                    per_token.append((sum(len(self._postings[v]) for v, _ in matches), matches))
+            per_token.sort(key=lambda item: item[0])
+
+            # id → {isim token'ı: ağırlık}; her sorgu token'ı bir çalışana en iyi eşleşmesiyle katkı verir
+            scores: Dict[Any, Dict[str, float]] = {}
+            max_candidates = Config.NAME_RESOLVER_MAX_CANDIDATES
+            for size, matches in per_token:
+                common = size > max_candidates
+                best: Dict[Any, Tuple[str, float]] = {}
+                for vocab_token, weight in sorted(matches, key=lambda m: -m[1]):
+                    ids = self._postings[vocab_token]
+                    if common and scores:
+                        ids = [emp_id for emp_id in scores if emp_id in ids] if len(scores) < len(ids) else \
+                            [emp_id for emp_id in ids if emp_id in scores]
+                    elif common:
+                        ids = itertools.islice(ids, max(max_candidates - len(best), 0))
+                    for emp_id in ids:
+                        if emp_id not in best or best[emp_id][1] < weight:
+                            best[emp_id] = (vocab_token, weight)
+                for emp_id, (vocab_token, weight) in best.items():
+                    matched = scores.setdefault(emp_id, {})
+                    matched[vocab_token] = max(matched.get(vocab_token, 0.0), weight)
+
+            candidates = []
+            for emp_id, matched in scores.items():
+                score = sum(matched.values())
+                coverage = len(matched) / max(len(self._name_tokens[emp_id]), 1)
+                confidence = score / len(matched) * (0.75 + 0.25 * coverage)
+                if confidence >= min_confidence:
+                    candidates.append((score, confidence, emp_id, list(matched)))
+        candidates.sort(key=lambda c: (-c[0], -c[1]))
+        return [
+            {"id": emp_id, "isim": self._names.get(emp_id, ''), "confidence": round(confidence, 3), "matched": matched}
+            for _, confidence, emp_id, matched in candidates[:limit]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"names": len(self._names), "tokens": len(self._vocab), "version": self.version}
+
+# Singleton instance
+name_resolver = NameResolver()
@@ -0,0 +1,385 @@
+"""İstek bazında isteğe bağlı profil: aşama span ağacı ve örnekleyici CPU profili.
+
+Profil yalnızca istendiğinde açılır:
+
+- ``X-Profile: 1`` başlığı ya da ``?profile=1`` + doğru ``X-Admin-Token``
+  (``cpu`` değeri ayrıca isteğin thread'inin CPU örneklemesini açar),
+- ya da PROFILING_SAMPLE_RATE olasılığıyla rastgele örnekleme.
+
+Aşamalar ``with profiling.span("ad"):`` veya ``@profiling.traced("ad")`` ile
+işaretlenir; Ollama ve Qdrant çağrıları metrics üzerinden kendiliğinden
+span olur. Profil kapalıyken span() tek bir ContextVar okuması yapıp
+paylaşılan boş bir nesne döndürür. Biten profilin üst düzey aşamaları
+``Server-Timing`` başlığına yazılır. Biten profil PROFILING_DIR altına
+``<id>.json`` (CPU örnekleri ``<id>.folded``) olarak yazılır; tüm gunicorn
+worker'ları aynı dizini gördüğü için /api/debug/profiles hangi worker'a
+düşerse düşsün aynı profilleri okur. En yeni PROFILING_BUFFER_SIZE profil tutulur.
+"""
+import functools
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional['Span']] = ContextVar('profiling_span', default=None)
+_profile: ContextVar[Optional['Profile']] = ContextVar('profiling_profile', default=None)
+
+class _NullSpan:
+    """Profil kapalıyken dönen, hiçbir şey yapmayan span"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    __slots__ = ('name', 'start', 'end', 'attrs', 'children', '_token')
+
+    def __init__(self, name: str, attrs: Dict[str, Any] = None, start: float = None, end: float = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = start
+        self.end = end
+        self.children: List['Span'] = []
+        self._token = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        _attach(self)
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        _current.reset(self._token)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        node = {"name": self.name, "startMs": round((self.start - origin) * 1000, 3),
+                "durationMs": round(self.duration_ms, 3)}
+        if self.attrs:
+            node["attrs"] = self.attrs
+        if self.children:
+            node["children"] = [child.to_dict(origin) for child in self.children]
+        return node
+
+def _attach(span: Span):
+    """Span'ı geçerli span'ın altına ekle (profil başına span sınırıyla)"""
+    profile = _profile.get()
+    parent = _current.get()
+    if profile is None or parent is None:
+        return
+    if profile.span_count >= Config.PROFILING_MAX_SPANS:
+        profile.dropped_spans += 1
+        return
+    profile.span_count += 1
+    parent.children.append(span)
+
+def span(name: str, **attrs):
+    """Aşama span'ı; profil yoksa paylaşılan boş span"""
+    if _current.get() is None:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+def traced(name: str):
+    """Fonksiyonun tamamını span olarak işaretleyen dekoratör"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def add_child(name: str, duration_ms: float, offset_ms: float = 0.0, **attrs):
+    """Geçerli span'a dışarıda ölçülmüş bir alt aşama ekle (ör. Ollama'nın kendi süreleri)"""
+    parent = _current.get()
+    if parent is None or duration_ms is None:
+        return
+    start = parent.start + offset_ms / 1000
+    _attach(Span(name, attrs, start=start, end=start + duration_ms / 1000))
+
+def annotate(**attrs):
+    parent = _current.get()
+    if parent is not None:
+        parent.attrs.update(attrs)
+
+def active() -> bool:
+    return _current.get() is not None
+
+class CpuSampler:
+    """Bir thread'in yığınını aralıklarla örnekleyip katlanmış (folded) yığınları sayar"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self, limit: int = None) -> List[str]:
+        """flamegraph.pl / speedscope'un okuduğu ``a;b;c sayı`` satırları"""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common(limit)]
+
+class Profile:
+    def __init__(self, name: str, trigger: str, cpu: bool = False):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.trigger = trigger
+        self.created_at = time.time()
+        self.root = Span(name)
+        self.span_count = 1
+        self.dropped_spans = 0
+        self.finished = False
+        self.sampler = CpuSampler(threading.get_ident(), Config.PROFILING_CPU_INTERVAL_MS / 1000) if cpu else None
+        self._tokens = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "trigger": self.trigger,
+            "createdAt": self.created_at,
+            "durationMs": round(self.root.duration_ms, 3),
+            "status": self.root.attrs.get('status'),
+            "stages": stage_totals(self.root),
+            "cpuSamples": self.sampler.samples if self.sampler else None,
+            "pid": os.getpid()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.summary()
+        data["spans"] = self.root.to_dict(self.root.start)
+        data["spanCount"] = self.span_count
+        data["droppedSpans"] = self.dropped_spans
+        if self.sampler is not None:
+            data["cpu"] = {"intervalMs": Config.PROFILING_CPU_INTERVAL_MS, "samples": self.sampler.samples,
+                           "folded": self.sampler.folded(Config.PROFILING_CPU_MAX_STACKS)}
+        return data
+
+def stage_totals(root: Span) -> Dict[str, float]:
+    """Kök span'ın doğrudan alt aşamaları (aynı isimliler toplanır), ms"""
+    totals: Dict[str, float] = {}
+    for child in root.children:
+        totals[child.name] = totals.get(child.name, 0.0) + child.duration_ms
+    return {name: round(value, 3) for name, value in totals.items()}
+
+_SUMMARY_FIELDS = ('id', 'name', 'trigger', 'createdAt', 'durationMs', 'status', 'stages', 'cpuSamples', 'pid')
+
+def _path(profile_id: str, suffix: str = '.json') -> str:
+    return os.path.join(Config.PROFILING_DIR, f"{profile_id}{suffix}")
+
+def _write(path: str, text: str):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def _stored() -> List[Tuple[float, str]]:
+    """Dizindeki profiller: (mtime, id), yeniden eskiye"""
+    entries = []
+    try:
+        names = os.listdir(Config.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        try:
+            entries.append((os.path.getmtime(os.path.join(Config.PROFILING_DIR, name)), name[:-len('.json')]))
+        except FileNotFoundError:
+            # Başka bir worker aynı anda budadı
+            continue
+    entries.sort(reverse=True)
+    return entries
+
+def _persist(profile: Profile):
+    """Profili paylaşılan dizine yaz ve en eskileri buda"""
+    os.makedirs(Config.PROFILING_DIR, exist_ok=True)
+    if profile.sampler is not None:
+        _write(_path(profile.id, '.folded'), '\n'.join(profile.sampler.folded()) + '\n')
+    _write(_path(profile.id), json.dumps(profile.to_dict(), ensure_ascii=False, default=str))
+    for _, old_id in _stored()[Config.PROFILING_BUFFER_SIZE:]:
+        for suffix in ('.json', '.folded'):
+            try:
+                os.remove(_path(old_id, suffix))
+            except FileNotFoundError:
+                pass
+
+def start(name: str, trigger: str, cpu: bool = False) -> Profile:
+    """Geçerli bağlamda profil başlat; ``finish`` ile kapatılmalı"""
+    profile = Profile(name, trigger, cpu)
+    profile.root.start = time.perf_counter()
+    profile._tokens = (_profile.set(profile), _current.set(profile.root))
+    if profile.sampler is not None:
+        profile.sampler.start()
+    return profile
+
+def finish(profile: Profile, **attrs):
+    """Profili kapat ve tampona ekle (birden çok çağrı güvenli)"""
+    if profile.finished:
+        return
+    profile.finished = True
+    profile.root.end = time.perf_counter()
+    profile.root.attrs.update(attrs)
+    if profile.sampler is not None:
+        profile.sampler.stop()
+    try:
+        profile_token, span_token = profile._tokens
+        _current.reset(span_token)
+        _profile.reset(profile_token)
+    except ValueError:
+        # Başka bir bağlamda kapatıldı (ör. akış sonunda); bu bağlamı temizle
+        _current.set(None)
+        _profile.set(None)
+    try:
+        _persist(profile)
+    except OSError as e:
+        logger.warning(f"Profil {profile.id} yazılamadı: {e}")
+    logger.debug(f"Profil {profile.id} ({profile.name}): {profile.root.duration_ms:.1f} ms")
+
+def server_timing(profile: Profile) -> str:
+    """Server-Timing başlık değeri: üst düzey aşamalar ve toplam"""
+    entries = [f"{_metric_name(name)};dur={duration:.1f}" for name, duration in stage_totals(profile.root).items()]
+    entries.append(f"total;dur={profile.root.duration_ms:.1f}")
+    return ', '.join(entries)
+
+def _metric_name(name: str) -> str:
+    return ''.join(c if c.isalnum() or c in '._-' else '_' for c in name)
+
+def authorized(token: Optional[str]) -> bool:
+    """Yönetici token'ı doğru mu (token tanımlı değilse her zaman hayır)"""
+    expected = Config.PROFILING_ADMIN_TOKEN
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+def requested(flag: Optional[str], token: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """İstek profillenecek mi: (tetikleyici, CPU örneklemesi) ya da None"""
+    if flag and authorized(token):
+        return "request", flag.lower() == 'cpu'
+    if Config.PROFILING_SAMPLE_RATE > 0 and random.random() < Config.PROFILING_SAMPLE_RATE:
+        return "sample", False
+    return None
+
+def recent(limit: int = 50, name: str = None, min_ms: float = None) -> List[Dict[str, Any]]:
+    """Saklanan profillerin (tüm worker'lar) özetleri (yeniden eskiye)"""
+    results = []
+    for _, profile_id in _stored():
+        data = get(profile_id)
+        if data is None:
+            continue
+        if name and name not in data['name']:
+            continue
+        if min_ms is not None and data['durationMs'] < min_ms:
+            continue
+        results.append({field: data.get(field) for field in _SUMMARY_FIELDS})
+        if len(results) >= limit:
+            break
+    return results
+
+def _valid_id(profile_id: str) -> bool:
+    # Dosya yoluna girdiği için yalnızca Profile'ın ürettiği onaltılık id'ler
+    return 0 < len(profile_id) <= 32 and all(c in '0123456789abcdef' for c in profile_id)
+
+def get(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Profilin span ağacı (``Profile.to_dict`` biçiminde); yoksa None"""
+    if not _valid_id(profile_id):
+        return None
+    try:
+        with open(_path(profile_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def folded(profile_id: str) -> Optional[str]:
+    """Profilin tüm CPU örnekleri (flamegraph girdisi); örnekleme yoksa None"""
+    if not _valid_id(profile_id):
+        return None
+    try:
+        with open(_path(profile_id, '.folded'), 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def init_app(app):
+    """Flask uygulamasına profil kancalarını ekle.
+
+    Akış yanıtlarında teardown gövde akmadan çalıştığı için profil yanıt
+    kapanınca (call_on_close) bitirilir; böylece token üretimi de profile
+    girer. Server-Timing ise başlıkla gittiğinden o ana kadarki aşamaları içerir.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        decision = requested(request.headers.get('X-Profile') or request.args.get('profile'),
+                             request.headers.get('X-Admin-Token'))
+        g.profile = start(f"{request.method} {request.path}", *decision) if decision else None
+
+    @app.after_request
+    def _profile_headers(response):
+        profile = g.get('profile')
+        if profile is not None:
+            profile.root.attrs['status'] = response.status_code
+            response.headers['Server-Timing'] = server_timing(profile)
+            response.headers['X-Profile-Id'] = profile.id
+            if response.is_streamed:
+                g.pop('profile')
+                response.call_on_close(functools.partial(finish, profile))
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            finish(profile, **({"error": type(exc).__name__} if exc is not None else {}))
@@ -1,160 +1,632 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+# qdrant_client (pydantic modelleriyle ~1 s) ilk kullanımda import edilir;
+# worker açılışı ve bu modülü import eden script'ler bu maliyeti ödemez
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import threading
+import time
+from urllib.parse import urlparse
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Iterator, Optional, Tuple
 from config.settings import Config
+from services.employee_store import employee_store
+from services.local_index import local_index
+from services import collection_profiles, metrics, profiling
+
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient, QdrantClient
 
 logger = logging.getLogger(__name__)
 
+_import_lock = threading.Lock()
+
+class AliasConversionRequired(Exception):
+    """Alias adında gerçek bir koleksiyon var; alias ancak tek seferlik dönüştürmeyle kurulabilir"""
+
+def qdrant_models():
+    """``qdrant_client.models``; paketin ilk import'u kilit altında yapılır.
+
+    qdrant_client paket içinde döngüsel import eder: iki thread (ör. ısınma
+    ve ilk istek) aynı anda import ederse ikisi de yarım modül görür.
+    """
+    with _import_lock:
+        from qdrant_client import models
+    return models
+
+def client_options(url: str) -> Dict[str, Any]:
+    """QDRANT_URL'den istemci argümanları.
+
+    ``:memory:`` süreç içi, ``path:<dizin>`` yerel dosya modunda (ağ ve Qdrant
+    sunucusu gerekmez; benchmark'lar için) çalışır; diğer değerler
+    ``http(s)://host[:port][/önek]`` (şema yoksa http, port yoksa 6333).
+    QDRANT_PREFER_GRPC açıksa veri işlemleri QDRANT_GRPC_PORT üzerinden gRPC ile yapılır.
+    """
+    if url == ':memory:':
+        return {"location": ":memory:"}
+    if url.startswith('path:'):
+        return {"path": url[len('path:'):]}
+    parsed = urlparse(url if '://' in url else f"http://{url}")
+    if not parsed.hostname:
+        raise ValueError(f"Geçersiz QDRANT_URL: {url}")
+    options = {
+        "host": parsed.hostname,
+        "port": parsed.port or 6333,
+        "https": parsed.scheme == 'https',
+        "prefer_grpc": Config.QDRANT_PREFER_GRPC,
+        "grpc_port": Config.QDRANT_GRPC_PORT,
+        "timeout": Config.QDRANT_TIMEOUT
+    }
+    if parsed.path.strip('/'):
+        options["prefix"] = parsed.path.strip('/')
+    if Config.QDRANT_API_KEY:
+        options["api_key"] = Config.QDRANT_API_KEY
+    return options
+
 class QdrantService:
     def __init__(self):
-        self.client = QdrantClient(host=Config.QDRANT_URL.replace('http://', '').split(':')[0],
-                                  port=int(Config.QDRANT_URL.split(':')[-1]))
+        self.options = client_options(Config.QDRANT_URL)
+        # Yerel modda veri istemci nesnesinde durur; ikinci (async) bir istemci açılamaz
+        self.local_mode = "host" not in self.options
         self.collection_name = Config.QDRANT_COLLECTION
         self.vector_size = Config.QDRANT_VECTOR_SIZE
+        self.profile = collection_profiles.get()
+        self._search_params = None
+        self._search_params_loaded = False
+        # İstemciler ilk kullanımda açılır: import anında ağ bağlantısı kurulmaz,
+        # Qdrant yavaşsa ya da kapalıysa worker yine de ayağa kalkar (/ready bildirir)
+        self._client: Optional['QdrantClient'] = None
+        self._client_lock = threading.Lock()
+        # ASGI modundaki async view'lar için; ilk kullanımda event loop içinde açılır
+        self._async_client: Optional['AsyncQdrantClient'] = None
+        if not self.local_mode:
+            # gRPC kanalı ve HTTP havuzu fork'la paylaşılamaz: her worker kendi istemcisini açar
+            os.register_at_fork(after_in_child=self._forget_clients)
+
+    @property
+    def client(self) -> 'QdrantClient':
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    qdrant_models()
+                    from qdrant_client import QdrantClient
+                    self._client = QdrantClient(**self.options)
+                    logger.info(f"Qdrant istemcisi açıldı: {Config.QDRANT_URL}"
+                                f"{' (gRPC)' if self.options.get('prefer_grpc') else ''}")
+                    if self.local_mode:
+                        # Yerel depo boş başlar; sunucudaki gibi hazır bir collection beklenemez
+                        self._create_served_collection()
+        return self._client
+
+    @property
+    def async_client(self) -> 'AsyncQdrantClient':
+        if self._async_client is None:
+            qdrant_models()
+            from qdrant_client import AsyncQdrantClient
+            self._async_client = AsyncQdrantClient(**self.options)
+        return self._async_client
+
+    def _forget_clients(self):
+        self._client = None
+        self._async_client = None
+        self._client_lock = threading.Lock()
+
+    def ping(self) -> bool:
+        """Qdrant erişilebilir ve collection (veya alias) mevcut mu"""
+        try:
+            with metrics.qdrant_call("ping"):
+                self.client.get_collection(self.collection_name)
+            return True
+        except Exception as e:
+            logger.warning(f"Qdrant hazır değil: {e}")
+            return False
+
+    @property
+    def search_params(self):
+        """Yapılandırılmış koleksiyon profilinin arama ayarları (memory: nicelenmiş + yeniden skorlama)"""
+        if not self._search_params_loaded:
+            # Yerel mod her zaman tam arama yapar ve search_params'ı yok sayar (uyarı verir)
+            # qdrant_client modelleri ilk aramada import edilir
+            self._search_params = None if self.local_mode else collection_profiles.search_params(self.profile)
+            self._search_params_loaded = True
+        return self._search_params
+
+    async def close_async(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
         
-    def create_collection(self) -> bool:
-        """Qdrant collection oluştur"""
+    def create_collection(self, collection_name: str = None, profile: Dict[str, Any] = None,
+                          vector_size: int = None, defer_indexing: bool = False) -> bool:
+        """Qdrant collection oluştur (varsayılan profil QDRANT_COLLECTION_PROFILE).
+
+        ``defer_indexing`` ile HNSW grafiği veri yüklenene kadar kurulmaz;
+        yükleme bitince ``finalize_collection`` çağrılmalı.
+        """
+        collection_name = collection_name or self.collection_name
+        profile = profile or self.profile
+        if defer_indexing:
+            profile = {**profile, "defer_indexing": True}
         try:
+            if self.get_alias_target(collection_name):
+                logger.info(f"ℹ️ '{collection_name}' bir alias olarak zaten mevcut")
+                return True
             self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=Distance.COSINE
-                )
+                collection_name=collection_name,
+                **collection_profiles.create_kwargs(profile, vector_size or self.vector_size)
             )
-            logger.info(f"✅ Qdrant collection '{self.collection_name}' oluşturuldu")
+            logger.info(f"✅ Qdrant collection '{collection_name}' oluşturuldu (profil: {profile['name']}"
+                        f"{', indeksleme ertelendi' if profile['defer_indexing'] else ''})")
             return True
         except Exception as e:
             if "already exists" in str(e):
-                logger.info(f"ℹ️ Collection '{self.collection_name}' zaten mevcut")
+                logger.info(f"ℹ️ Collection '{collection_name}' zaten mevcut")
                 return True
             logger.error(f"create_collection error: {e}")
             return False
+
+    def _create_served_collection(self):
+        """Servis adıyla boş koleksiyon oluştur; alias modunda ad baştan bir alias
+        olur (sonradan dönüştürme gerekmez)"""
+        if Config.UPLOAD_SYNC_MODE == 'alias':
+            target = self.new_physical_collection_name()
+            self.create_collection(target)
+            self.swap_alias(self.collection_name, target)
+        else:
+            self.create_collection()
     
-    def list_employees(self) -> List[Dict[str, Any]]:
-        """Tüm çalışanları (sayfalama ile) listele"""
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]):
+        """API'ye verilen cursor'ı Qdrant nokta id'sine çevir (tamsayı veya UUID)"""
+        if cursor is None or cursor == '':
+            return None
+        return int(cursor) if str(cursor).isdigit() else str(cursor)
+
+    def scroll_page(self, limit: int = None, cursor=None, fields: Optional[List[str]] = None,
+                    collection_name: str = None) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Tek bir sayfa çalışan ve bir sonraki sayfanın cursor'ı.
+
+        ``fields`` verilirse yalnızca bu payload alanları Qdrant'tan taşınır.
+        """
         try:
-            all_points = []
-            offset = None
-            while True:
+            with metrics.qdrant_call("scroll"):
                 result, next_offset = self.client.scroll(
-                collection_name=self.collection_name,
-                    with_payload=True,
-                    offset=offset
+                    collection_name=collection_name or self.collection_name,
+                    with_payload=fields if fields else True,
+                    with_vectors=False,
+                    limit=limit or Config.QDRANT_SCROLL_PAGE_SIZE,
+                    offset=cursor,
+                    timeout=Config.QDRANT_TIMEOUT
                 )
-                all_points.extend(result)
-                if not next_offset:
-                    break
-                offset = next_offset
-            return [
-                {
-                    "id": point.id,
-                    **point.payload
-                }
-                for point in all_points
-            ]
+            return [{"id": point.id, **(point.payload or {})} for point in result], next_offset
         except Exception as e:
-            logger.error(f"list_employees error: {e}")
+            logger.error(f"scroll_page error: {e}")
             raise Exception(f"Çalışan verileri alınamadı: {e}")
-    
-    def add_employee(self, employee_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Çalışan ekle"""
+
+    def iter_employees(self, page_size: int = None, fields: Optional[List[str]] = None,
+                       collection_name: str = None) -> Iterator[Dict[str, Any]]:
+        """Tüm çalışanları büyük sayfalarla, listeyi bellekte biriktirmeden dolaş"""
+        cursor = None
+        while True:
+            page, cursor = self.scroll_page(page_size, cursor, fields, collection_name)
+            yield from page
+            if cursor is None:
+                break
+
+    def get_employees(self, ids: List[Any], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Verilen id'lerdeki çalışanları tek istekte getir"""
         try:
-            import time
-            point_id = int(time.time() * 1000)
-            
-            vector = employee_data.get('vector')
-            if vector is None:
-                # Qdrant koleksiyonunun vektör boyutuna göre örnek bir vektör oluştur
-                vector = [0.0] * self.vector_size
-            
-            point = PointStruct(
-                id=point_id,
-                vector=vector,
-                payload=employee_data
-            )
-            
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[point]
-            )
-            
-            return {"id": point_id, **employee_data}
+            with metrics.qdrant_call("retrieve"):
+                points = self.client.retrieve(
+                    collection_name=self.collection_name,
+                    ids=list(ids),
+                    with_payload=fields if fields else True,
+                    with_vectors=False,
+                    timeout=Config.QDRANT_TIMEOUT
+                )
+            return [{"id": point.id, **(point.payload or {})} for point in points]
         except Exception as e:
-            logger.error(f"add_employee error: {e}")
-            raise Exception(f"Çalışan eklenemedi: {e}")
+            logger.error(f"get_employees error: {e}")
+            return []
+
+    def get_employee(self, employee_id: Any, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Tek çalışan (get_employees üzerinden; yoksa None)"""
+        found = self.get_employees([employee_id], fields)
+        return found[0] if found else None
+
+    def list_employees(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Tüm çalışanları (sayfalama ile) listele"""
+        return list(self.iter_employees(fields=fields))
+    
+    def add_employee(self, employee_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Çalışan ekle (add_employees_bulk üzerinden tek noktalı batch).
+
+        Nokta id'si ve içerik özeti Excel senkronizasyonundaki gibi isimden
+        türetilir: aynı çalışan sonraki yüklemede değişmemiş sayılır.
+        """
+        # employee_sync bu modülü import eder; döngüyü kırmak için burada
+        from services.employee_sync import content_hash, employee_key, point_id_for
+        employee_data['content_hash'] = content_hash(employee_data)
+        result = self.add_employees_bulk([employee_data], ids=[point_id_for(employee_key(employee_data.get('isim')))])
+        if result["failed_batches"]:
+            raise Exception(f"Çalışan eklenemedi: {result['failed_batches'][0]['error']}")
+        return result["added"][0]
     
+    def add_employees_bulk(self, employees: List[Dict[str, Any]], batch_size: int = None,
+                           ids: List[int] = None, collection_name: str = None) -> Dict[str, Any]:
+        """Çalışanları toplu ekle (batch upsert).
+
+        ``ids`` verilirse noktalar bu id'lerle yazılır (var olanlar güncellenir).
+        Bir batch başarısız olursa diğerleri eklenmeye devam eder; hatalı
+        batch'ler ``failed_batches`` içinde raporlanır.
+        """
+        models = qdrant_models()
+        batch_size = batch_size or Config.QDRANT_UPSERT_BATCH_SIZE
+        collection_name = collection_name or self.collection_name
+        base_id = int(time.time() * 1000)
+        added = []
+        failed_batches = []
+        for start in range(0, len(employees), batch_size):
+            batch = employees[start:start + batch_size]
+            points = []
+            for offset, employee_data in enumerate(batch, start):
+                vector = employee_data.get('vector')
+                if vector is None:
+                    # Qdrant koleksiyonunun vektör boyutuna göre boş bir vektör
+                    vector = [0.0] * self.vector_size
+                points.append(models.PointStruct(
+                    id=ids[offset] if ids is not None else base_id + offset,
+                    vector=vector,
+                    payload=employee_data
+                ))
+            try:
+                with metrics.qdrant_call("upsert"):
+                    self.client.upsert(
+                        collection_name=collection_name,
+                        points=points,
+                        wait=True,
+                        timeout=Config.QDRANT_WRITE_TIMEOUT
+                    )
+                added.extend({"id": point.id, **point.payload} for point in points)
+            except Exception as e:
+                logger.error(f"add_employees_bulk batch {start // batch_size} error: {e}")
+                failed_batches.append({
+                    "batch": start // batch_size,
+                    "isimler": [emp.get('isim') for emp in batch],
+                    "error": str(e)
+                })
+        return {"added": added, "failed_batches": failed_batches}
+
     def update_employee(self, employee_id: int, employee_data: Dict[str, Any]) -> Dict[str, Any]:
         """Çalışan güncelle"""
         try:
-            # Önce sil, sonra ekle
-            self.delete_employee(employee_id)
-            return self.add_employee(employee_data)
+            # Nokta id'si isimden türetilir: isim değişmediyse upsert kaydı yerinde
+            # günceller, değiştiyse eski nokta yenisi yazıldıktan sonra silinir
+            employee = self.add_employee(employee_data)
+            if employee['id'] != employee_id:
+                self.delete_employee(employee_id)
+            return employee
         except Exception as e:
             logger.error(f"update_employee error: {e}")
             raise Exception(f"Çalışan güncellenemedi: {e}")
     
     def delete_employee(self, employee_id: int) -> Dict[str, Any]:
-        """Çalışan sil"""
+        """Çalışan sil (delete_employees üzerinden)"""
         try:
-            self.client.delete(
-                collection_name=self.collection_name,
-                points_selector=[employee_id]
-            )
+            self.delete_employees([employee_id])
             return {"id": employee_id}
         except Exception as e:
             logger.error(f"delete_employee error: {e}")
             raise Exception(f"Çalışan silinemedi: {e}")
     
+    def delete_employees(self, employee_ids: List[int], batch_size: int = None) -> int:
+        """Çalışanları toplu sil"""
+        batch_size = batch_size or Config.QDRANT_UPSERT_BATCH_SIZE
+        try:
+            for start in range(0, len(employee_ids), batch_size):
+                with metrics.qdrant_call("delete"):
+                    self.client.delete(
+                        collection_name=self.collection_name,
+                        points_selector=list(employee_ids[start:start + batch_size]),
+                        wait=True,
+                        timeout=Config.QDRANT_WRITE_TIMEOUT
+                    )
+            return len(employee_ids)
+        except Exception as e:
+            logger.error(f"delete_employees error: {e}")
+            raise Exception(f"Çalışanlar silinemedi: {e}")
+
     def delete_all_employees(self):
         """Koleksiyondaki tüm çalışanları sil (koleksiyon sıfırla)"""
+        models = qdrant_models()
         try:
+            if self.get_alias_target(self.collection_name):
+                # Alias silinemez; arkasındaki koleksiyonun noktaları temizlenir
+                with metrics.qdrant_call("delete"):
+                    self.client.delete(
+                        collection_name=self.collection_name,
+                        points_selector=models.FilterSelector(filter=models.Filter()),
+                        wait=True
+                    )
+                logger.info(f"Alias '{self.collection_name}' arkasındaki tüm noktalar silindi.")
+                return
             self.client.delete_collection(self.collection_name)
             logger.info(f"Collection '{self.collection_name}' tamamen silindi. Tekrar oluşturuluyor...")
-            self.create_collection()
+            # Koleksiyon zaten boş: alias moduna kopyalamadan geçilir
+            self._create_served_collection()
         except Exception as e:
             logger.error(f"delete_all_employees error: {e}")
             raise Exception(f"Tüm çalışanlar silinemedi: {e}")
-    
-    def search_by_embedding(self, embedding: List[float], query: str) -> List[Dict[str, Any]]:
-        """Semantic search"""
+
+    def list_employee_hashes(self, collection_name: str = None) -> List[Tuple[Any, str, Optional[str]]]:
+        """(id, isim, content_hash) listesi - vektör ve diğer alanlar taşınmaz"""
         try:
-            search_result = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=embedding,
-                limit=10,
-                with_payload=True,
-                score_threshold=0.7
-            )
-            
-            if not search_result:
-                return self.text_based_search(query)
-            
             return [
-                {
-                    "id": point.id,
-                    "score": point.score,
-                    **point.payload
-                }
-                for point in search_result
+                (emp['id'], emp.get('isim', ''), emp.get('content_hash'))
+                for emp in self.iter_employees(fields=['isim', 'content_hash'], collection_name=collection_name)
+            ]
+        except Exception as e:
+            logger.error(f"list_employee_hashes error: {e}")
+            raise Exception(f"Çalışan özetleri alınamadı: {e}")
+
+    def copy_points(self, source: str, target: str, exclude_ids: set = None, batch_size: int = None,
+                    on_batch: Callable[[int], None] = None) -> int:
+        """Noktaları (vektörleriyle) bir koleksiyondan diğerine kopyala.
+
+        ``on_batch(kopyalanan)`` her batch yazıldıktan sonra çağrılır.
+        """
+        models = qdrant_models()
+        batch_size = batch_size or Config.QDRANT_UPSERT_BATCH_SIZE
+        exclude_ids = exclude_ids or set()
+        copied = 0
+        offset = None
+        while True:
+            with metrics.qdrant_call("scroll"):
+                result, offset = self.client.scroll(
+                    collection_name=source,
+                    with_payload=True,
+                    with_vectors=True,
+                    limit=batch_size,
+                    offset=offset,
+                    timeout=Config.QDRANT_TIMEOUT
+                )
+            points = [
+                models.PointStruct(id=point.id, vector=point.vector, payload=point.payload)
+                for point in result if point.id not in exclude_ids
             ]
+            if points:
+                with metrics.qdrant_call("upsert"):
+                    self.client.upsert(collection_name=target, points=points, wait=True,
+                                       timeout=Config.QDRANT_WRITE_TIMEOUT)
+                copied += len(points)
+                if on_batch is not None:
+                    on_batch(copied)
+            if offset is None:
+                break
+        return copied
+
+    def finalize_collection(self, collection_name: str, profile: Dict[str, Any] = None,
+                            wait_timeout: float = None) -> bool:
+        """Ertelenmiş HNSW indekslemesini aç ve indeks kurulana (yeşil) kadar bekle"""
+        models = qdrant_models()
+        profile = profile or self.profile
+        wait_timeout = Config.QDRANT_INDEX_WAIT_TIMEOUT if wait_timeout is None else wait_timeout
+        started = time.perf_counter()
+        self.client.update_collection(collection_name=collection_name,
+                                      **collection_profiles.finalize_kwargs(profile))
+        while True:
+            with metrics.qdrant_call("collection_info"):
+                info = self.client.get_collection(collection_name)
+            if info.status == models.CollectionStatus.GREEN:
+                logger.info(f"'{collection_name}' indekslendi: {info.indexed_vectors_count}/{info.points_count} "
+                            f"vektör, {time.perf_counter() - started:.1f}s")
+                return True
+            if time.perf_counter() - started > wait_timeout:
+                logger.warning(f"'{collection_name}' indekslemesi {wait_timeout:.0f}s içinde bitmedi "
+                               f"(durum: {info.status}); arka planda sürüyor")
+                return False
+            time.sleep(1.0)
+
+    def collection_info(self, collection_name: str = None) -> Dict[str, Any]:
+        """Koleksiyonun (veya alias hedefinin) boyut, düzen ve indeks özeti"""
+        with metrics.qdrant_call("collection_info"):
+            info = self.client.get_collection(collection_name or self.collection_name)
+        return collection_profiles.describe(info)
+
+    def get_alias_target(self, alias: str) -> Optional[str]:
+        """Alias'ın işaret ettiği koleksiyon (alias değilse None)"""
+        try:
+            for item in self.client.get_aliases().aliases:
+                if item.alias_name == alias:
+                    return item.collection_name
+        except Exception as e:
+            logger.warning(f"get_aliases error: {e}")
+        return None
+
+    def swap_alias(self, alias: str, collection_name: str) -> Optional[str]:
+        """Alias'ı tek bir atomik işlemle yeni koleksiyona çevir; eski hedefi döndür"""
+        models = qdrant_models()
+        old_target = self.get_alias_target(alias)
+        operations = []
+        if old_target:
+            operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+        operations.append(models.CreateAliasOperation(create_alias=models.CreateAlias(
+            collection_name=collection_name, alias_name=alias
+        )))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Alias '{alias}' → '{collection_name}' (önceki: {old_target})")
+        return old_target
+
+    def require_alias(self, alias: str):
+        """Alias adında gerçek bir koleksiyon varsa AliasConversionRequired fırlat.
+
+        Qdrant bir koleksiyonla aynı adda alias oluşturamaz; eski koleksiyon
+        silinmeden alias çevrilemez, silinirse çevrilene kadar servis kesilir.
+        """
+        if self.get_alias_target(alias) or not self.client.collection_exists(alias):
+            return
+        raise AliasConversionRequired(
+            f"'{alias}' alias değil, gerçek bir koleksiyon; bir kez dönüştürülmeli: "
+            f"python scripts/migrate_collection.py --profile {self.profile['name']} --convert-collection"
+        )
+
+    def publish_collection(self, alias: str, collection_name: str, keep_old: bool = False) -> Optional[str]:
+        """Hazırlanan koleksiyonu alias'la yayınla; eski hedef ``keep_old`` verilmezse
+        alias çevrildikten sonra silinir. Eski hedefi döndürür."""
+        self.require_alias(alias)
+        old_target = self.swap_alias(alias, collection_name)
+        if old_target and old_target != collection_name and not keep_old:
+            self.client.delete_collection(old_target)
+            logger.info(f"Eski koleksiyon '{old_target}' silindi")
+        return old_target
+
+    def convert_to_alias(self, alias: str, collection_name: str):
+        """Alias adındaki gerçek koleksiyonu, tam kopyası ``collection_name``'e
+        işaret eden bir alias'a dönüştür (tek seferlik).
+
+        Qdrant aynı adda koleksiyon ve alias tutamaz: eski koleksiyon silinip
+        alias hemen oluşturulur, arada kısa bir kesinti olur ve eski koleksiyon
+        saklanamaz. Kopyadan sonra eski koleksiyona yazılmışsa reddedilir.
+        """
+        source_points = self.client.count(alias, exact=True).count
+        target_points = self.client.count(collection_name, exact=True).count
+        if source_points != target_points:
+            raise AliasConversionRequired(f"'{alias}' kopyalandıktan sonra değişmiş ({source_points} nokta, "
+                                          f"kopyada {target_points}); dönüştürme yapılmadı")
+        logger.warning(f"'{alias}' koleksiyonu siliniyor ve alias olarak '{collection_name}' hedefiyle "
+                       f"yeniden oluşturuluyor (kısa kesinti)")
+        self.client.delete_collection(alias)
+        try:
+            self.swap_alias(alias, collection_name)
         except Exception as e:
-            logger.error(f"search_by_embedding error: {e}")
-            return self.text_based_search(query)
+            logger.error(f"Alias '{alias}' oluşturulamadı, veri '{collection_name}' içinde duruyor: {e}")
+            raise
+
+    def new_physical_collection_name(self) -> str:
+        return f"{self.collection_name}_{int(time.time() * 1000)}"
+
+    def _query_requests(self, embeddings: List[List[float]], limit: int, score_threshold: Optional[float],
+                        fields: Optional[List[str]]) -> list:
+        models = qdrant_models()
+        return [
+            models.QueryRequest(query=list(embedding), limit=limit, score_threshold=score_threshold,
+                         with_payload=fields if fields else True, params=self.search_params)
+            for embedding in embeddings
+        ]
+
+    @staticmethod
+    def _hits(responses) -> List[List[Dict[str, Any]]]:
+        return [[{"id": point.id, "score": point.score, **(point.payload or {})} for point in response.points]
+                for response in responses]
+
+    def search_batch(self, embeddings: List[List[float]], limit: int = 10, score_threshold: float = None,
+                     fields: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Birden çok sorgu vektörünü tek istekte ara; her vektör için sonuç listesi.
+
+        Yerel indeks politikası ve fallback uygulanmaz (bkz. vector_search);
+        Qdrant hatası çağırana iletilir.
+        """
+        if not embeddings:
+            return []
+        with metrics.qdrant_call("search"):
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=self._query_requests(embeddings, limit, score_threshold, fields),
+                timeout=Config.QDRANT_SEARCH_TIMEOUT
+            )
+        return self._hits(responses)
+
+    async def search_batch_async(self, embeddings: List[List[float]], limit: int = 10, score_threshold: float = None,
+                                 fields: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """search_batch'in AsyncQdrantClient ile çalışan sürümü"""
+        if not embeddings:
+            return []
+        if self.local_mode:
+            return await asyncio.to_thread(self.search_batch, embeddings, limit, score_threshold, fields)
+        with metrics.qdrant_call("search"):
+            responses = await self.async_client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=self._query_requests(embeddings, limit, score_threshold, fields),
+                timeout=Config.QDRANT_SEARCH_TIMEOUT
+            )
+        return self._hits(responses)
+
+    def _local_fallback(self, embedding: List[float], limit: int, score_threshold: Optional[float]) -> List[Dict[str, Any]]:
+        metrics.fallback("local_index")
+        # Qdrant'a tekrar gitmeden önce bellekteki vektör indeksini dene
+        try:
+            results = local_index.search(embedding, limit=limit, score_threshold=score_threshold, fallback=True)
+        except Exception as local_err:
+            logger.error(f"Yerel vektör indeksi hatası: {local_err}")
+            results = None
+        return results or []
+
+    def vector_search(self, embedding: List[float], limit: int = 10,
+                      score_threshold: float = None) -> List[Dict[str, Any]]:
+        """Kosinüs araması; LOCAL_INDEX_POLICY'ye göre yerel indeks veya Qdrant.
+
+        Qdrant hata verirse yerel indekse düşer; hiçbir kaynak yoksa boş liste.
+        """
+        if local_index.prefer_local():
+            # Politika gereği Qdrant'a gitmeden snapshot indeksinden cevapla
+            results = local_index.search(embedding, limit=limit, score_threshold=score_threshold)
+            if results is not None:
+                return results
+        try:
+            started = time.perf_counter()
+            results = self.search_batch([embedding], limit, score_threshold)[0]
+            local_index.record_remote((time.perf_counter() - started) * 1000)
+            return results
+        except Exception as e:
+            logger.error(f"vector_search error: {e}")
+            return self._local_fallback(embedding, limit, score_threshold)
+
+    async def vector_search_async(self, embedding: List[float], limit: int = 10,
+                                  score_threshold: float = None) -> List[Dict[str, Any]]:
+        """vector_search'ün AsyncQdrantClient ile çalışan sürümü (aynı politika ve fallback)"""
+        if self.local_mode:
+            return await asyncio.to_thread(self.vector_search, embedding, limit, score_threshold)
+        if local_index.prefer_local():
+            results = local_index.search(embedding, limit=limit, score_threshold=score_threshold)
+            if results is not None:
+                return results
+        try:
+            started = time.perf_counter()
+            results = (await self.search_batch_async([embedding], limit, score_threshold))[0]
+            local_index.record_remote((time.perf_counter() - started) * 1000)
+            return results
+        except Exception as e:
+            logger.error(f"vector_search_async error: {e}")
+            return self._local_fallback(embedding, limit, score_threshold)
+
+    @profiling.traced("search_by_embedding")
+    def search_by_embedding(self, embedding: List[float], query: str, limit: int = 10,
+                            score_threshold: float = None) -> List[Dict[str, Any]]:
+        """Semantic search (sonuç yoksa metin araması)"""
+        score_threshold = Config.RETRIEVAL_SCORE_THRESHOLD if score_threshold is None else score_threshold
+        return self.vector_search(embedding, limit, score_threshold) or self.text_based_search(query)
     
-    def text_based_search(self, query: str) -> List[Dict[str, Any]]:
+    @profiling.traced("text_search")
+    def text_based_search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Text-based search (fallback)"""
+        metrics.fallback("text_search")
         try:
-            all_employees = self.list_employees()
             query_lower = query.lower()
-            
-            filtered = [
-                emp for emp in all_employees
-                if emp.get('isim', '').lower().find(query_lower) != -1
-            ]
-            
-            return filtered[:20] if filtered else all_employees[:20]
+            # Qdrant'a tekrar gitmeden önce bellekteki snapshot'ı kullan
+            snapshot = employee_store.get()
+            if len(snapshot):
+                matches = [i for name, i in snapshot.names if query_lower in name][:limit]
+                records = [snapshot.record(i) for i in (matches or range(min(limit, len(snapshot))))]
+                return [record for record in records if not snapshot.is_stale(record.get('id'))]
+
+            # Snapshot yoksa Qdrant'ı sayfa sayfa oku, yeterli eşleşme bulununca dur
+            first, filtered = [], []
+            for emp in self.iter_employees():
+                if len(first) < limit:
+                    first.append(emp)
+                if query_lower in emp.get('isim', '').lower():
+                    filtered.append(emp)
+                    if len(filtered) >= limit:
+                        break
+            return filtered or first
         except Exception as e:
             logger.error(f"text_based_search error: {e}")
             return []
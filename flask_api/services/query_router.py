@@ -0,0 +1,301 @@
+"""Sayısal chat sorularını LLM'e gitmeden yanıtlayan hızlı yol.
+
+Soru basit kurallarla bir niyete (intent) ayrılır ve cevap employee_stats'ın
+önceden hesaplanmış dizilerinden üretilir:
+
+    total       - "Ahmet toplam kaç saat çalıştı?"
+    last_week   - "Ayşe'nin son haftası / bu hafta kaç saat?"
+    date_range  - "Ahmet temmuz ayında / 07.07.2025-20.07.2025 arası kaç saat?"
+    comparison  - "Ahmet ile Ayşe'yi karşılaştır" (isteğe bağlı tarih filtresiyle)
+    top_n       - "En çok çalışan 5 kişi", "en az fazla mesai yapan 3 kişi"
+
+"bu/son hafta" bugünü, "geçen hafta" 7 gün öncesini kapsayan hafta sütunu,
+"son N hafta" bugünün haftasıyla biten N haftadır; veri bu haftaları
+kapsamıyorsa (ör. son yükleme aylar önceyse) hızlı yol kullanılmaz.
+Çözülemeyen dönem ifadeleri ("geçen ay", "bu yıl", "dün", "3 hafta önce",
+tarihsiz "arasında"...) varsa soru başka bir soruya cevap vermemek için
+LLM'e gider.
+
+İsimler name_resolver ile eşlenir; isim belirsizse (aynı güvende birden çok
+aday), soru yoruma açıksa ("neden", "nasıl", "değerlendir"...) veya hiçbir
+kural tutmazsa None döner ve soru LLM'e gider.
+"""
+import logging
+import re
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.settings import Config
+from services.employee_stats import employee_stats
+from services.employee_store import employee_store
+from services.name_resolver import fold_tokens, name_resolver
+from services.retrieval import tokenize, week_mask
+from services.snapshot_format import WEEKDAYS, week_range
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ('total', 'last_week', 'date_range', 'comparison', 'top_n')
+
+# Katlanmış (fold) kelimeler üzerinde ipuçları
+_OPEN_ENDED = {'neden', 'niye', 'nasil', 'yorumla', 'yorum', 'degerlendir', 'degerlendirme', 'analiz',
+               'oner', 'oneri', 'tavsiye', 'acikla', 'performans', 'verimli', 'verimlilik'}
+_COMPARE = {'karsilastir', 'karsilastirma', 'kiyasla', 'kiyas', 'fark', 'farki'}
+_TOTAL = {'toplam', 'kac', 'kadar', 'mesai', 'mesaisi', 'calisti', 'calismis', 'saat', 'saati'}
+# Kişi sorularında hızlı yolun cevaplamadığı ayrıntılar (gün bazında, ortalama, fazla mesai)
+_DETAIL = set(WEEKDAYS) | {'gun', 'gunu', 'gunluk', 'gunler', 'ortalama', 'ort', 'fazla', 'eksik', 'izin'}
+_LAST_WEEK = re.compile(r"\b(son|gecen|bu) hafta\w*")
+_LAST_N_WEEKS = re.compile(r"\bson (\d{1,3}) hafta\w*")
+# Hızlı yolun haftalara çeviremediği dönem ipuçları (tarih/ay adı yoksa LLM'e gider)
+_PERIOD = re.compile(r"\b(ay|aylik|ayda|aydaki|ayin|ayinda|aylar|aylarda|yil|yilda|yilki|yilin|yilinda|yillik|"
+                     r"sene|senede|seneki|senelik|hafta\w*|gun|gunu|gunde|gunun|gunluk|gunler|gunlerde|dun|bugun|"
+                     r"evvelki|once|onceki|onceden|sonra|sonraki|beri|itibaren|arasi|arasinda|donem\w*|ceyrek\w*)\b")
+_TOP = re.compile(r"\ben (cok|fazla|az)\b|\bilk \d+\b|\btop \d+\b")
+_OVERTIME = re.compile(r"fazla mesai|mesai fazlasi|overtime")
+_TOP_COUNT = re.compile(r"\b(?:ilk|top)\s+(\d{1,3})\b|\b(\d{1,3})\s+(?:kisi|calisan|personel)\b")
+
+def _today() -> date:
+    return date.today()
+
+def _hours(value: float) -> str:
+    value = float(value)
+    return f"{value:.0f}" if value.is_integer() else f"{value:.1f}"
+
+class QueryRouter:
+    """Soruyu niyetine göre hızlı yola ya da LLM'e yönlendirir"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"fast": 0, "llm": 0, "forced": 0}
+        self.intent_counts = {intent: 0 for intent in INTENTS}
+        self._fast_ms = 0.0
+
+    def route(self, question: str, force_llm: bool = False) -> Optional[Dict[str, Any]]:
+        """Hızlı yoldan cevaplanabiliyorsa {"intent", "answer", "data"}; değilse None"""
+        if force_llm or not Config.QUERY_ROUTER_ENABLED:
+            self._record("forced")
+            return None
+        started = time.perf_counter()
+        try:
+            result = self._answer(question)
+        except Exception as e:
+            logger.error(f"Query router hatası, LLM'e yönlendiriliyor: {e}")
+            result = None
+        if result is None:
+            self._record("llm")
+            return None
+        elapsed = (time.perf_counter() - started) * 1000
+        self._record("fast", result["intent"], elapsed)
+        logger.debug(f"Hızlı yol ({result['intent']}, {elapsed:.2f} ms): {question}")
+        return result
+
+    def _record(self, route: str, intent: str = None, elapsed_ms: float = 0.0):
+        with self._lock:
+            self.counts[route] += 1
+            if intent is not None:
+                self.intent_counts[intent] += 1
+                self._fast_ms += elapsed_ms
+
+    def _answer(self, question: str) -> Optional[Dict[str, Any]]:
+        words = fold_tokens(question, drop_stop_words=False)
+        text = ' '.join(words)
+        if _OPEN_ENDED.intersection(words):
+            return None
+        # İstatistikler ve id → satır eşlemesi aynı snapshot sürümünden
+        snapshot = employee_store.get()
+        engine = employee_stats.for_snapshot(snapshot)
+        if not len(engine.names):
+            return None
+        weeks = week_mask(engine.weeks, tokenize(question))
+        recent = self._recent_weeks(engine, text)
+        if recent is not None:
+            if weeks is not None:
+                # "temmuz ayının son haftası" gibi birleşimler: LLM
+                return None
+        elif weeks is None and _PERIOD.search(text):
+            return None
+
+        employees = self._employees(question, snapshot.by_id)
+        if employees is None:
+            return None
+        if not employees:
+            if _TOP.search(text) and not snapshot.changes:
+                # Bekleyen CRUD değişiklikleri varsa sıralama eski snapshot'tan yapılmaz
+                return self._top_n(engine, text, weeks if recent is None else recent)
+            return None
+        if _DETAIL.intersection(words):
+            return None
+        if len(employees) > 1:
+            if _COMPARE.intersection(words) or _TOTAL.intersection(words) or 'daha' in words:
+                return self._comparison(engine, employees, weeks if recent is None else recent)
+            return None
+        if _COMPARE.intersection(words):
+            return None
+        if recent is not None and not _LAST_N_WEEKS.search(text):
+            return self._last_week(engine, employees[0], int(np.flatnonzero(recent)[0]))
+        if recent is not None:
+            return self._date_range(engine, employees[0], recent)
+        if weeks is not None:
+            return self._date_range(engine, employees[0], weeks)
+        if _TOTAL.intersection(words):
+            return self._total(engine, employees[0])
+        return None
+
+    def _employees(self, question: str, by_id: Dict[int, int]) -> Optional[List[int]]:
+        """Sorudaki çalışanların satır indeksleri; belirsizse None"""
+        hits = name_resolver.resolve(question, limit=Config.QUERY_ROUTER_MAX_EMPLOYEES + 1,
+                                     min_confidence=Config.QUERY_ROUTER_MIN_CONFIDENCE)
+        # "Ahmet Yılmaz" sorusunda yalnız "ahmet" ile eşleşen "Ahmet Kaya" ayrı bir kişi değildir
+        matched = [frozenset(hit['matched']) for hit in hits]
+        hits = [hit for hit, words in zip(hits, matched) if not any(words < other for other in matched)]
+        if len(hits) > Config.QUERY_ROUTER_MAX_EMPLOYEES:
+            return None
+        seen = set()
+        for hit in hits:
+            # Aynı kelimelerle eşleşen iki çalışan: hangisinin kastedildiği belli değil
+            key = frozenset(hit['matched'])
+            if key in seen:
+                return None
+            seen.add(key)
+        if any(hit['id'] not in by_id for hit in hits):
+            # Snapshot'a henüz yansımamış kayıt; güncel veri LLM bağlamında
+            return None
+        return [by_id[hit['id']] for hit in hits]
+
+    @staticmethod
+    def _recent_weeks(engine, text: str) -> Optional[np.ndarray]:
+        """"bu/son hafta", "geçen hafta", "son N hafta": bugüne göre hafta sütunlarının maskesi.
+
+        İfade yoksa ya da veride bugünü (geçen hafta için 7 gün öncesini)
+        kapsayan kayıtlı bir hafta yoksa None: eski verideki son hafta
+        "bu hafta" diye sunulmaz.
+        """
+        match = _LAST_N_WEEKS.search(text)
+        last = _LAST_WEEK.search(text)
+        if not (match or last) or (match and not int(match.group(1))):
+            return None
+        today = _today()
+        target = today - timedelta(days=7) if not match and last.group(1) == 'gecen' else today
+        bounds = [week_range(week) for week in engine.weeks]
+        recorded = ~np.isnan(engine.weekly).all(axis=0)
+        current = [w for w, b in enumerate(bounds) if b and recorded[w] and b[0] <= target <= b[1]]
+        if not current:
+            return None
+        mask = np.zeros(len(engine.weeks), dtype=bool)
+        if not match:
+            mask[current[-1]] = True
+            return mask
+        cutoff = bounds[current[-1]][0] - timedelta(days=7 * (int(match.group(1)) - 1))
+        for w, b in enumerate(bounds):
+            mask[w] = bool(b) and bool(recorded[w]) and cutoff <= b[0] <= target
+        return mask
+
+    @staticmethod
+    def _sum(engine, i: int, weeks: Optional[np.ndarray]) -> tuple:
+        row = engine.weekly[i] if weeks is None else engine.weekly[i][weeks]
+        present = ~np.isnan(row)
+        return float(row[present].sum()), int(present.sum())
+
+    def _total(self, engine, i: int) -> Dict[str, Any]:
+        total = float(engine.employee_totals[i])
+        periods = int(engine.employee_periods[i])
+        present = np.flatnonzero(~np.isnan(engine.weekly[i]))
+        span = f", {engine.weeks[present[0]].split('/')[0]} - {engine.weeks[present[-1]].split('/')[-1]}" if len(present) else ""
+        return {
+            "intent": "total",
+            "answer": f"{engine.names[i]} toplam {_hours(total)} saat çalışmış ({periods} hafta{span}).",
+            "data": {"isim": engine.names[i], "totalHours": total, "weeks": periods}
+        }
+
+    def _last_week(self, engine, i: int, w: int) -> Dict[str, Any]:
+        if np.isnan(engine.weekly[i, w]):
+            return {
+                "intent": "last_week",
+                "answer": f"{engine.names[i]} için {engine.weeks[w]} haftasında mesai kaydı yok.",
+                "data": {"isim": engine.names[i], "week": engine.weeks[w], "hours": None, "daily": {}}
+            }
+        hours = float(engine.weekly[i, w])
+        daily = {day: float(engine.daily[i, w, d]) for d, day in enumerate(WEEKDAYS) if not np.isnan(engine.daily[i, w, d])}
+        breakdown = f" ({', '.join(f'{day} {_hours(h)}' for day, h in daily.items())})" if daily else ""
+        return {
+            "intent": "last_week",
+            "answer": f"{engine.names[i]} son haftada ({engine.weeks[w]}) {_hours(hours)} saat çalışmış{breakdown}.",
+            "data": {"isim": engine.names[i], "week": engine.weeks[w], "hours": hours, "daily": daily}
+        }
+
+    def _date_range(self, engine, i: int, weeks: np.ndarray) -> Dict[str, Any]:
+        total, periods = self._sum(engine, i, weeks)
+        selected = [week for week, keep in zip(engine.weeks, weeks) if keep]
+        if not periods:
+            answer = f"{engine.names[i]} için bu tarihlerde mesai kaydı yok."
+        else:
+            answer = f"{engine.names[i]} bu tarihlerde {periods} haftada toplam {_hours(total)} saat çalışmış."
+        return {
+            "intent": "date_range",
+            "answer": answer,
+            "data": {"isim": engine.names[i], "totalHours": total, "weeks": periods, "periods": selected}
+        }
+
+    def _comparison(self, engine, employees: List[int], weeks: Optional[np.ndarray]) -> Dict[str, Any]:
+        rows = []
+        for i in employees:
+            total, periods = self._sum(engine, i, weeks)
+            rows.append({"isim": engine.names[i], "totalHours": total, "weeks": periods,
+                         "avgHours": round(total / periods, 2) if periods else 0.0})
+        rows.sort(key=lambda row: -row["totalHours"])
+        parts = [f"{row['isim']} {_hours(row['totalHours'])} saat ({row['weeks']} hafta, haftalık ort. {_hours(row['avgHours'])})"
+                 for row in rows]
+        scope = "Bu tarihlerde: " if weeks is not None else ""
+        diff = rows[0]["totalHours"] - rows[1]["totalHours"]
+        if diff:
+            verdict = f" En çok çalışan: {rows[0]['isim']} (fark {_hours(diff)} saat)."
+        else:
+            verdict = " Toplam saatleri eşit."
+        return {
+            "intent": "comparison",
+            "answer": f"{scope}{'; '.join(parts)}.{verdict}",
+            "data": {"employees": rows}
+        }
+
+    def _top_n(self, engine, text: str, weeks: Optional[np.ndarray]) -> Dict[str, Any]:
+        count = _TOP_COUNT.search(text)
+        n = int(count.group(1) or count.group(2)) if count else Config.QUERY_ROUTER_TOP_N_DEFAULT
+        n = max(min(n, Config.QUERY_ROUTER_TOP_N_MAX, len(engine.names)), 1)
+        overtime = bool(_OVERTIME.search(text))
+        ascending = bool(re.search(r"\ben az\b", text))
+        if weeks is None:
+            values = engine.employee_overtime if overtime else engine.employee_totals
+        elif not weeks.any():
+            values = np.zeros(len(engine.names))
+        else:
+            selected = engine.weekly[:, weeks]
+            if overtime:
+                # Fazla mesai seçilen haftalar üzerinden (eksik hafta NaN kalır, toplama girmez)
+                selected = np.maximum(selected - Config.STANDARD_WEEKLY_HOURS, 0.0)
+            values = np.nansum(selected, axis=1)
+        order = np.argsort(values if ascending else -values, kind='stable')[:n]
+        rows = [{"isim": engine.names[i], "hours": float(values[i])} for i in order]
+        metric = "fazla mesai" if overtime else "toplam mesai"
+        direction = "en az" if ascending else "en çok"
+        lines = '\n'.join(f"{rank}. {row['isim']}: {_hours(row['hours'])} saat" for rank, row in enumerate(rows, 1))
+        scope = " (seçilen tarihlerde)" if weeks is not None else ""
+        return {
+            "intent": "top_n",
+            "answer": f"{metric.capitalize()}{scope} açısından {direction} {len(rows)} çalışan:\n{lines}",
+            "data": {"metric": "overtime" if overtime else "total", "ascending": ascending, "employees": rows}
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        fast, llm = self.counts["fast"], self.counts["llm"]
+        routed = fast + llm
+        return {
+            "enabled": Config.QUERY_ROUTER_ENABLED,
+            **self.counts,
+            "hitRate": round(fast / routed, 3) if routed else 0.0,
+            "intents": dict(self.intent_counts),
+            "avgFastMs": round(self._fast_ms / fast, 3) if fast else 0.0
+        }
+
+# Singleton instance
+query_router = QueryRouter()
@@ -0,0 +1,289 @@
+"""Chat bağlamı için hibrit (sözcüksel + vektör) çalışan getirme hattı.
+
+1. İsim: name_resolver ile sorudaki isimlerin Türkçe duyarlı, önek ve
+   yazım hatası toleranslı eşleştirilmesi.
+2. Sözcüksel: snapshot üzerinde bellek içi ters indeks (tarih aralıkları,
+   ay adları ve diğer payload metinleri). Kısa olmayan sorgu kelimeleri
+   önek olarak da eşleşir; skor IDF toplamıdır.
+3. Vektör: soru embedding'i ile yerel indeks / Qdrant (politika
+   local_index'te) üzerinden kosinüs araması.
+4. Birleştirme: sıralamalar Reciprocal Rank Fusion ile birleştirilir,
+   RETRIEVAL_TOP_K kadar sonuç döner.
+
+Her aşamanın süresi ölçülür ve sonuçla birlikte döndürülür.
+"""
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.settings import Config
+from services import profiling
+from services.ai_service import ai_service
+from services.employee_stats import employee_stats
+from services.employee_store import employee_store, EmployeeSnapshot
+from services.name_resolver import STOP_WORDS, fold, name_resolver
+from services.qdrant_service import qdrant_service
+
+logger = logging.getLogger(__name__)
+
+# Ay adları name_resolver.fold ile katlanmış halde
+MONTHS = ['ocak', 'subat', 'mart', 'nisan', 'mayis', 'haziran',
+          'temmuz', 'agustos', 'eylul', 'ekim', 'kasim', 'aralik']
+_WORD = re.compile(r"\d{4}-\d{2}(?:-\d{2})?|\d{1,2}[./-]\d{1,2}[./-]\d{4}|[a-z0-9]+")
+_DMY = re.compile(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4})")
+_ISO_DAY = re.compile(r"\d{4}-\d{2}-\d{2}")
+_ISO_MONTH = re.compile(r"\d{4}-\d{2}")
+_YEAR = re.compile(r"(19|20)\d{2}")
+# Payload'da sözcüksel indekse alınmayan alanlar
+_SKIP_FIELDS = {'content_hash', 'vector'}
+
+def tokenize(text: str) -> List[str]:
+    """Katlanmış token'lar; GG.AA.YYYY tarihleri ISO'ya çevrilir, soru kalıbı kelimeleri atılır"""
+    tokens = []
+    for token in _WORD.findall(fold(text)):
+        if token in STOP_WORDS:
+            continue
+        dmy = _DMY.fullmatch(token)
+        if dmy:
+            day, month, year = dmy.groups()
+            token = f"{year}-{int(month):02d}-{int(day):02d}"
+        tokens.append(token)
+    return tokens
+
+def _date_tokens(week: str) -> List[str]:
+    """'2025-07-07/2025-07-13' → tarih, yıl-ay, yıl ve ay adı token'ları"""
+    tokens = set()
+    for part in str(week).split('/'):
+        part = part.strip()
+        tokens.add(part)
+        if len(part) >= 7 and part[4] == '-':
+            tokens.add(part[:7])
+            tokens.add(part[:4])
+            month = part[5:7]
+            if month.isdigit() and 1 <= int(month) <= 12:
+                tokens.add(MONTHS[int(month) - 1])
+    return [t for t in tokens if t]
+
+def week_mask(weeks: List[str], tokens: List[str]) -> Optional[np.ndarray]:
+    """Sorudaki tarih/ay/yıl ifadelerine uyan hafta sütunları; tarih yoksa None"""
+    days = sorted(t for t in tokens if _ISO_DAY.fullmatch(t))
+    months = {t for t in tokens if _ISO_MONTH.fullmatch(t)}
+    years = {t for t in tokens if _YEAR.fullmatch(t)}
+    month_names = {f"{MONTHS.index(t) + 1:02d}" for t in tokens if t in MONTHS}
+    if not (days or months or years or month_names):
+        return None
+    mask = np.zeros(len(weeks), dtype=bool)
+    for w, week in enumerate(weeks):
+        start, _, end = str(week).partition('/')
+        end = end or start
+        if days:
+            # Tek tarih: o tarihi içeren hafta; iki veya daha fazla tarih: aralıkla kesişen haftalar
+            mask[w] = start <= days[-1] and end >= days[0]
+        elif months:
+            mask[w] = start[:7] in months or end[:7] in months
+        else:
+            in_year = not years or start[:4] in years or end[:4] in years
+            in_month = not month_names or start[5:7] in month_names or end[5:7] in month_names
+            mask[w] = in_year and in_month
+    return mask
+
+class LexicalIndex:
+    """Bir snapshot sürümü için ters indeks"""
+
+    def __init__(self, snapshot: EmployeeSnapshot):
+        engine = employee_stats.for_snapshot(snapshot)
+        self.version = snapshot.version
+        self.size = len(engine.names)
+        # İsimler name_resolver'da; burada yalnızca diğer payload metinleri
+        postings: Dict[str, set] = {}
+        extras = snapshot.columns.extras if snapshot.columns is not None else [
+            {k: v for k, v in emp.items() if k not in ('id', 'isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai')}
+            for emp in snapshot.employees
+        ]
+        for i, extra in enumerate(extras):
+            for key, value in extra.items():
+                if key in _SKIP_FIELDS or not isinstance(value, (str, int, float)):
+                    continue
+                for token in tokenize(value):
+                    postings.setdefault(token, set()).add(i)
+        self._text = {token: np.fromiter(ids, dtype=np.int64, count=len(ids)) for token, ids in postings.items()}
+        self._vocab = sorted(self._text)
+
+        # Tarih token'ları: token → hafta sütunları; çalışan listesi ilk sorguda hesaplanır
+        self._present = ~np.isnan(engine.weekly)
+        self._week_tokens: Dict[str, List[int]] = {}
+        for w, week in enumerate(engine.weeks):
+            for token in _date_tokens(week):
+                self._week_tokens.setdefault(token, []).append(w)
+        self._date_postings: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _matches(self, token: str) -> List[tuple]:
+        """Sorgu token'ının eşleştiği (çalışan indeksleri, ağırlık) listesi"""
+        if token in self._week_tokens:
+            cached = self._date_postings.get(token)
+            if cached is None:
+                cached = np.flatnonzero(self._present[:, self._week_tokens[token]].any(axis=1))
+                with self._lock:
+                    self._date_postings[token] = cached
+            return [(cached, 1.0)]
+        if len(token) < Config.RETRIEVAL_PREFIX_MIN_LENGTH:
+            return [(self._text[token], 1.0)] if token in self._text else []
+        matches = []
+        start = bisect.bisect_left(self._vocab, token)
+        for vocab_token in self._vocab[start:]:
+            if not vocab_token.startswith(token):
+                break
+            # Tam eşleşme önek eşleşmesinden ("ahmet" → "ahmetoğlu") önce gelir
+            matches.append((self._text[vocab_token], 1.0 if vocab_token == token else Config.RETRIEVAL_PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query: str, limit: int) -> List[tuple]:
+        """(kayıt indeksi, skor) listesi, skora göre azalan"""
+        if not self.size:
+            return []
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token in dict.fromkeys(tokenize(query)):
+            matches = self._matches(token)
+            if not matches:
+                continue
+            # Bir çalışan aynı sorgu kelimesi için en fazla bir kez (en iyi eşleşmesiyle) puan alır
+            token_scores = np.zeros(self.size, dtype=np.float32)
+            for ids, weight in matches:
+                np.maximum.at(token_scores, ids, weight * math.log(1 + self.size / len(ids)))
+            scores += token_scores
+        hits = np.flatnonzero(scores)
+        if not len(hits):
+            return []
+        top = hits[np.argsort(-scores[hits], kind='stable')[:limit]]
+        return [(int(i), float(scores[i])) for i in top]
+
+class Retriever:
+    """Sözcüksel ve vektör sonuçlarını RRF ile birleştiren getirme hattı"""
+
+    STAGES = ('names', 'lexical', 'embedding', 'vector', 'fusion', 'total')
+
+    def __init__(self):
+        self._lexical: Optional[LexicalIndex] = None
+        self._lock = threading.Lock()
+        self._stage_totals = {stage: 0.0 for stage in self.STAGES}
+        self._requests = 0
+
+    def lexical_index(self) -> LexicalIndex:
+        snapshot = employee_store.get()
+        index = self._lexical
+        if index is not None and index.version == snapshot.version:
+            return index
+        with self._lock:
+            if self._lexical is None or self._lexical.version != snapshot.version:
+                started = time.perf_counter()
+                self._lexical = LexicalIndex(snapshot)
+                logger.info(f"Sözcüksel indeks hazırlandı: {len(self._lexical._vocab)} token, "
+                            f"{(time.perf_counter() - started) * 1000:.0f} ms (sürüm {snapshot.version})")
+            return self._lexical
+
+    @profiling.traced("retrieve")
+    def retrieve(self, query: str, embedding: Optional[List[float]] = None, top_k: int = None,
+                 score_threshold: float = None, use_vector: bool = None,
+                 vector_hits: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Sorgu için en ilgili çalışanları ve aşama sürelerini (ms) döndür.
+
+        ``embedding`` verilmezse ve vektör aşaması açıksa soru embed edilir;
+        embedding alınamazsa yalnızca sözcüksel sonuçlar kullanılır.
+        ``vector_hits`` verilirse (async view'lar aramayı kendileri yapar)
+        vektör aşaması atlanır ve bu sonuçlar birleştirilir.
+        """
+        top_k = top_k or Config.RETRIEVAL_TOP_K
+        score_threshold = Config.RETRIEVAL_SCORE_THRESHOLD if score_threshold is None else score_threshold
+        use_vector = Config.RETRIEVAL_USE_VECTOR if use_vector is None else use_vector
+        candidates = max(top_k, Config.RETRIEVAL_CANDIDATES)
+        timings = {}
+        started = time.perf_counter()
+        snapshot = employee_store.get()
+
+        stage = time.perf_counter()
+        with profiling.span("retrieve.names"):
+            names = name_resolver.resolve(query, limit=candidates)
+        timings['names'] = (time.perf_counter() - stage) * 1000
+
+        stage = time.perf_counter()
+        with profiling.span("retrieve.lexical"):
+            lexical = self.lexical_index().search(query, candidates)
+        timings['lexical'] = (time.perf_counter() - stage) * 1000
+
+        vector = vector_hits or []
+        if use_vector and vector_hits is None:
+            stage = time.perf_counter()
+            if embedding is None:
+                with profiling.span("retrieve.embedding"):
+                    result = ai_service.generate_embedding(query)
+                # Fallback (rastgele) vektörle arama yapılmaz
+                embedding = result["embedding"] if result.get("success") else None
+            timings['embedding'] = (time.perf_counter() - stage) * 1000
+            if embedding is not None:
+                stage = time.perf_counter()
+                with profiling.span("retrieve.vector"):
+                    vector = qdrant_service.vector_search(embedding, limit=candidates, score_threshold=score_threshold)
+                timings['vector'] = (time.perf_counter() - stage) * 1000
+
+        stage = time.perf_counter()
+        with profiling.span("retrieve.fusion"):
+            k = Config.RETRIEVAL_RRF_K
+            fused: Dict[Any, Dict[str, Any]] = {}
+            records: Dict[Any, Dict[str, Any]] = {}
+            by_id = snapshot.by_id
+            # CRUD ile eklenmiş ama henüz snapshot'a yansımamış çalışanlar Qdrant'tan alınır
+            missing = [hit['id'] for hit in names if hit['id'] not in by_id]
+            fetched = {emp['id']: emp for emp in qdrant_service.get_employees(missing)} if missing else {}
+            for rank, hit in enumerate(names):
+                key = hit['id']
+                record = snapshot.record(by_id[key]) if key in by_id else fetched.get(key)
+                if record is None:
+                    continue
+                records[key] = record
+                entry = fused.setdefault(key, {"score": 0.0})
+                entry["score"] += 1.0 / (k + rank + 1)
+                entry["nameConfidence"] = hit['confidence']
+            for rank, (i, score) in enumerate(lexical):
+                record = snapshot.record(i)
+                key = record.get('id', record.get('isim'))
+                if snapshot.is_stale(key):
+                    # Snapshot'tan sonra değişmiş/silinmiş kayıt; güncel hâli isim/vektör aşamasından gelir
+                    continue
+                records.setdefault(key, record)
+                entry = fused.setdefault(key, {"score": 0.0})
+                entry["score"] += 1.0 / (k + rank + 1)
+                entry["lexicalScore"] = round(score, 4)
+            for rank, hit in enumerate(vector):
+                key = hit.get('id', hit.get('isim'))
+                if key not in records:
+                    # Snapshot'taki kayıt tercih edilir; yoksa Qdrant payload'ı kullanılır
+                    records[key] = snapshot.record(by_id[key]) if key in by_id else hit
+                entry = fused.setdefault(key, {"score": 0.0})
+                entry["score"] += 1.0 / (k + rank + 1)
+                entry["vectorScore"] = round(float(hit.get('score', 0.0)), 4)
+            ranked = sorted(fused.items(), key=lambda item: -item[1]["score"])[:top_k]
+            hits = [{**records[key], **scores} for key, scores in ranked]
+        timings['fusion'] = (time.perf_counter() - stage) * 1000
+        timings['total'] = (time.perf_counter() - started) * 1000
+
+        self._requests += 1
+        for name, value in timings.items():
+            self._stage_totals[name] += value
+        logger.debug(f"Retrieval '{query}': {len(names)} isim, {len(lexical)} sözcüksel, {len(vector)} vektör, {timings}")
+        return {"hits": hits, "timings": {name: round(value, 2) for name, value in timings.items()}}
+
+    def stats(self) -> Dict[str, Any]:
+        """Aşama başına ortalama süre (ms)"""
+        requests = self._requests
+        return {
+            "requests": requests,
+            "avgStageMs": {name: round(total / requests, 2) for name, total in self._stage_totals.items()} if requests else {}
+        }
+
+# Singleton instance
+retriever = Retriever()
@@ -0,0 +1,244 @@
+"""Çalışan snapshot'ı için mmap ile açılan sütunsal ikili format.
+
+Dosya düzeni (little-endian, her bölüm 64 bayta hizalı)::
+
+    header   : magic, format sürümü, veri sürümü, çalışan/hafta/vektör boyutu,
+               bölüm tablosu (offset, uzunluk)
+    ids      : int64[E]
+    names    : int64[E+1] offset + UTF-8 blob
+    weeks    : int64[W+1] offset + UTF-8 blob (tarihe göre sıralı tarih_araligi değerleri)
+    weekly   : int32[E, W]     toplam_mesai, eksik hücre -1
+    daily    : int16[E, W, 7]  gunluk_mesai (pazartesi..pazar), eksik hücre -1
+    vectors  : float32[E, D]
+    extras   : JSON (yukarıdakiler dışında kalan payload alanları)
+
+Okuyucu yalnızca header'ı ayrıştırır; diziler mmap üzerinde sıfır kopyalı
+NumPy görünümleridir.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+MAGIC = b"ARGSNAP1"
+FORMAT_VERSION = 1
+ALIGN = 64
+MISSING = -1
+
+WEEKDAYS = ['pazartesi', 'sali', 'carsamba', 'persembe', 'cuma', 'cumartesi', 'pazar']
+_DAY_FOLD = str.maketrans({'ı': 'i', 'İ': 'i', 'I': 'i', 'ş': 's', 'Ş': 's', 'ç': 'c', 'Ç': 'c',
+                           'ğ': 'g', 'Ğ': 'g', 'ü': 'u', 'Ü': 'u', 'ö': 'o', 'Ö': 'o'})
+
+SECTIONS = ['ids', 'name_offsets', 'names', 'week_offsets', 'weeks', 'weekly', 'daily', 'vectors', 'extras']
+# magic, format, data_version, n_employees, n_weeks, dim, ardından bölüm başına (offset, nbytes)
+_HEADER = struct.Struct("<8sIQIII" + "QQ" * len(SECTIONS))
+_KNOWN_KEYS = {'id', 'isim', 'toplam_mesai', 'tarih_araligi', 'gunluk_mesai', 'vector'}
+
+def day_index(day: str) -> Optional[int]:
+    """'Salı', 'sali', 'SALI' gibi gün adlarını 0-6 indeksine çevir"""
+    key = str(day).translate(_DAY_FOLD).strip().lower()
+    try:
+        return WEEKDAYS.index(key)
+    except ValueError:
+        return None
+
+def as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _parse_day(text: str) -> Optional[date]:
+    text = text.strip().replace('.', '-')
+    for fmt in ('%Y-%m-%d', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def week_range(week: str) -> Optional[Tuple[date, date]]:
+    """Hafta anahtarının (başlangıç, bitiş) tarihleri ('2025-07-07/2025-07-13', '7.7.2025/13.7.2025');
+    bitiş yoksa başlangıç + 6 gün, başlangıç tarihe çevrilemezse None"""
+    start_text, _, end_text = str(week).partition('/')
+    start = _parse_day(start_text)
+    if start is None:
+        return None
+    end = _parse_day(end_text) if end_text else None
+    return start, end or start + timedelta(days=6)
+
+def week_sort_key(week: str) -> tuple:
+    """Hafta anahtarını başlangıç tarihiyle sırala ('2025-07-07/...', '7.7.2025/...' aynı düzende);
+    tarihe çevrilemeyenler sonda, kendi aralarında metin sırasıyla"""
+    bounds = week_range(week)
+    return (0, bounds[0].toordinal(), str(week)) if bounds else (1, 0, str(week))
+
+def _string_table(values: List[str]):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return offsets, b"".join(encoded)
+
+def _to_int(value) -> int:
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return MISSING
+
+def write_snapshot(path: str, employees: List[Dict[str, Any]], data_version: int = None):
+    """Çalışan listesini sütunsal formatta atomik olarak yaz"""
+    data_version = data_version or time.time_ns()
+    weeks = sorted({str(t) for emp in employees for t in as_list(emp.get('tarih_araligi'))}, key=week_sort_key)
+    week_index = {week: i for i, week in enumerate(weeks)}
+    n_emp, n_weeks = len(employees), len(weeks)
+    dim = max((len(emp['vector']) for emp in employees if emp.get('vector')), default=0)
+
+    ids = np.array([int(emp.get('id') or 0) for emp in employees], dtype=np.int64)
+    weekly = np.full((n_emp, n_weeks), MISSING, dtype=np.int32)
+    daily = np.full((n_emp, n_weeks, len(WEEKDAYS)), MISSING, dtype=np.int16)
+    vectors = np.zeros((n_emp, dim), dtype=np.float32)
+    extras = []
+    for e, emp in enumerate(employees):
+        totals = as_list(emp.get('toplam_mesai'))
+        days = as_list(emp.get('gunluk_mesai'))
+        for j, week in enumerate(as_list(emp.get('tarih_araligi'))):
+            w = week_index[str(week)]
+            if j < len(totals):
+                hours = _to_int(totals[j])
+                if hours != MISSING:
+                    # Aynı hafta birden fazla kez geldiyse toplanır
+                    weekly[e, w] = max(weekly[e, w], 0) + hours
+            if j < len(days) and isinstance(days[j], dict):
+                for day, value in days[j].items():
+                    d = day_index(day)
+                    hours = _to_int(value)
+                    if d is not None and hours != MISSING:
+                        daily[e, w, d] = max(daily[e, w, d], 0) + hours
+        vector = emp.get('vector')
+        if vector and len(vector) == dim:
+            vectors[e] = vector
+        extras.append({k: v for k, v in emp.items() if k not in _KNOWN_KEYS})
+
+    name_offsets, names_blob = _string_table([str(emp.get('isim', '')) for emp in employees])
+    week_offsets, weeks_blob = _string_table(weeks)
+    extras_blob = json.dumps(extras, ensure_ascii=False).encode("utf-8") if any(extras) else b""
+
+    blobs = {
+        'ids': ids.tobytes(),
+        'name_offsets': name_offsets.tobytes(),
+        'names': names_blob,
+        'week_offsets': week_offsets.tobytes(),
+        'weeks': weeks_blob,
+        'weekly': weekly.tobytes(),
+        'daily': daily.tobytes(),
+        'vectors': vectors.tobytes(),
+        'extras': extras_blob,
+    }
+    table = []
+    offset = _align(_HEADER.size)
+    for name in SECTIONS:
+        table.extend([offset, len(blobs[name])])
+        offset = _align(offset + len(blobs[name]))
+
+    # Aynı süreçteki thread'ler de ayrı geçici dosyaya yazar
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, data_version, n_emp, n_weeks, dim, *table))
+        for i, name in enumerate(SECTIONS):
+            f.seek(table[2 * i])
+            f.write(blobs[name])
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+class ColumnarSnapshot:
+    """mmap üzerinden açılmış snapshot; diziler sıfır kopyalı görünümlerdir"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = _HEADER.unpack_from(self._mm, 0)
+        magic, fmt, self.data_version, self.n_employees, self.n_weeks, self.dim = fields[:6]
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Geçersiz snapshot dosyası: {path}")
+        table = fields[6:]
+        self._sections = {name: (table[2 * i], table[2 * i + 1]) for i, name in enumerate(SECTIONS)}
+
+        E, W = self.n_employees, self.n_weeks
+        self.ids = self._array('ids', np.int64, (E,))
+        self._name_offsets = self._array('name_offsets', np.int64, (E + 1,))
+        self.weekly = self._array('weekly', np.int32, (E, W))
+        self.daily = self._array('daily', np.int16, (E, W, len(WEEKDAYS)))
+        self.vectors = self._array('vectors', np.float32, (E, self.dim))
+        week_offsets = self._array('week_offsets', np.int64, (W + 1,))
+        weeks_start, _ = self._sections['weeks']
+        self.weeks = [
+            bytes(self._mm[weeks_start + week_offsets[i]:weeks_start + week_offsets[i + 1]]).decode("utf-8")
+            for i in range(W)
+        ]
+        self._names: Optional[List[str]] = None
+        self._extras: Optional[List[Dict[str, Any]]] = None
+
+    def _array(self, name: str, dtype, shape) -> np.ndarray:
+        offset, nbytes = self._sections[name]
+        count = int(np.prod(shape)) if shape else 0
+        if count == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.frombuffer(self._mm, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+    def __len__(self) -> int:
+        return self.n_employees
+
+    def name(self, i: int) -> str:
+        start, _ = self._sections['names']
+        return bytes(self._mm[start + self._name_offsets[i]:start + self._name_offsets[i + 1]]).decode("utf-8")
+
+    @property
+    def names(self) -> List[str]:
+        if self._names is None:
+            start, nbytes = self._sections['names']
+            blob = bytes(self._mm[start:start + nbytes])
+            offsets = self._name_offsets.tolist()
+            self._names = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.n_employees)]
+        return self._names
+
+    @property
+    def extras(self) -> List[Dict[str, Any]]:
+        if self._extras is None:
+            start, nbytes = self._sections['extras']
+            self._extras = json.loads(bytes(self._mm[start:start + nbytes])) if nbytes else [{}] * self.n_employees
+        return self._extras
+
+    def record(self, i: int, with_vector: bool = True) -> Dict[str, Any]:
+        """i. çalışanı API'nin kullandığı payload biçiminde oluştur"""
+        # Yalnızca günlük saatleri olan haftalar da kayda girer (toplamı None)
+        present = np.flatnonzero((self.weekly[i] != MISSING) | (self.daily[i] != MISSING).any(axis=1))
+        record = {
+            "id": int(self.ids[i]),
+            "isim": self.name(i),
+            "toplam_mesai": [int(h) if h != MISSING else None for h in self.weekly[i, present]],
+            "tarih_araligi": [self.weeks[w] for w in present],
+            "gunluk_mesai": [
+                {WEEKDAYS[d]: int(h) for d, h in enumerate(self.daily[i, w]) if h != MISSING}
+                for w in present
+            ],
+        }
+        record.update(self.extras[i])
+        if with_vector and self.dim:
+            record["vector"] = self.vectors[i].tolist()
+        return record
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [self.record(i) for i in range(self.n_employees)]
+
+    def close(self):
+        self._mm.close()
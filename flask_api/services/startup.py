@@ -0,0 +1,160 @@
+"""Başlangıç aşamaları, arka plan ısınması ve hazır olma (readiness) durumu.
+
+Worker açılışında yalnızca import ve create_app çalışır; Qdrant istemcisi,
+çalışan snapshot'ı, indeksler ve Ollama modelleri açılıştan sonra bir arka
+plan thread'inde ısıtılır (ya da ilk kullanımda kendiliğinden açılır).
+
+    /health  canlılık: süreç ayaktaysa 200, hiçbir arka uca gitmez
+    /ready   hazır olma: ısınma bitmeden ya da Qdrant'a erişilemezken 503
+
+gunicorn ``preload_app`` ile (gunicorn.conf.py) uygulama master'da bir kez
+import edilir; WARMUP_AFTER_FORK açıkken ısınma ve bağlantılar master'da
+değil fork'tan sonra her worker'da başlar. Her aşamanın süresi loglanır,
+/ready'de döner ve ``startup_phase_seconds`` metriğine yazılır.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+class Startup:
+    def __init__(self):
+        # Bu modül app.py'de ilk import edilir; "imports" aşaması buradan ölçülür
+        self.started = time.perf_counter()
+        self.booted = self.started
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.warmed = threading.Event()
+        self._pid: Optional[int] = None
+        self._fork_hook = False
+
+    def record(self, name: str, seconds: float):
+        from services import metrics
+        self.phases[name] = seconds
+        metrics.STARTUP_PHASE_SECONDS.labels(name).set(seconds)
+        logger.info(f"Başlangıç aşaması '{name}': {seconds * 1000:.0f} ms")
+
+    @contextmanager
+    def phase(self, name: str):
+        """``with startup.phase("ad"):`` bloğunun süresini kaydet"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.errors[name] = str(e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark(self, name: str):
+        """Süreç açılışından (bu modülün import'undan) bu yana geçen süre"""
+        self.record(name, time.perf_counter() - self.started)
+
+    def start_warmup(self):
+        """Arka plan ısınmasını başlat; WARMUP_AFTER_FORK açıksa her fork'tan sonra"""
+        if Config.WARMUP_AFTER_FORK:
+            if not self._fork_hook:
+                self._fork_hook = True
+                # Yalnızca import: bağlantı açmaz, worker'lar fork ile paylaşır
+                with self.phase("preload"):
+                    import qdrant_client  # noqa: F401
+                os.register_at_fork(after_in_child=self._after_fork)
+            return
+        self._start_thread()
+
+    def _after_fork(self):
+        from services import metrics
+        self.booted = time.perf_counter()
+        self.warmed = threading.Event()
+        # Fork'ta metrik değerleri sıfırlanır; master'da ölçülen aşamaları worker da yayınlasın
+        for name, seconds in self.phases.items():
+            metrics.STARTUP_PHASE_SECONDS.labels(name).set(seconds)
+        self._start_thread()
+
+    def _start_thread(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._warmup, name='startup-warmup', daemon=True).start()
+
+    def _warmup(self):
+        steps = [("upload_jobs", self._resume_jobs)]
+        if Config.WARMUP_ENABLED:
+            steps += [("qdrant", self._warm_qdrant), ("snapshot", self._warm_snapshot), ("indexes", self._warm_indexes)]
+            if Config.WARMUP_OLLAMA:
+                steps.append(("ollama", self._warm_ollama))
+        for name, step in steps:
+            try:
+                with self.phase(f"warmup.{name}"):
+                    step()
+            except Exception as e:
+                logger.warning(f"Isınma adımı '{name}' başarısız: {e}")
+        self.record("ready", time.perf_counter() - self.booted)
+        self.warmed.set()
+
+    @staticmethod
+    def _resume_jobs():
+        # Önceki süreç çökerken yarıda kalan yükleme işlerini devam ettir
+        from services.upload_jobs import upload_jobs
+        upload_jobs.resume_pending()
+
+    @staticmethod
+    def _warm_qdrant():
+        from services.qdrant_service import qdrant_service
+        if not qdrant_service.ping():
+            raise RuntimeError("Qdrant'a erişilemedi")
+        info = qdrant_service.collection_info()
+        if info["vectorSize"] != qdrant_service.vector_size:
+            # Ör. mxbai-embed-large (1024) ile doldurulmuş koleksiyon, QDRANT_VECTOR_SIZE=384
+            logger.error(f"Koleksiyon vektör boyutu {info['vectorSize']}, QDRANT_VECTOR_SIZE "
+                         f"{qdrant_service.vector_size}; vektör araması hata verecek")
+
+    @staticmethod
+    def _warm_snapshot():
+        from services.employee_stats import employee_stats
+        from services.employee_store import employee_store
+        employee_store.get()
+        employee_stats.get()
+
+    @staticmethod
+    def _warm_indexes():
+        from services.local_index import local_index
+        from services.name_resolver import name_resolver
+        from services.retrieval import retriever
+        name_resolver.ensure_current()
+        retriever.lexical_index()
+        if local_index.policy in ('always', 'small', 'slo'):
+            local_index.get()
+
+    @staticmethod
+    def _warm_ollama():
+        from services.ai_service import ai_service
+        loaded = ai_service.warm_models()
+        if not all(loaded.values()):
+            raise RuntimeError(f"Modeller yüklenemedi: {loaded}")
+
+    def readiness(self) -> Dict[str, Any]:
+        """Isınma bitti ve Qdrant erişilebilir mi; aşama süreleriyle birlikte"""
+        from services.ai_service import ai_service
+        from services.qdrant_service import qdrant_service
+        checks = {
+            "warmup": self.warmed.is_set(),
+            "qdrant": qdrant_service.ping(),
+            # Bilgi amaçlı: Ollama kapalıyken de fallback yollarıyla hizmet verilir
+            "aiCircuit": ai_service.transport.breaker.state
+        }
+        return {
+            "ready": checks["warmup"] and checks["qdrant"],
+            "checks": checks,
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "errors": dict(self.errors),
+            "pid": os.getpid()
+        }
+
+# Singleton instance
+startup = Startup()
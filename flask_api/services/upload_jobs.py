@@ -0,0 +1,379 @@
+"""Excel/CSV yüklemelerinin arka planda iş (job) olarak çalıştırılması.
+
+Her işin durumu UPLOAD_JOBS_DIR altında ``<id>.json`` dosyasında tutulur;
+böylece işi hangi gunicorn worker'ı çalıştırırsa çalıştırsın durum herhangi
+bir worker'dan okunabilir. İşi yürüten süreç ``<id>.lock`` üzerinde flock
+tutar. İşi kuyruğa alan süreç ayrıca ``owners/`` altındaki kendi sahiplik
+kilidini iş kaydına yazar (süreç yaşadıkça flock tutulur): başka bir
+süreçte sırada bekleyen iş sahipsiz sayılmaz. Sahibi ölmüş iş, başlangıçta
+ya da durumu sorgulandığında yeniden kuyruğa alınır. ``alias`` modunda yarım
+koleksiyon yayınlanmadığından yeniden başlayan iş yeni bir koleksiyon
+hazırlar; ``diff`` modunda içerik özetiyle çalıştığı için son yazılan
+batch'ten devam eder.
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from config.settings import Config
+from scripts.export_qdrant_to_json import export_qdrant_to_json
+from services import profiling
+from services.employee_sync import sync_employees
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+class JobCancelled(Exception):
+    """İş iptal edildiğinde batch arasında fırlatılır"""
+
+class UploadJobManager:
+    """Yükleme işlerini kuyruğa alır, yürütür ve durumlarını dosyada saklar"""
+
+    def __init__(self, jobs_dir: str = None, workers: int = None):
+        self.jobs_dir = jobs_dir or Config.UPLOAD_JOBS_DIR
+        self.workers = workers or Config.UPLOAD_JOB_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = set()  # Bu süreçte kuyruğa alınmış iş id'leri
+        self._lock = threading.Lock()
+        # Bu sürecin sahiplik kilidi (pid, dosya, fd); fork sonrası çocuk kendi kilidini açar
+        self._owner_lock: Optional[tuple] = None
+        os.register_at_fork(after_in_child=self._forget_owner)
+
+    def _path(self, job_id: str, suffix: str = '.json') -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}{suffix}")
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save(self, job: Dict[str, Any]):
+        job['updatedAt'] = time.time()
+        path = self._path(job['id'])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _try_lock(self, job_id: str):
+        """İşin yürütme kilidini almayı dene; alınamazsa None"""
+        fd = os.open(self._path(job_id, '.lock'), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _owner(self) -> str:
+        """Bu sürecin sahiplik kilidinin yolu; kilit süreç ölene kadar tutulur"""
+        with self._lock:
+            if self._owner_lock is None or self._owner_lock[0] != os.getpid():
+                directory = os.path.join(self.jobs_dir, 'owners')
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.lock")
+                fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._owner_lock = (os.getpid(), path, fd)
+            return self._owner_lock[1]
+
+    def _forget_owner(self):
+        # Master'dan devralınan kopya kapatılır; master'ın kilidi onun ömrüne bağlı kalır
+        if self._owner_lock is not None:
+            os.close(self._owner_lock[2])
+            self._owner_lock = None
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        """İş kaydındaki sahip süreç hâlâ yaşıyor mu (kilidi tutuluyor mu)?"""
+        if not owner:
+            return False
+        if self._owner_lock is not None and self._owner_lock[:2] == (os.getpid(), owner):
+            return True
+        try:
+            fd = os.open(owner, os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        finally:
+            os.close(fd)
+        # Ölmüş sürecin kilit dosyası
+        try:
+            os.remove(owner)
+        except FileNotFoundError:
+            pass
+        return False
+
+    def _claim(self, job_id: str) -> bool:
+        """Sahibi ölmüş aktif işi bu sürece al (iş kilidi altında); alındıysa True"""
+        fd = self._try_lock(job_id)
+        if fd is None:
+            # İş şu an bir süreçte yürüyor
+            return False
+        try:
+            job = self._load(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES or self._owner_alive(job.get('owner')):
+                return False
+            job['owner'] = self._owner()
+            self._save(job)
+            return True
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def _sync_lock(self):
+        """Aynı anda (tüm süreçlerde) yalnızca bir senkronizasyon çalışsın"""
+        fd = os.open(os.path.join(self.jobs_dir, 'sync.lock'), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _start(self, job_id: str):
+        with self._lock:
+            if job_id in self._local:
+                return
+            self._local.add(job_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='upload-job')
+        self._executor.submit(self._run, job_id)
+
+    def submit(self, file) -> Dict[str, Any]:
+        """Yüklenen dosyayı kaydet ve işi kuyruğa al"""
+        # pandas yalnızca yükleme yolunda import edilir (worker açılışında değil)
+        from services.ingestion import detect_format
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        suffix = os.path.splitext(file.filename)[1].lower() or '.xlsx'
+        file_path = self._path(job_id, suffix)
+        file.save(file_path)
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "phase": "queued",
+            "filename": file.filename,
+            "format": detect_format(file.filename),
+            "filePath": file_path,
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "attempts": 0,
+            "rowsParsed": 0,
+            "employees": 0,
+            "rowsToUpsert": 0,
+            "rowsEmbedded": 0,
+            "rowsUpserted": 0,
+            "unchanged": 0,
+            "removed": 0,
+            "embedStartedAt": None,
+            "result": None,
+            "error": None,
+            # Yükleme isteği profilleniyorsa arka plandaki iş de profillenir
+            "profile": profiling.active(),
+            "profileId": None,
+            # Kuyrukta beklerken de iş bu sürece aittir
+            "owner": self._owner()
+        }
+        self._save(job)
+        self._start(job_id)
+        return self.describe(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """İş durumunu döndür; sahibi olan süreç ölmüşse işi yeniden kuyruğa al"""
+        job = self._load(job_id)
+        if job is None:
+            return None
+        if job['status'] in ACTIVE_STATUSES and job_id not in self._local \
+                and not self._owner_alive(job.get('owner')) and self._claim(job_id):
+            logger.warning(f"Yükleme işi sahipsiz kalmış, devam ettiriliyor: {job_id}")
+            self._start(job_id)
+        return self.describe(job)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """İptal işareti bırak; iş bir sonraki batch sınırında durur"""
+        job = self._load(job_id)
+        if job is None:
+            return None
+        if job['status'] in ACTIVE_STATUSES:
+            open(self._path(job_id, '.cancel'), 'a').close()
+            job['cancelRequested'] = True
+        return self.describe(job)
+
+    def resume_pending(self) -> List[str]:
+        """Yarıda kalmış işleri (sahibi ölmüş olanları) yeniden kuyruğa al"""
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        resumed = []
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith('.json'):
+                continue
+            job_id = name[:-len('.json')]
+            job = self._load(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES or job_id in self._local:
+                continue
+            if not self._claim(job_id):
+                continue
+            self._start(job_id)
+            resumed.append(job_id)
+        if resumed:
+            logger.info(f"Yarıda kalan {len(resumed)} yükleme işi devam ettiriliyor")
+        return resumed
+
+    @staticmethod
+    def describe(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Dışarıya verilen görünüm: dosya yolu hariç, hız ve kalan süre eklenmiş"""
+        view = {k: v for k, v in job.items() if k not in ('filePath', 'embedStartedAt', 'owner')}
+        view['cancelRequested'] = job.get('cancelRequested', False)
+        throughput = None
+        eta = None
+        if job.get('embedStartedAt') and job.get('rowsEmbedded'):
+            end = job.get('finishedAt') or time.time()
+            elapsed = max(end - job['embedStartedAt'], 1e-6)
+            throughput = job['rowsEmbedded'] / elapsed
+            if job['status'] == 'running':
+                eta = max(job['rowsToUpsert'] - job['rowsEmbedded'], 0) / throughput
+        view['throughput'] = round(throughput, 2) if throughput is not None else None
+        view['etaSeconds'] = round(eta, 1) if eta is not None else None
+        return view
+
+    def _run(self, job_id: str):
+        fd = self._try_lock(job_id)
+        if fd is None:
+            # Başka bir süreç bu işi zaten yürütüyor
+            with self._lock:
+                self._local.discard(job_id)
+            return
+        job = None
+        profile = None
+        try:
+            job = self._load(job_id)
+            if job is None or job['status'] in FINISHED_STATUSES:
+                return
+            if job.get('profile'):
+                profile = profiling.start(f"upload job {job_id}", "job")
+                job['profileId'] = profile.id
+            job.update(status='running', phase='waiting', attempts=job.get('attempts', 0) + 1)
+            job['startedAt'] = job.get('startedAt') or time.time()
+            self._save(job)
+            with self._sync_lock():
+                self._execute(job)
+            job.update(status='completed', phase='done')
+        except JobCancelled:
+            logger.info(f"Yükleme işi iptal edildi: {job_id}")
+            job.update(status='cancelled', phase='cancelled')
+        except Exception as e:
+            logger.error(f"Yükleme işi hatası ({job_id}): {e}")
+            job.update(status='failed', error=str(e))
+        finally:
+            if profile is not None:
+                profiling.finish(profile, status=job['status'], rows=job.get('rowsParsed'))
+            if job is not None and job['status'] in FINISHED_STATUSES:
+                job['finishedAt'] = time.time()
+                self._save(job)
+                for path in (job.get('filePath'), self._path(job_id, '.cancel'), self._path(job_id, '.lock')):
+                    if path and os.path.exists(path):
+                        os.remove(path)
+            os.close(fd)
+            with self._lock:
+                self._local.discard(job_id)
+
+    def _check_cancel(self, job: Dict[str, Any]):
+        if os.path.exists(self._path(job['id'], '.cancel')):
+            raise JobCancelled()
+
+    def _execute(self, job: Dict[str, Any]):
+        from services.ingestion import IngestionError, load_employees
+        self._check_cancel(job)
+        job['phase'] = 'parsing'
+        self._save(job)
+
+        def on_chunk(rows):
+            job['rowsParsed'] = rows
+            self._save(job)
+            self._check_cancel(job)
+
+        try:
+            with profiling.span("upload.parse", format=job['format']):
+                parsed = load_employees(job['filePath'], job['format'], on_chunk=on_chunk)
+        except IngestionError as e:
+            job['result'] = {"success": False, "error": str(e)}
+            raise
+        bad_rows = parsed["errors"]
+        job.update(rowsParsed=parsed['rows'], employees=len(parsed['employees']))
+        if bad_rows and not Config.UPLOAD_SKIP_BAD_ROWS:
+            job['result'] = {"success": False, "badRows": bad_rows[:100]}
+            raise Exception(f"Eksik veya hatalı veri: {len(bad_rows)} satır")
+        logger.info(f"Dosya gruplandı: {parsed['rows']} satır, {len(parsed['employees'])} çalışan, {len(bad_rows)} hatalı satır")
+
+        job['phase'] = 'diffing'
+        self._save(job)
+
+        def on_plan(changed, unchanged, removed):
+            job.update(phase='embedding', rowsToUpsert=changed, unchanged=unchanged, removed=removed,
+                       rowsEmbedded=0, rowsUpserted=0, embedStartedAt=time.time())
+            self._save(job)
+
+        def on_batch(embedded, upserted):
+            job['rowsEmbedded'] += embedded
+            job['rowsUpserted'] += upserted
+            self._save(job)
+            self._check_cancel(job)
+
+        mode = Config.UPLOAD_SYNC_MODE
+        try:
+            with profiling.span("upload.sync", employees=len(parsed['employees'])):
+                result = sync_employees(parsed["employees"], mode=mode, on_batch=on_batch, on_plan=on_plan)
+        except JobCancelled:
+            # İptalde canlı koleksiyona yazılmış batch'ler snapshot'a yansısın
+            # (alias modu yarım sürümü yayınlamaz; replace koleksiyonu baştan boşaltır)
+            if mode == 'replace' or (mode != 'alias' and job.get('rowsUpserted')):
+                self._export(job)
+            raise
+        # Yeni snapshot sürümü her worker'da isim indeksini ve yanıt cache anahtarlarını yeniler
+        exported = self._export(job)
+
+        failed_rows = result["failed_rows"]
+        message = f"{result['upserted']} çalışan eklendi/güncellendi, {result['unchanged']} değişmedi, {result['removed']} silindi."
+        if failed_rows:
+            message += f" {len(failed_rows)} satır eklenemedi: {failed_rows}"
+        if not exported:
+            message += f" Snapshot güncellenemedi: {job['exportError']}"
+        job['result'] = {
+            "success": not failed_rows and exported,
+            "message": message,
+            "failedBatches": result["failed_batches"],
+            "badRows": bad_rows[:100]
+        }
+        if failed_rows or not exported:
+            raise Exception(message)
+
+    def _export(self, job: Dict[str, Any]) -> bool:
+        """Qdrant'ın son hâlini snapshot'a yaz. Hata ``exportError`` alanına ayrıca
+        kaydedilir; senkronizasyonun kendi hatasını örtmez."""
+        job['phase'] = 'exporting'
+        self._save(job)
+        try:
+            with profiling.span("upload.export"):
+                export_qdrant_to_json()
+            return True
+        except Exception as e:
+            logger.error(f"Snapshot export hatası ({job['id']}): {e}")
+            job['exportError'] = str(e)
+            self._save(job)
+            return False
+
+# Singleton instance
+upload_jobs = UploadJobManager()
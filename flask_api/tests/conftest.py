@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Testler flask_api kökünden import eder; Qdrant ve snapshot dosyası gerekmez
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QDRANT_URL', ':memory:')
+os.environ.setdefault('EMPLOYEES_SNAPSHOT_PATH', os.path.join(os.path.dirname(__file__), 'missing.snap'))
+os.environ.setdefault('EMPLOYEES_JSON_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'employees.json'))
@@ -0,0 +1,53 @@
+"""Snapshot değişiklik günlüğü: CRUD satırları snapshot yeniden yazılmadan uygulanır."""
+import time
+
+from services.employee_store import EmployeeStore
+from services.name_resolver import NameResolver
+import services.name_resolver as resolver_module
+
+def _employee(emp_id, isim, hours=40):
+    return {"id": emp_id, "isim": isim, "toplam_mesai": [hours], "tarih_araligi": ["2025-09-08/2025-09-14"],
+            "gunluk_mesai": [{"pazartesi": 8}]}
+
+def _stores(tmp_path):
+    path = str(tmp_path / "employees.snap")
+    writer = EmployeeStore(path=path, json_path=str(tmp_path / "employees.json"), check_interval=0)
+    reader = EmployeeStore(path=path, json_path=str(tmp_path / "employees.json"), check_interval=0)
+    return writer, reader
+
+def test_changes_hide_stale_rows_until_compaction(tmp_path):
+    writer, reader = _stores(tmp_path)
+    writer.write([_employee(1, "Musa Yılmaz"), _employee(2, "Esra Kaya")])
+    base = reader.get().version
+
+    writer.record_change('delete', 2)
+    writer.record_change('upsert', 3, "Furkan Demir")
+    snapshot = reader.get()
+    assert snapshot.version == base
+    assert snapshot.revision != base
+    assert 1 in snapshot.by_id and 2 not in snapshot.by_id
+    assert snapshot.is_stale(3)
+
+    # Değişikliklerden sonra okunan veri snapshot'a girer, günlük boşalır
+    started = time.time_ns()
+    writer.write([_employee(1, "Musa Yılmaz"), _employee(3, "Furkan Demir")], data_version=started)
+    snapshot = reader.get()
+    assert snapshot.version != base
+    assert snapshot.changes == ()
+    assert set(snapshot.by_id) == {1, 3}
+
+def test_name_resolver_applies_only_new_changes(tmp_path, monkeypatch):
+    writer, reader = _stores(tmp_path)
+    monkeypatch.setattr(resolver_module, "employee_store", reader)
+    writer.write([_employee(1, "Musa Yılmaz"), _employee(2, "Esra Kaya")])
+    resolver = NameResolver()
+    assert [hit['id'] for hit in resolver.resolve("esra")] == [2]
+
+    writer.record_change('delete', 2)
+    writer.record_change('upsert', 3, "Esra Demir")
+    assert [hit['id'] for hit in resolver.resolve("esra")] == [3]
+    base = resolver.stats()["version"]
+
+    writer.record_change('clear')
+    assert resolver.resolve("musa") == []
+    assert resolver.stats()["version"] != base
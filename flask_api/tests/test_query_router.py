@@ -0,0 +1,63 @@
+"""Hızlı yolun dönem ifadeleri (employees.json: 4 çalışan, 10 hafta)."""
+from datetime import date
+
+import pytest
+import services.query_router as router
+from services.query_router import query_router
+
+def _today(monkeypatch, day):
+    monkeypatch.setattr(router, "_today", lambda: day)
+
+@pytest.mark.parametrize("question", [
+    "musa geçen ay kaç saat çalıştı?",
+    "musa bu ay kaç saat çalıştı?",
+    "musa bu yıl kaç saat çalıştı?",
+    "musa dün kaç saat çalıştı?",
+    "musa 3 hafta önce kaç saat çalıştı?",
+    "musa son iki haftada kaç saat çalıştı?",
+    "geçen ay en çok kim çalıştı?",
+])
+def test_unhandled_period_goes_to_llm(question):
+    assert query_router.route(question) is None
+
+def test_last_n_weeks_is_limited_to_latest_weeks(monkeypatch):
+    _today(monkeypatch, date(2025, 9, 12))
+    result = query_router.route("musa son 3 haftada kaç saat çalıştı?")
+    assert result["intent"] == "date_range"
+    assert result["data"]["periods"] == ["2025-08-25/2025-08-31", "2025-09-01/2025-09-07", "2025-09-08/2025-09-14"]
+    assert result["data"]["totalHours"] < 270
+
+def test_last_week_top_n_uses_latest_week(monkeypatch):
+    _today(monkeypatch, date(2025, 9, 17))
+    result = query_router.route("geçen hafta en çok kim çalıştı?")
+    assert result["intent"] == "top_n"
+    assert result["data"]["employees"][0] == {"isim": "musa", "hours": 32.0}
+
+def test_last_week_for_employee(monkeypatch):
+    _today(monkeypatch, date(2025, 9, 17))
+    result = query_router.route("musa geçen hafta kaç saat çalıştı?")
+    assert result["intent"] == "last_week"
+    assert result["data"]["week"] == "2025-09-08/2025-09-14"
+
+def test_all_time_total_without_period():
+    result = query_router.route("musa toplam kaç saat çalıştı?")
+    assert result["intent"] == "total"
+    assert result["data"]["totalHours"] == 270
+
+def test_month_name_is_handled():
+    result = query_router.route("musa temmuz ayında kaç saat çalıştı?")
+    assert result["intent"] == "date_range"
+    assert all("2025-07" in week for week in result["data"]["periods"])
+
+def test_stale_data_is_not_this_week(monkeypatch):
+    _today(monkeypatch, date(2026, 1, 14))
+    assert query_router.route("musa bu hafta kaç saat çalıştı?") is None
+    assert query_router.route("son 3 haftada en çok kim çalıştı?") is None
+
+def test_overtime_top_n_uses_selected_weeks(monkeypatch):
+    _today(monkeypatch, date(2025, 9, 17))
+    result = query_router.route("geçen hafta en çok kim fazla mesai yaptı?")
+    assert result["intent"] == "top_n"
+    assert result["data"]["metric"] == "overtime"
+    # Tek haftalık fazla mesai, o haftanın toplamından büyük olamaz
+    assert result["data"]["employees"][0]["hours"] <= 32.0